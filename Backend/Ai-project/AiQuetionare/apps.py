@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AiquetionareConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'AiQuetionare'
+
+    def ready(self):
+        from AiQuetionare import signals  # noqa: F401
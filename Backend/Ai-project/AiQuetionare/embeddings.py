@@ -0,0 +1,348 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from AiQuetionare.models import Question
+from AiQuetionare.scoring import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+
+class EmbeddingService:
+    """
+    Process-wide SentenceTransformer shared by the consumer, answer grading
+    and question ingest. The model is loaded lazily on first use (or by
+    ``warm`` at startup) and exactly once, even under concurrent first calls.
+    """
+
+    def __init__(self, model_name=MODEL_NAME):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    logger.info(f"Loading SentenceTransformer model {self.model_name}...")
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def encode(self, texts, **kwargs):
+        return self.get_model().encode(texts, **kwargs)
+
+    def warm(self):
+        """Load the model now instead of on the first request"""
+        try:
+            self.get_model()
+        except Exception as e:
+            logger.error(f"Failed to warm up embedding model: {e}")
+        return self.loaded
+
+
+embedding_service = EmbeddingService()
+
+
+def get_model():
+    """Return the SentenceTransformer used for question and skill embeddings"""
+    return embedding_service.get_model()
+
+
+def answer_similarity(reference_answer, answer_text, model=None):
+    """Cosine similarity between a reference answer and a candidate answer"""
+    model = model or get_model()
+    reference, answer = np.asarray(model.encode([reference_answer, answer_text]), dtype=np.float32)
+    denominator = np.linalg.norm(reference) * np.linalg.norm(answer)
+    return float(reference @ answer / denominator) if denominator else 0.0
+
+
+# Stored embeddings are packed little-endian float32; embedding_key tags the model and text they came from
+EMBEDDING_DTYPE = np.dtype('<f4')
+
+
+def pack_embedding(vector):
+    return np.asarray(vector, dtype=EMBEDDING_DTYPE).tobytes()
+
+
+def unpack_embedding(blob):
+    """Read-only float32 view over a stored embedding, without copying"""
+    return None if blob is None else np.frombuffer(blob, dtype=EMBEDDING_DTYPE)
+
+
+def embedding_key(text, model_name=MODEL_NAME):
+    """Hash of the model name and text an embedding was computed from"""
+    return hashlib.sha256(f"{model_name}\n{text}".encode('utf-8')).hexdigest()
+
+
+def ensure_question_embeddings(queryset=None, model=None, batch_size=256):
+    """
+    Encode every question whose stored embedding is missing or stale.
+
+    An embedding is stale when its key no longer matches the current question
+    text and model name. Returns the number of questions that were (re)encoded.
+    """
+    queryset = Question.objects.all() if queryset is None else queryset
+    stale = [
+        question for question in queryset.only('id', 'question_text', 'embedding', 'embedding_key')
+        if question.embedding is None or question.embedding_key != embedding_key(question.question_text)
+    ]
+    if not stale:
+        return 0
+
+    model = model or get_model()
+    for start in range(0, len(stale), batch_size):
+        batch = stale[start:start + batch_size]
+        vectors = model.encode([question.question_text for question in batch], batch_size=batch_size)
+        for question, vector in zip(batch, vectors):
+            question.embedding = pack_embedding(vector)
+            question.embedding_key = embedding_key(question.question_text)
+        Question.objects.bulk_update(batch, ['embedding', 'embedding_key'])
+    return len(stale)
+
+
+class QuestionIndexSnapshot:
+    """
+    One immutable build of the question embedding index.
+
+    Row ``i`` of ``matrix`` belongs to ``question_ids[i]``; the matching
+    question number, category name and difficulty are kept alongside so the
+    consumer can score and rank the bank without touching the database.
+    ``normalized`` holds the same rows scaled to unit length for scoring.
+    A rebuild produces a new snapshot, so a caller holding one always sees
+    rows, ids and categories from the same build.
+    """
+
+    def __init__(self, matrix, question_ids=(), question_numbers=(), categories=(), difficulties=(), version=0):
+        matrix.setflags(write=False)
+        normalized = normalize_rows(matrix) if len(question_ids) else matrix
+        normalized.setflags(write=False)
+        self.matrix = matrix
+        self.normalized = normalized
+        self.question_ids = tuple(question_ids)
+        self.question_numbers = tuple(question_numbers)
+        self.categories = tuple(categories)
+        self.difficulties = np.asarray(difficulties, dtype=np.int8)
+        self.difficulties.setflags(write=False)
+        self.positions = {question_id: i for i, question_id in enumerate(self.question_ids)}
+        self.version = version
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def embedding_for(self, question_id):
+        """Return the stored embedding row for a question id, or None"""
+        position = self.positions.get(question_id)
+        return None if position is None else self.matrix[position]
+
+
+class QuestionEmbeddingIndex:
+    """
+    Holder of the current QuestionIndexSnapshot for the question bank.
+
+    ``get`` returns the snapshot, rebuilding it first when the bank changed.
+    The new snapshot is published with a single assignment, so readers never
+    see a half-built index; a failed rebuild leaves the index marked stale.
+
+    Every worker process holds its own snapshot, so a change is also recorded
+    as a version counter in the shared cache; ``get`` compares it with the
+    version its snapshot was built from and rebuilds when another process
+    changed the bank.
+
+    Questions served from a job's pool only add rows, and no interview needs
+    them at once, so ``invalidate(deferred=True)`` bumps a separate additions
+    counter that is folded in at most once per ``refresh_interval`` seconds
+    instead of rebuilding after every claim.
+    """
+    VERSION_KEY = 'question_bank:version'
+    ADDITIONS_KEY = 'question_bank:additions'
+
+    def __init__(self, model=None, backend=None, refresh_interval=60):
+        self.model = model
+        self.backend = backend or cache
+        self.refresh_interval = refresh_interval
+        self.snapshot = QuestionIndexSnapshot(np.zeros((0, 0), dtype=np.float32))
+        self._stale = True
+        self._pending = False
+        self._versions = (None, None)  # shared (bank, additions) versions the snapshot was built from
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.snapshot)
+
+    @property
+    def version(self):
+        return self.snapshot.version
+
+    def invalidate(self, deferred=False):
+        """
+        Mark the index for a rebuild, in this and every other worker process.
+        With ``deferred`` the change only added questions and is picked up by
+        the next periodic refresh instead of the next access.
+        """
+        if deferred:
+            self._pending = True
+        else:
+            self._stale = True
+        # Other processes must not rebuild before the change is visible to them
+        key = self.ADDITIONS_KEY if deferred else self.VERSION_KEY
+        transaction.on_commit(lambda: self._bump(key))
+
+    def _bump(self, key):
+        try:
+            self.backend.add(key, 0, timeout=None)
+            self.backend.incr(key)
+        except Exception as e:
+            logger.warning(f"Could not publish question bank change: {e}")
+
+    def _shared_versions(self):
+        try:
+            versions = self.backend.get_many([self.VERSION_KEY, self.ADDITIONS_KEY])
+            return versions.get(self.VERSION_KEY, 0), versions.get(self.ADDITIONS_KEY, 0)
+        except Exception as e:
+            logger.warning(f"Could not read question bank version: {e}")
+            return self._versions
+
+    def _needs_rebuild(self, versions):
+        if self._stale or versions[0] != self._versions[0]:
+            return True
+        added = self._pending or versions[1] != self._versions[1]
+        return added and time.monotonic() - self._built_at >= self.refresh_interval
+
+    def get(self):
+        """Return the current snapshot, rebuilding it first if the question bank changed"""
+        versions = self._shared_versions()
+        if self._needs_rebuild(versions):
+            with self._lock:
+                if self._needs_rebuild(versions):
+                    self.rebuild(versions)
+        return self.snapshot
+
+    def rebuild(self, versions=None):
+        """Encode stale questions and load a new snapshot from the database"""
+        # Reset the flags first so a change during the rebuild triggers another one
+        self._stale = False
+        self._pending = False
+        self._versions = self._shared_versions() if versions is None else versions
+        self._built_at = time.monotonic()
+        try:
+            # Questions still waiting in a job's pre-generated pool are not part of the bank yet
+            bank = Question.objects.filter(in_pool=False)
+            ensure_question_embeddings(bank, model=self.model)
+            rows = list(
+                bank.order_by('id').values_list(
+                    'id', 'question_number', 'category__name', 'difficulty', 'embedding'
+                )
+            )
+            if rows:
+                ids, numbers, categories, difficulties, embeddings = zip(*rows)
+                # One bulk bytes read: the packed rows are joined and viewed as an (n, dim) matrix
+                matrix = np.frombuffer(b''.join(embeddings), dtype=EMBEDDING_DTYPE).reshape(len(rows), -1)
+                snapshot = QuestionIndexSnapshot(matrix, ids, numbers, categories, difficulties, self.version + 1)
+            else:
+                snapshot = QuestionIndexSnapshot(np.zeros((0, 0), dtype=np.float32), version=self.version + 1)
+        except Exception:
+            self._stale = True
+            self._versions = (None, None)
+            raise
+        self.snapshot = snapshot
+        logger.info(f"Question embedding index rebuilt with {len(snapshot)} questions")
+
+
+question_index = QuestionEmbeddingIndex(refresh_interval=getattr(settings, 'QUESTION_INDEX_REFRESH_INTERVAL', 60))
+
+
+def get_question_index():
+    """Return the current snapshot of the process-wide question embedding index"""
+    return question_index.get()
+
+
+def normalize_skill(name):
+    """Cache key for a skill name: lower-cased with whitespace collapsed"""
+    return ' '.join(str(name).lower().split())
+
+
+class SkillEmbeddingCache:
+    """
+    Size-bounded LRU cache of skill embeddings keyed by normalized skill name.
+
+    ``encode`` looks every name up and fills all misses with one batched
+    ``model.encode`` call, so the same skills shared across candidates and
+    job descriptions are only ever encoded once per process.
+    """
+
+    def __init__(self, maxsize=10000, model=None):
+        self.maxsize = maxsize
+        self.model = model
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def encode(self, names):
+        """Return a (len(names), dim) float32 matrix of embeddings for ``names``"""
+        keys = [normalize_skill(name) for name in names]
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+                    self.hits += 1
+                else:
+                    self.misses += 1
+
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if missing:
+            model = self.model or get_model()
+            vectors = np.asarray(model.encode(missing), dtype=np.float32)
+            with self._lock:
+                for key, vector in zip(missing, vectors):
+                    self._entries[key] = vector
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+        return np.vstack([found[key] for key in keys])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+skill_cache = SkillEmbeddingCache(maxsize=getattr(settings, 'SKILL_EMBEDDING_CACHE_SIZE', 10000))
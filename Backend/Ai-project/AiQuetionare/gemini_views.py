@@ -1,127 +1,142 @@
-import os
+from django.conf import settings
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
+import asyncio
 import json
 import logging
-from google import genai
-from decouple import config
+from asgiref.sync import sync_to_async
 from django.utils import timezone
+from AiQuetionare.grading import answer_grader
+from AiQuetionare.llm import llm_client
 from AiQuetionare.models import Question, Category, Assessment, CandidateAnswer, Candidate, JobDescription
+from AiQuetionare.prompts import (
+    build_batch_evaluation_prompt, build_evaluation_prompt, build_question_prompt,
+    parse_batch_evaluation_reply, parse_evaluation_reply, parse_question_reply,
+)
+from AiQuetionare.question_pool import DIFFICULTY_LABELS, DIFFICULTY_LEVELS, question_pool
+from AiQuetionare.sequences import next_question_number
 from AiQuetionare.serializer import AssessmentSerializer, QuestionSerializer
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Configure the Gemini API
-try:
-    GEMINI_API_KEY = config('GEMINI_API_KEY')
-    client = genai.Client(api_key=GEMINI_API_KEY)
-    logger.info("Successfully initialized Gemini API client")
-except Exception as e:
-    logger.error(f"Failed to initialize Gemini API: {e}")
+# The views are async so a worker is not held for the whole LLM round-trip;
+# the model is called through the pooled llm_client and database work runs
+# in sync helpers via sync_to_async. Evaluations and results are deterministic
+# for a given prompt, so retries of those are served from the response cache.
+
+
+def create_generated_question(**fields):
+    """Save a question created during an interview; it joins the index on its next periodic refresh"""
+    question = Question(**fields)
+    question.generated = True  # read by the post_save handler
+    question.save()
+    return question
+
+
+@sync_to_async
+def store_generated_question(data, question_text, category_name, difficulty_level):
+    """Save a generated question, attach it to the assessment and build the response"""
+    # Store the question in the database
+    category, _ = Category.objects.get_or_create(name=category_name)
+    question = create_generated_question(
+        question_number=next_question_number(),
+        question_text=question_text,
+        answer="",  # Placeholder for now
+        category=category,
+        difficulty=DIFFICULTY_LEVELS.get(difficulty_level, 2),
+    )
+    return build_question_response(data, question, difficulty_level)
+
+
+def build_question_response(data, question, difficulty_level):
+    """Attach the question to the candidate's assessment and serialize both"""
+    # Get job description and candidate from request data
+    job_id = data.get('job_id')
+    candidate_id = data.get('candidate_id')
+    
+    assessment = None
+    if job_id and candidate_id:
+        try:
+            job_description = JobDescription.objects.get(id=job_id)
+            candidate = Candidate.objects.get(user_id=candidate_id)
+            
+            # Create an assessment if one doesn't exist for this candidate and job
+            assessment, created = Assessment.objects.get_or_create(
+                candidate=candidate,
+                job_description=job_description,
+                is_complete=False,
+                defaults={'current_question': question}
+            )
+            
+            if not created:
+                # Update the current question if assessment already exists
+                assessment.current_question = question
+                assessment.save()
+        except (JobDescription.DoesNotExist, Candidate.DoesNotExist) as e:
+            logger.error(f"Error getting job or candidate: {e}")
+    
+    return serialize_question(question, assessment, difficulty_level, expand=wants_expanded(data))
+
+
+def wants_expanded(data):
+    return str(data.get('expand', '')).lower() in ('1', 'true', 'yes')
+
+
+def serialize_question(question, assessment, difficulty_level, expand=False):
+    """
+    Lean per-question payload: the ids and fields the interview UI renders.
+    With ``expand`` the full question and nested assessment (candidate, job
+    description and skills) are included as well.
+    """
+    response_data = {
+        "id": question.id,
+        "question": question.question_text,
+        "category": question.category.name,
+        "difficulty": difficulty_level.capitalize(),
+    }
+    if assessment:
+        response_data["assessment_id"] = assessment.id
+    if expand:
+        response_data["question_data"] = QuestionSerializer(question).data
+        if assessment:
+            response_data["assessment"] = AssessmentSerializer(assessment).data
+    return response_data
+
 
 @csrf_exempt
 @require_POST
-def generate_question(request):
+async def generate_question(request):
     logger.info("Generating question...")
     try:
         data = json.loads(request.body)
+        # The expanded payload can be requested in the body or as ?expand=1
+        data.setdefault('expand', request.GET.get('expand', ''))
         context = data.get('context', '')
         previous_questions = data.get('previousQuestions', [])
         difficulty = data.get('difficulty', 'beginner')
 
-        prompt = f"""
-        You are an expert technical interviewer for a tech company.
-
-        Job Context: {context}
-
-        Previous questions asked in this interview: {previous_questions}
-
-        Generate a {difficulty} level technical interview question that:
-        1. Is relevant to the job context
-        2. Is different from previous questions
-        3. Tests both theoretical knowledge and practical application
-        4. Can be answered in a few paragraphs
-
-        Format your response as JSON with these fields:
-        - question: the interview question
-        - category: the technical category (e.g., "Frontend Development", "Algorithms", etc.)
-        - difficulty: the difficulty level ("Beginner", "Intermediate", "Advanced")
-        """
-
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt,
-        )
-        response_text = response.text
-
-        if not response_text:
-            raise ValueError("Empty response")
-
-        if not response_text.strip().startswith('{'):
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            response_text = response_text[start_idx:end_idx]
-
-        result = json.loads(response_text)
+        # Serve a pre-generated question for this job when one is ready
+        job_id = data.get('job_id')
+        if job_id and not str(job_id).isdigit():
+            return JsonResponse({"error": "job_id must be an integer"}, status=400)
+        if job_id and getattr(settings, 'QUESTION_POOL_ENABLED', True):
+            level = DIFFICULTY_LEVELS.get(str(difficulty).lower(), 2)
+            question = await question_pool.pop(job_id, level, previous_questions)
+            if question is not None:
+                response_data = await sync_to_async(build_question_response)(data, question, DIFFICULTY_LABELS[level])
+                return JsonResponse(response_data)
+
+        prompt = build_question_prompt(context, previous_questions, difficulty)
+        response_text = await llm_client.generate(prompt)
+
+        result = parse_question_reply(response_text)
         question_text = result.get("question", "")
         category_name = result.get("category", "General")
         difficulty_level = result.get("difficulty", "Beginner").lower()
         
-        # Store the question in the database
-        category, _ = Category.objects.get_or_create(name=category_name)
-        question = Question.objects.create(
-            question_number=f"Q{Question.objects.count() + 1}",
-            question_text=question_text,
-            answer="",  # Placeholder for now
-            category=category,
-            difficulty={"beginner": 2, "intermediate": 1, "advanced": 0}.get(difficulty_level, 2),
-        )
-        
-        # Get job description and candidate from request data
-        job_id = data.get('job_id')
-        candidate_id = data.get('candidate_id')
-        
-        assessment = None
-        if job_id and candidate_id:
-            try:
-                job_description = JobDescription.objects.get(id=job_id)
-                candidate = Candidate.objects.get(user_id=candidate_id)
-                
-                # Create an assessment if one doesn't exist for this candidate and job
-                assessment, created = Assessment.objects.get_or_create(
-                    candidate=candidate,
-                    job_description=job_description,
-                    is_complete=False,
-                    defaults={'current_question': question}
-                )
-                
-                if not created:
-                    # Update the current question if assessment already exists
-                    assessment.current_question = question
-                    assessment.save()
-            except (JobDescription.DoesNotExist, Candidate.DoesNotExist) as e:
-                logger.error(f"Error getting job or candidate: {e}")
-        
-        # Serialize the data
-        question_serz = QuestionSerializer(question)
-        assessment_serz = None
-        if assessment:
-            assessment_serz = AssessmentSerializer(assessment)
-        
-        response_data = {
-            "id": question.id,
-            "question": question.question_text,
-            "category": category.name,
-            "difficulty": difficulty_level.capitalize(),
-            "question_data": question_serz.data
-        }
-        
-        if assessment_serz:
-            response_data["assessment"] = assessment_serz.data
-            response_data["assessment_id"] = assessment.id
-            
+        response_data = await store_generated_question(data, question_text, category_name, difficulty_level)
         return JsonResponse(response_data)
 
     except Exception as e:
@@ -130,9 +145,42 @@ def generate_question(request):
             "error": "Failed to generate question."
         })
 
+
+@sync_to_async
+def find_question_and_assessment(question_id, question_text, assessment_id):
+    """Look up (or create) the answered question and the assessment it belongs to"""
+    # Handle case where frontend sends text instead of ID
+    question = None
+    if not question_id and question_text:
+        # Try to find question by text
+        question = Question.objects.filter(question_text__icontains=question_text[:100]).first()
+        if not question:
+            # Create a new question if we can't find an existing one
+            category, _ = Category.objects.get_or_create(name="General")
+            question = create_generated_question(
+                question_number=next_question_number(),
+                question_text=question_text,
+                answer="",
+                category=category,
+                difficulty=1  # Medium difficulty
+            )
+    else:
+        question = Question.objects.filter(id=question_id).first()
+    
+    # Get assessment object
+    if isinstance(assessment_id, dict) and 'id' in assessment_id:
+        # Handle case where frontend sends assessment object
+        assessment_id = assessment_id['id']
+        
+    assessment = None
+    if assessment_id:
+        assessment = Assessment.objects.filter(id=assessment_id).first()
+    return question, assessment
+
+
 @csrf_exempt
 @require_POST
-def evaluate_answer(request):
+async def evaluate_answer(request):
     logger.info("Evaluating answer...")
     try:
         data = json.loads(request.body)
@@ -143,32 +191,7 @@ def evaluate_answer(request):
         
         logger.info(f"Data received: question_id={question_id}, assessment_id={assessment_id}")
         
-        # Handle case where frontend sends text instead of ID
-        question = None
-        if not question_id and question_text:
-            # Try to find question by text
-            question = Question.objects.filter(question_text__icontains=question_text[:100]).first()
-            if not question:
-                # Create a new question if we can't find an existing one
-                category, _ = Category.objects.get_or_create(name="General")
-                question = Question.objects.create(
-                    question_number=f"Q{Question.objects.count() + 1}",
-                    question_text=question_text,
-                    answer="",
-                    category=category,
-                    difficulty=1  # Medium difficulty
-                )
-        else:
-            question = Question.objects.filter(id=question_id).first()
-        
-        # Get assessment object
-        if isinstance(assessment_id, dict) and 'id' in assessment_id:
-            # Handle case where frontend sends assessment object
-            assessment_id = assessment_id['id']
-            
-        assessment = None
-        if assessment_id:
-            assessment = Assessment.objects.filter(id=assessment_id).first()
+        question, assessment = await find_question_and_assessment(question_id, question_text, assessment_id)
         
         if not question:
             return JsonResponse({
@@ -177,50 +200,30 @@ def evaluate_answer(request):
                 "feedback": "We couldn't find the question in our system. Please try again."
             }, status=400)
 
-        prompt = f"""
-        You are an expert technical interviewer evaluating a candidate's response.
-
-        Question: {question.question_text}
-
-        Candidate's Answer: {answer_text}
-
-        Evaluate the answer based on:
-        1. Technical accuracy
-        2. Completeness
-        3. Clarity of explanation
-        4. Practical application
-
-        Format your response as JSON with these fields:
-        - score: a value between 0.0 and 1.0 representing the quality of the answer
-        - feedback: constructive feedback for the candidate (2-3 sentences)
-        """
-
-        gemini_response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt,
-        )
-        response_text = gemini_response.text
-
-        if not response_text.strip().startswith('{'):
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            if start_idx >= 0 and end_idx > start_idx:
-                response_text = response_text[start_idx:end_idx]
-            else:
-                response_text = '{"score": 0.5, "feedback": "Could not generate proper feedback."}'
-
-        result = json.loads(response_text)
-        score = max(0, min(1, float(result.get("score", 0.5))))
-        feedback = result.get("feedback", "Your answer shows understanding but could be improved with more specific details.")
+        # Clear matches and misses against the reference answer are graded locally
+        graded = None
+        if getattr(settings, 'GRADING_TIERED', True):
+            graded = await answer_grader.triage(question.answer, answer_text)
+        if graded is not None:
+            score, feedback = graded
+            tier = "embedding"
+        else:
+            prompt = build_evaluation_prompt(question.question_text, answer_text)
+            response_text = await llm_client.generate(prompt, cached=True)
+            score, feedback = parse_evaluation_reply(response_text)
+            tier = "llm"
 
-        # Store the candidate's answer in the database if we have an assessment
+        # Store the candidate's answer in the database if we have an assessment;
+        # a resubmission of the same question replaces the earlier answer
         if assessment:
-            CandidateAnswer.objects.create(
+            await CandidateAnswer.objects.aupdate_or_create(
                 assessment=assessment,
                 question=question,
-                answer_text=answer_text,
-                similarity_score=score,
-                question_score=score,
+                defaults={
+                    'answer_text': answer_text,
+                    'similarity_score': score,
+                    'question_score': score,
+                },
             )
             logger.info(f"Stored answer for assessment {assessment.id}, question {question.id}")
         else:
@@ -229,6 +232,7 @@ def evaluate_answer(request):
         return JsonResponse({
             "score": score,
             "feedback": feedback,
+            "tier": tier,
             "question_id": question.id,
             "assessment_id": assessment.id if assessment else None
         })
@@ -241,9 +245,181 @@ def evaluate_answer(request):
             "feedback": "There was an error evaluating your answer. The system will continue, but please notify the administrator."
         })
 
+
+def parse_batch_answers(answers):
+    """
+    Validate the submitted answers into (question id, answer text) pairs.
+    Raises ValueError naming the first malformed item.
+    """
+    if not isinstance(answers, list):
+        raise ValueError("answers must be a list")
+    parsed = []
+    for index, item in enumerate(answers):
+        if not isinstance(item, dict):
+            raise ValueError(f"answers[{index}] must be an object")
+        question_id = item.get('question_id')
+        if isinstance(question_id, bool) or not str(question_id).isdigit():
+            raise ValueError(f"answers[{index}].question_id must be an integer")
+        answer_text = item.get('answer', '')
+        if not isinstance(answer_text, str):
+            raise ValueError(f"answers[{index}].answer must be a string")
+        parsed.append((int(question_id), answer_text))
+    return parsed
+
+
+@sync_to_async
+def load_batch_items(assessment_id, answers):
+    """Resolve the (question, answer text) pairs to grade, from the validated answers or the stored ones"""
+    assessment = Assessment.objects.filter(id=assessment_id).first() if assessment_id else None
+    if not answers and assessment:
+        stored = assessment.answers.select_related('question').order_by('id')
+        return assessment, [(answer.question, answer.answer_text) for answer in stored]
+
+    questions = Question.objects.in_bulk([question_id for question_id, _ in answers])
+    items = [(questions[question_id], answer_text) for question_id, answer_text in answers if question_id in questions]
+    return assessment, items
+
+
+@sync_to_async
+def store_batch_answers(assessment, graded):
+    """Write every graded answer with one upserting bulk_create"""
+    # One row per question, the last submitted answer wins; a repeated key in a
+    # single INSERT ... ON CONFLICT DO UPDATE is an error on PostgreSQL
+    latest = {question.id: (question, answer_text, score) for question, answer_text, score, _ in graded}
+    CandidateAnswer.objects.bulk_create(
+        [
+            CandidateAnswer(
+                assessment=assessment,
+                question=question,
+                answer_text=answer_text,
+                similarity_score=score,
+                question_score=score,
+            )
+            for question, answer_text, score in latest.values()
+        ],
+        update_conflicts=True,
+        unique_fields=['assessment', 'question'],
+        update_fields=['answer_text', 'similarity_score', 'question_score'],
+    )
+
+
+async def grade_chunk(items):
+    """Score one chunk of (question, answer text) pairs with a single LLM call"""
+    prompt = build_batch_evaluation_prompt(
+        [(index + 1, question.question_text, answer_text) for index, (question, answer_text) in enumerate(items)]
+    )
+    item_ids = range(1, len(items) + 1)
+    try:
+        response_text = await llm_client.generate(prompt, cached=True)
+        scored = parse_batch_evaluation_reply(response_text, item_ids)
+    except Exception as e:
+        logger.error(f"Error grading batch of {len(items)} answers: {e}")
+        scored = {}
+    return [scored.get(item_id) for item_id in item_ids]
+
+
 @csrf_exempt
 @require_POST
-def generate_result(request):
+async def evaluate_answers_batch(request):
+    """Grade many answers of an assessment with one LLM call per chunk"""
+    logger.info("Evaluating answers in batch...")
+    try:
+        data = json.loads(request.body)
+        assessment_id = data.get('assessment_id')
+        if assessment_id and not str(assessment_id).isdigit():
+            return JsonResponse({"error": "assessment_id must be an integer"}, status=400)
+        chunk_size = data.get('chunk_size', getattr(settings, 'LLM_BATCH_CHUNK_SIZE', 10))
+        if isinstance(chunk_size, bool) or not str(chunk_size).isdigit():
+            return JsonResponse({"error": "chunk_size must be a positive integer"}, status=400)
+        chunk_size = max(1, min(int(chunk_size), getattr(settings, 'LLM_BATCH_MAX_CHUNK_SIZE', 25)))
+        try:
+            answers = parse_batch_answers(data.get('answers', []))
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        assessment, items = await load_batch_items(assessment_id, answers)
+        if not items:
+            return JsonResponse({"error": "No answers to evaluate"}, status=400)
+
+        # Only answers the embedding tier cannot decide are sent to the LLM
+        if getattr(settings, 'GRADING_TIERED', True):
+            scored = await asyncio.gather(*(answer_grader.triage(question.answer, answer_text)
+                                            for question, answer_text in items))
+        else:
+            scored = [None] * len(items)
+        escalated = [index for index, entry in enumerate(scored) if entry is None]
+        tiers = ["embedding" if entry is not None else "llm" for entry in scored]
+
+        chunks = [escalated[start:start + chunk_size] for start in range(0, len(escalated), chunk_size)]
+        chunk_results = await asyncio.gather(*(grade_chunk([items[index] for index in chunk]) for chunk in chunks))
+        for chunk, chunk_scores in zip(chunks, chunk_results):
+            for index, entry in zip(chunk, chunk_scores):
+                scored[index] = entry
+
+        graded = []
+        results = []
+        for (question, answer_text), entry, tier in zip(items, scored, tiers):
+            score, feedback = entry or (0.5, "We couldn't evaluate this answer automatically.")
+            # The placeholder is only reported; storing it would overwrite a real grade during an LLM outage
+            if entry is not None:
+                graded.append((question, answer_text, score, feedback))
+            results.append({
+                "question_id": question.id,
+                "score": score,
+                "feedback": feedback,
+                "evaluated": entry is not None,
+                "tier": tier,
+            })
+
+        if assessment:
+            await store_batch_answers(assessment, graded)
+            logger.info(f"Stored {len(graded)} answers for assessment {assessment.id}")
+        else:
+            logger.warning("No assessment found, answers not stored in database")
+
+        return JsonResponse({
+            "assessment_id": assessment.id if assessment else None,
+            "results": results,
+            "average_score": sum(result["score"] for result in results) / len(results),
+            "llm_calls": len(chunks),
+        })
+
+    except Exception as e:
+        logger.error(f"Error in evaluate_answers_batch: {e}")
+        return JsonResponse({"error": "Failed to evaluate answers."}, status=500)
+
+
+@sync_to_async
+def find_result_assessment(assessment_id, candidate_id, job_details):
+    """Find the assessment being finished, creating one from candidate and job if needed"""
+    # Find the assessment if provided
+    assessment = None
+    if assessment_id:
+        try:
+            assessment = Assessment.objects.get(id=assessment_id)
+        except Assessment.DoesNotExist:
+            logger.warning(f"Assessment with ID {assessment_id} not found")
+    
+    # If no assessment was found but we have a candidate_id and job_details, try to find or create one
+    if not assessment and candidate_id and job_details.get('id'):
+        try:
+            candidate = Candidate.objects.get(user_id=candidate_id)
+            job_description = JobDescription.objects.get(id=job_details.get('id'))
+            
+            assessment, created = Assessment.objects.get_or_create(
+                candidate=candidate,
+                job_description=job_description,
+                is_complete=False
+            )
+            logger.info(f"{'Created' if created else 'Found'} assessment for candidate {candidate_id} and job {job_details.get('id')}")
+        except (Candidate.DoesNotExist, JobDescription.DoesNotExist) as e:
+            logger.warning(f"Could not find or create assessment: {e}")
+    return assessment
+
+
+@csrf_exempt
+@require_POST
+async def generate_result(request):
     logger.info("Generating final result...")
     try:
         data = json.loads(request.body)
@@ -252,28 +428,7 @@ def generate_result(request):
         assessment_id = data.get('assessment_id')
         candidate_id = data.get('candidate_id')
 
-        # Find the assessment if provided
-        assessment = None
-        if assessment_id:
-            try:
-                assessment = Assessment.objects.get(id=assessment_id)
-            except Assessment.DoesNotExist:
-                logger.warning(f"Assessment with ID {assessment_id} not found")
-        
-        # If no assessment was found but we have a candidate_id and job_details, try to find or create one
-        if not assessment and candidate_id and job_details.get('id'):
-            try:
-                candidate = Candidate.objects.get(user_id=candidate_id)
-                job_description = JobDescription.objects.get(id=job_details.get('id'))
-                
-                assessment, created = Assessment.objects.get_or_create(
-                    candidate=candidate,
-                    job_description=job_description,
-                    is_complete=False
-                )
-                logger.info(f"{'Created' if created else 'Found'} assessment for candidate {candidate_id} and job {job_details.get('id')}")
-            except (Candidate.DoesNotExist, JobDescription.DoesNotExist) as e:
-                logger.warning(f"Could not find or create assessment: {e}")
+        assessment = await find_result_assessment(assessment_id, candidate_id, job_details)
 
         job_title = job_details.get('title', 'Unknown Position')
         job_description = job_details.get('description', '')
@@ -320,11 +475,7 @@ def generate_result(request):
         - summary: a detailed summary of the candidate's performance (3-5 sentences)
         """
 
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt,
-        )
-        response_text = response.text
+        response_text = await llm_client.generate(prompt, cached=True)
 
         if not response_text.strip().startswith('{'):
             start_idx = response_text.find('{')
@@ -352,7 +503,7 @@ def generate_result(request):
             assessment.weighted_score = avg_score
             assessment.hire_decision = result["decision"] == "Hire"
             assessment.hire_probability = result["probability"][1]  # Probability of hire
-            assessment.save()
+            await assessment.asave()
             logger.info(f"Assessment {assessment.id} updated with result: {result['decision']}, score: {avg_score}")
             
             # Include assessment ID in response
@@ -0,0 +1,72 @@
+import threading
+
+from django.conf import settings
+
+from AiQuetionare.embeddings import answer_similarity
+from AiQuetionare.inference import run_inference
+
+CLEAR_MATCH_FEEDBACK = "Your answer covers the key points expected for this question."
+CLEAR_MISS_FEEDBACK = ("Your answer misses most of the key points expected for this question. "
+                       "Review the core concepts and try to be more specific.")
+
+
+class AnswerGrader:
+    """
+    First grading tier: embedding similarity against the reference answer.
+
+    Answers whose similarity falls outside the ``(low, high)`` band are
+    clear matches or clear misses and are scored locally with the similarity
+    itself. ``triage`` returns None for answers inside the band and for
+    questions without a reference answer; those go to the LLM. Per-tier
+    counts are kept for the stats endpoint.
+    """
+
+    def __init__(self, low=0.45, high=0.8, model=None):
+        self.low = low
+        self.high = high
+        self.model = model
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    async def triage(self, reference_answer, answer_text):
+        """(score, feedback) decided by the embedding tier, or None to escalate to the LLM"""
+        if not (reference_answer or '').strip():
+            self._count('no_reference')
+            return None
+
+        similarity = await run_inference(answer_similarity, reference_answer, answer_text or '', self.model)
+        if self.low < similarity < self.high:
+            self._count('ambiguous')
+            return None
+
+        self._count('local')
+        score = max(0.0, min(1.0, similarity))
+        return score, CLEAR_MATCH_FEEDBACK if similarity >= self.high else CLEAR_MISS_FEEDBACK
+
+    def reset_stats(self):
+        with self._lock:
+            self.local = 0
+            self.ambiguous = 0
+            self.no_reference = 0
+
+    def stats(self):
+        with self._lock:
+            graded = self.local + self.ambiguous + self.no_reference
+            return {
+                'band': [self.low, self.high],
+                'embedding': self.local,
+                'llm_ambiguous': self.ambiguous,
+                'llm_no_reference': self.no_reference,
+                'embedding_hit_rate': self.local / graded if graded else 0.0,
+                'llm_rate': (self.ambiguous + self.no_reference) / graded if graded else 0.0,
+            }
+
+
+answer_grader = AnswerGrader(
+    low=getattr(settings, 'GRADING_SIMILARITY_LOW', 0.45),
+    high=getattr(settings, 'GRADING_SIMILARITY_HIGH', 0.8),
+)
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceBusy(Exception):
+    """Raised when a task waited longer than the queue timeout for a slot"""
+
+
+def _timed_call(fn, args, kwargs):
+    # Runs inside the worker thread; wall-clock stamps so they compare with the caller's
+    started_at = time.time()
+    result = fn(*args, **kwargs)
+    return result, started_at, time.time()
+
+
+class InferenceExecutor:
+    """
+    Bounded pool for CPU-bound model work (embedding, scoring, predict_proba)
+    awaited from async consumers, so it never runs on the event loop.
+
+    At most ``max_workers + max_queue`` tasks are admitted at once; further
+    callers wait for a slot and get ``InferenceBusy`` after ``queue_timeout``
+    seconds. Queue-wait (call to start) and run time are tracked per task.
+    """
+
+    def __init__(self, max_workers=2, max_queue=32, queue_timeout=30.0):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='inference')
+        return self._pool
+
+    def _semaphore(self, loop):
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_workers + self.max_queue)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def run(self, fn, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` on the pool and return its result"""
+        loop = asyncio.get_running_loop()
+        called_at = time.time()
+        semaphore = self._semaphore(loop)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            with self._stats_lock:
+                self.rejected += 1
+            raise InferenceBusy(f"No inference slot free after {self.queue_timeout}s")
+
+        with self._stats_lock:
+            self.in_flight += 1
+        try:
+            result, started_at, finished_at = await loop.run_in_executor(
+                self._get_pool(), _timed_call, fn, args, kwargs
+            )
+            self._record(started_at - called_at, finished_at - started_at)
+            return result
+        except Exception:
+            with self._stats_lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._stats_lock:
+                self.in_flight -= 1
+            semaphore.release()
+
+    def _record(self, wait, run):
+        with self._stats_lock:
+            self.completed += 1
+            self.total_wait += wait
+            self.total_run += run
+            self.max_wait = max(self.max_wait, wait)
+            self.max_run = max(self.max_run, run)
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.completed = 0
+            self.failed = 0
+            self.rejected = 0
+            self.in_flight = 0
+            self.total_wait = 0.0
+            self.total_run = 0.0
+            self.max_wait = 0.0
+            self.max_run = 0.0
+
+    def stats(self):
+        """Queue and run time metrics for tuning worker and queue sizes"""
+        with self._stats_lock:
+            completed = self.completed
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'in_flight': self.in_flight,
+                'completed': completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'avg_wait_ms': 1000 * self.total_wait / completed if completed else 0.0,
+                'max_wait_ms': 1000 * self.max_wait,
+                'avg_run_ms': 1000 * self.total_run / completed if completed else 0.0,
+                'max_run_ms': 1000 * self.max_run,
+            }
+
+    def shutdown(self, wait=True):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
+
+
+inference_executor = InferenceExecutor(
+    max_workers=getattr(settings, 'INFERENCE_MAX_WORKERS', 2),
+    max_queue=getattr(settings, 'INFERENCE_MAX_QUEUE', 32),
+    queue_timeout=getattr(settings, 'INFERENCE_QUEUE_TIMEOUT', 30.0),
+)
+
+
+async def run_inference(fn, *args, **kwargs):
+    """Await CPU-bound ``fn`` on the shared inference executor"""
+    return await inference_executor.run(fn, *args, **kwargs)
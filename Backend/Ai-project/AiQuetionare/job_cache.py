@@ -0,0 +1,96 @@
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from AiQuetionare.models import JobDescription
+from AiQuetionare.serializer import JobDescriptionSerializer
+
+
+class JobDescriptionCache:
+    """
+    Read model of job descriptions kept in the Django cache.
+
+    Each entry holds the serialized job description, its skill names, an
+    ETag over the serialized data and the last-modified time, so detail and
+    listing requests for a cached job need no database work. Entries are
+    dropped by the signal handlers when a job description is saved or
+    deleted, or its skills change, once the writing transaction commits;
+    ``timeout`` only bounds how long unused entries stay around.
+    """
+
+    def __init__(self, timeout=3600, backend=None):
+        self.timeout = timeout
+        self.backend = backend or cache
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _count(self, **counters):
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    @staticmethod
+    def key(job_id):
+        return f"job_description:v1:{job_id}"
+
+    @staticmethod
+    def build(job):
+        data = JobDescriptionSerializer(job).data
+        body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True).encode('utf-8')
+        return {
+            'data': data,
+            'skills': [skill['name'] for skill in data['skills']],
+            'etag': hashlib.sha256(body).hexdigest()[:32],
+            'updated_at': job.updated_at,
+        }
+
+    def get_many(self, job_ids):
+        """Entries for ``job_ids`` in the given order, loading every miss with one prefetching query"""
+        job_ids = [int(job_id) for job_id in job_ids]
+        cached = self.backend.get_many([self.key(job_id) for job_id in job_ids])
+        entries = {job_id: cached[self.key(job_id)] for job_id in job_ids if self.key(job_id) in cached}
+        missing = [job_id for job_id in job_ids if job_id not in entries]
+        self._count(hits=len(entries), misses=len(missing))
+
+        if missing:
+            loaded = {job.id: self.build(job) for job in JobDescription.objects.filter(id__in=missing).prefetch_related('skills')}
+            self.backend.set_many({self.key(job_id): entry for job_id, entry in loaded.items()}, self.timeout)
+            entries.update(loaded)
+        return [entries[job_id] for job_id in job_ids if job_id in entries]
+
+    def get(self, job_id):
+        """Entry for one job description, or None if it does not exist"""
+        entries = self.get_many([job_id])
+        return entries[0] if entries else None
+
+    def skills(self, job_id):
+        entry = self.get(job_id)
+        return entry['skills'] if entry else []
+
+    def invalidate(self, *job_ids):
+        """Drop the entries when the current transaction commits, or right away outside one"""
+        # Dropped any earlier, a concurrent reader could refill an entry from the pre-commit rows
+        keys = [self.key(job_id) for job_id in job_ids]
+        transaction.on_commit(lambda: self.backend.delete_many(keys))
+        self._count(invalidations=len(job_ids))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'timeout': self.timeout,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+job_cache = JobDescriptionCache(timeout=getattr(settings, 'JOB_DESCRIPTION_CACHE_TIMEOUT', 3600))
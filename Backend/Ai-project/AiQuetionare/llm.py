@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import threading
+import time
+import weakref
+
+import httpx
+from decouple import config
+from django.conf import settings
+from google import genai
+from google.genai import types
+
+from AiQuetionare.llm_cache import llm_cache
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBusy(Exception):
+    """Raised when a call waited longer than the queue timeout for a concurrency slot"""
+
+
+class LLMTimeout(Exception):
+    """Raised when the model did not answer within the per-call timeout"""
+
+
+class _LoopState:
+    """HTTP pool, Gemini client and concurrency limit owned by one event loop"""
+
+    def __init__(self, owner):
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=owner.max_connections,
+                max_keepalive_connections=owner.max_connections,
+            ),
+            timeout=owner.timeout,
+        )
+        http_options = types.HttpOptions(
+            base_url=owner.base_url or None,
+            timeout=int(owner.timeout * 1000),
+            httpx_async_client=self.http,
+        )
+        self.client = genai.Client(api_key=owner.api_key, http_options=http_options)
+        self.semaphore = asyncio.Semaphore(owner.max_concurrency)
+
+
+class AsyncLLMClient:
+    """
+    Async Gemini client shared by the LLM-backed views.
+
+    Every event loop gets one pooled ``httpx.AsyncClient`` (keep-alive
+    connections are reused across requests) and a semaphore admitting at most
+    ``max_concurrency`` calls; further callers wait up to ``queue_timeout``
+    seconds and then get ``LLMBusy``. Each call is bounded by ``timeout``.
+
+    Set ``base_url`` to point the client at ``stub_llm.py`` for offline load
+    tests. With a ``cache`` (see llm_cache.LLMResponseCache), calls made with
+    ``cached=True`` return a stored reply for an identical prompt without
+    contacting the model.
+    """
+
+    def __init__(self, model='gemini-2.0-flash', api_key=None, base_url=None, timeout=30.0,
+                 max_concurrency=16, max_connections=32, queue_timeout=10.0, cache=None):
+        self.model = model
+        self._api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.queue_timeout = queue_timeout
+        self.cache = cache
+        self._states = weakref.WeakKeyDictionary()
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def api_key(self):
+        if self._api_key is None:
+            # The stub server ignores the key, so a missing one is fine offline
+            self._api_key = config('GEMINI_API_KEY', default='stub' if self.base_url else '')
+        return self._api_key
+
+    def _state(self):
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = _LoopState(self)
+            self._states[loop] = state
+        return state
+
+    async def generate(self, prompt, model=None, timeout=None, cached=False):
+        """Send ``prompt`` to the model and return the response text"""
+        model = model or self.model
+        cache = self.cache if cached else None
+        if cache is not None:
+            response_text = await cache.get(model, prompt)
+            if response_text is not None:
+                return response_text
+
+        response_text = await self._call(prompt, model, timeout)
+        if cache is not None and response_text:
+            await cache.set(model, prompt, response_text)
+        return response_text
+
+    async def _acquire(self, state):
+        try:
+            await asyncio.wait_for(state.semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            with self._stats_lock:
+                self.rejected += 1
+            raise LLMBusy(f"No LLM slot free after {self.queue_timeout}s")
+        with self._stats_lock:
+            self.in_flight += 1
+
+    async def _call(self, prompt, model, timeout):
+        state = self._state()
+        timeout = self.timeout if timeout is None else timeout
+        await self._acquire(state)
+        started_at = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                state.client.aio.models.generate_content(model=model, contents=prompt),
+                timeout,
+            )
+            self._record(time.perf_counter() - started_at)
+            return response.text
+        except asyncio.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise LLMTimeout(f"LLM call timed out after {timeout}s")
+        except Exception:
+            with self._stats_lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._stats_lock:
+                self.in_flight -= 1
+            state.semaphore.release()
+
+    async def stream(self, prompt, model=None, timeout=None, cached=False):
+        """
+        Yield the response text in chunks as the model produces them.
+
+        ``timeout`` bounds the whole stream; the time to the first chunk is
+        recorded as TTFB. A cached reply is yielded as a single chunk.
+        """
+        model = model or self.model
+        cache = self.cache if cached else None
+        if cache is not None:
+            response_text = await cache.get(model, prompt)
+            if response_text is not None:
+                yield response_text
+                return
+
+        state = self._state()
+        timeout = self.timeout if timeout is None else timeout
+        await self._acquire(state)
+        started_at = time.perf_counter()
+        deadline = started_at + timeout
+        chunks = []
+        try:
+            response_stream = await asyncio.wait_for(
+                state.client.aio.models.generate_content_stream(model=model, contents=prompt),
+                timeout,
+            )
+            iterator = response_stream.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), max(deadline - time.perf_counter(), 0))
+                except StopAsyncIteration:
+                    break
+                if not chunks:
+                    self._record_ttfb(time.perf_counter() - started_at)
+                chunks.append(chunk.text or '')
+                yield chunks[-1]
+            self._record(time.perf_counter() - started_at)
+        except asyncio.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise LLMTimeout(f"LLM stream timed out after {timeout}s")
+        except Exception:
+            with self._stats_lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._stats_lock:
+                self.in_flight -= 1
+            state.semaphore.release()
+
+        if cache is not None and chunks:
+            await cache.set(model, prompt, ''.join(chunks))
+
+    def _record_ttfb(self, ttfb):
+        with self._stats_lock:
+            self.streams += 1
+            self.total_ttfb += ttfb
+            self.max_ttfb = max(self.max_ttfb, ttfb)
+
+    def _record(self, latency):
+        with self._stats_lock:
+            self.completed += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.completed = 0
+            self.failed = 0
+            self.timeouts = 0
+            self.rejected = 0
+            self.in_flight = 0
+            self.total_latency = 0.0
+            self.max_latency = 0.0
+            self.streams = 0
+            self.total_ttfb = 0.0
+            self.max_ttfb = 0.0
+
+    def stats(self):
+        """Call counts and latency for tuning concurrency and timeouts"""
+        with self._stats_lock:
+            completed = self.completed
+            return {
+                'model': self.model,
+                'max_concurrency': self.max_concurrency,
+                'in_flight': self.in_flight,
+                'completed': completed,
+                'failed': self.failed,
+                'timeouts': self.timeouts,
+                'rejected': self.rejected,
+                'avg_latency_ms': 1000 * self.total_latency / completed if completed else 0.0,
+                'max_latency_ms': 1000 * self.max_latency,
+                'streams': self.streams,
+                'avg_ttfb_ms': 1000 * self.total_ttfb / self.streams if self.streams else 0.0,
+                'max_ttfb_ms': 1000 * self.max_ttfb,
+            }
+
+    async def aclose(self):
+        """Close the connection pool of the running loop"""
+        state = self._states.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state.http.aclose()
+
+
+llm_client = AsyncLLMClient(
+    model=getattr(settings, 'LLM_MODEL', 'gemini-2.0-flash'),
+    base_url=getattr(settings, 'LLM_BASE_URL', None),
+    timeout=getattr(settings, 'LLM_TIMEOUT', 30.0),
+    max_concurrency=getattr(settings, 'LLM_MAX_CONCURRENCY', 16),
+    max_connections=getattr(settings, 'LLM_MAX_CONNECTIONS', 32),
+    queue_timeout=getattr(settings, 'LLM_QUEUE_TIMEOUT', 10.0),
+    cache=llm_cache if getattr(settings, 'LLM_CACHE_ENABLED', True) else None,
+)
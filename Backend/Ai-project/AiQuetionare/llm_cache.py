@@ -0,0 +1,113 @@
+import hashlib
+import re
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from AiQuetionare.models import LLMResponse
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace so re-indented or re-wrapped prompts share a cache entry"""
+    return _WHITESPACE.sub(' ', prompt).strip()
+
+
+def prompt_key(model, prompt):
+    """Hash of the model name and normalized prompt a response was generated from"""
+    return hashlib.sha256(f"{model}\n{normalize_prompt(prompt)}".encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Database-backed cache of model replies keyed by ``prompt_key``.
+
+    Entries older than ``ttl`` seconds are treated as misses and overwritten.
+    Every ``evict_every`` stores in a process, expired rows and the least
+    recently used ones beyond ``max_entries`` are deleted, so the table may
+    briefly overshoot the cap. Hit/miss counters are kept per process.
+    """
+
+    def __init__(self, ttl=7 * 24 * 3600, max_entries=10000, evict_every=100):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def _count(self, **counters):
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    async def get(self, model, prompt):
+        """Cached response text for this prompt, or None"""
+        key = prompt_key(model, prompt)
+        entry = await LLMResponse.objects.filter(key=key).only('response_text', 'created_at').afirst()
+        now = timezone.now()
+        if entry is None or entry.created_at < now - timedelta(seconds=self.ttl):
+            self._count(misses=1, expired=int(entry is not None))
+            return None
+        await LLMResponse.objects.filter(key=key).aupdate(last_used_at=now, hits=F('hits') + 1)
+        self._count(hits=1)
+        return entry.response_text
+
+    async def set(self, model, prompt, response_text):
+        now = timezone.now()
+        await LLMResponse.objects.aupdate_or_create(
+            key=prompt_key(model, prompt),
+            defaults={'model': model, 'response_text': response_text, 'created_at': now, 'last_used_at': now, 'hits': 0},
+        )
+        # Eviction costs a delete and a count over the table, so it is amortized over writes
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.evict_every == 0
+        if due:
+            await self.evict()
+
+    async def evict(self):
+        """Drop expired rows, then the least recently used ones beyond ``max_entries``"""
+        deleted, _ = await LLMResponse.objects.filter(
+            created_at__lt=timezone.now() - timedelta(seconds=self.ttl)
+        ).adelete()
+        if await LLMResponse.objects.acount() > self.max_entries:
+            stale = [pk async for pk in LLMResponse.objects.order_by('-last_used_at')
+                     .values_list('pk', flat=True)[self.max_entries:]]
+            extra, _ = await LLMResponse.objects.filter(pk__in=stale).adelete()
+            deleted += extra
+        if deleted:
+            self._count(evicted=deleted)
+
+    def clear(self):
+        LLMResponse.objects.all().delete()
+        with self._lock:
+            self.hits = self.misses = self.expired = self.evicted = self._writes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'ttl': self.ttl,
+                'max_entries': self.max_entries,
+                'evict_every': self.evict_every,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'evicted': self.evicted,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+llm_cache = LLMResponseCache(
+    ttl=getattr(settings, 'LLM_CACHE_TTL', 7 * 24 * 3600),
+    max_entries=getattr(settings, 'LLM_CACHE_MAX_ENTRIES', 10000),
+    evict_every=getattr(settings, 'LLM_CACHE_EVICT_EVERY', 100),
+)
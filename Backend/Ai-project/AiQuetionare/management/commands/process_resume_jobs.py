@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from AiQuetionare.resume_jobs import resume_jobs
+
+
+class Command(BaseCommand):
+    help = "Parse pending resume jobs, e.g. ones left behind when the web process restarted"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep polling for new jobs instead of exiting")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between polls with --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            requeued = resume_jobs.requeue_stale()
+            if requeued:
+                self.stdout.write(f"Requeued {requeued} stale resume jobs")
+            processed = sum(resume_jobs.run(job_id) for job_id in resume_jobs.pending_ids())
+            if processed:
+                self.stdout.write(f"Processed {processed} resume jobs")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
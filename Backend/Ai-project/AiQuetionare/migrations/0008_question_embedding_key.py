@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AiQuetionare', '0007_delete_mlmodel_delete_questionrelationship'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='embedding_key',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AiQuetionare', '0009_llmresponse'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='in_pool',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='job_description',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pooled_questions', to='AiQuetionare.jobdescription'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['job_description', 'difficulty', 'in_pool'], name='AiQuetionar_job_des_3beb65_idx'),
+        ),
+    ]
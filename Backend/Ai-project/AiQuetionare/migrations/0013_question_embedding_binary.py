@@ -0,0 +1,55 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:04
+
+import numpy as np
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def pack_embeddings(apps, schema_editor):
+    Question = apps.get_model('AiQuetionare', 'Question')
+    batch = []
+    for question in Question.objects.exclude(embedding=None).only('id', 'embedding').iterator(chunk_size=BATCH_SIZE):
+        question.embedding_packed = np.asarray(question.embedding, dtype='<f4').tobytes()
+        batch.append(question)
+        if len(batch) == BATCH_SIZE:
+            Question.objects.bulk_update(batch, ['embedding_packed'])
+            batch = []
+    Question.objects.bulk_update(batch, ['embedding_packed'])
+
+
+def unpack_embeddings(apps, schema_editor):
+    Question = apps.get_model('AiQuetionare', 'Question')
+    batch = []
+    for question in Question.objects.exclude(embedding_packed=None).only('id', 'embedding_packed').iterator(chunk_size=BATCH_SIZE):
+        question.embedding = np.frombuffer(question.embedding_packed, dtype='<f4').tolist()
+        batch.append(question)
+        if len(batch) == BATCH_SIZE:
+            Question.objects.bulk_update(batch, ['embedding'])
+            batch = []
+    Question.objects.bulk_update(batch, ['embedding'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AiQuetionare', '0012_parsed_resume_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='embedding_packed',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.RunPython(pack_embeddings, unpack_embeddings),
+        migrations.RemoveField(
+            model_name='question',
+            name='embedding',
+        ),
+        migrations.RenameField(
+            model_name='question',
+            old_name='embedding_packed',
+            new_name='embedding',
+        ),
+    ]
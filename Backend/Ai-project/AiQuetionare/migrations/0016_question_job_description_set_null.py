@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AiQuetionare', '0015_cache_table'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='question',
+            name='job_description',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pooled_questions', to='AiQuetionare.jobdescription'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AiQuetionare', '0016_question_job_description_set_null'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='llmresponse',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
@@ -104,14 +104,31 @@ class Question(models.Model):
     answer = models.TextField()
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='questions')
     difficulty = models.IntegerField(choices=DIFFICULTY_CHOICES)
-    embedding = models.JSONField(null=True, blank=True)  # Store embedding as JSON
-    
+    embedding = models.BinaryField(null=True, blank=True)  # Packed little-endian float32 vector
+    embedding_key = models.CharField(max_length=64, null=True, blank=True)  # Hash of model name + text the embedding was built from
+    # Job description whose pool generated the question; served questions join the shared bank,
+    # so deleting the job only unlinks them and keeps the candidates' answers
+    job_description = models.ForeignKey(JobDescription, on_delete=models.SET_NULL, null=True, blank=True, related_name='pooled_questions')
+    in_pool = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [models.Index(fields=['job_description', 'difficulty', 'in_pool'])]
+
     def __str__(self):
         return f"Q{self.question_number}: {self.question_text[:50]}..."
 
 
 
 
+class Sequence(models.Model):
+    """Named counter; values are handed out by AiQuetionare.sequences.allocate"""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
 import uuid
 import os
 def unique_file_path(instance, filename):
@@ -133,6 +150,43 @@ class Candidate(models.Model):
         return self.user.username
 
 
+class ResumeParseJob(models.Model):
+    """Background extraction of a candidate's skills from their uploaded resume"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='resume_jobs')
+    content_hash = models.CharField(max_length=64, blank=True, default='')  # SHA-256 of the uploaded PDF
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Resume job {self.id} for {self.candidate} ({self.status})"
+
+
+class ParsedResume(models.Model):
+    """Skills extracted from a resume, keyed by the SHA-256 of the PDF bytes"""
+    content_hash = models.CharField(max_length=64, unique=True)
+    result = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    hits = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Parsed resume {self.content_hash[:12]}"
+
+
 class Assessment(models.Model):
     """Represents an assessment session for a user"""
     candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='assessments')
@@ -167,3 +221,14 @@ class CandidateAnswer(models.Model):
         return f"Answer for {self.question.question_number} by {self.assessment.candidate}"
 
 
+class LLMResponse(models.Model):
+    """Cached model reply, keyed by a hash of the model name and normalized prompt"""
+    key = models.CharField(max_length=64, unique=True)
+    model = models.CharField(max_length=100)
+    response_text = models.TextField()
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+    hits = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.model} response {self.key[:12]}"
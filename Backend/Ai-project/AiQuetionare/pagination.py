@@ -0,0 +1,27 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class LinkHeaderCursorPagination(CursorPagination):
+    """
+    Cursor pagination that keeps the response body a plain list, so existing
+    clients keep working; the next/previous page URLs go in a ``Link`` header.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_paginated_response(self, data):
+        links = [
+            f'<{url}>; rel="{rel}"'
+            for url, rel in ((self.get_next_link(), 'next'), (self.get_previous_link(), 'prev'))
+            if url
+        ]
+        headers = {'Link': ', '.join(links)} if links else None
+        return Response(data, headers=headers)
+
+
+class JobDescriptionPagination(LinkHeaderCursorPagination):
+    page_size = getattr(settings, 'JOB_DESCRIPTION_PAGE_SIZE', 20)
+    # Newest first; the primary key keeps the order stable and the cursor unique
+    ordering = '-id'
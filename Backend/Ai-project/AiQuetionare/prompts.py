@@ -0,0 +1,257 @@
+import json
+import re
+
+# Prompts shared by the Gemini views, the question pool and the interview consumer
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+_JSON_OBJECT = re.compile(r'\{[^{}]*\}')
+
+
+def build_question_prompt(context, previous_questions, difficulty):
+    return f"""
+        You are an expert technical interviewer for a tech company.
+
+        Job Context: {context}
+
+        Previous questions asked in this interview: {previous_questions}
+
+        Generate a {difficulty} level technical interview question that:
+        1. Is relevant to the job context
+        2. Is different from previous questions
+        3. Tests both theoretical knowledge and practical application
+        4. Can be answered in a few paragraphs
+
+        Format your response as JSON with these fields:
+        - question: the interview question
+        - category: the technical category (e.g., "Frontend Development", "Algorithms", etc.)
+        - difficulty: the difficulty level ("Beginner", "Intermediate", "Advanced")
+        """
+
+
+def parse_question_reply(response_text):
+    """Decode the model's JSON reply to a generated question"""
+    if not response_text:
+        raise ValueError("Empty response")
+
+    if not response_text.strip().startswith('{'):
+        start_idx = response_text.find('{')
+        end_idx = response_text.rfind('}') + 1
+        response_text = response_text[start_idx:end_idx]
+    return json.loads(response_text)
+
+
+def build_question_batch_prompt(context, existing_questions, difficulty, count):
+    """Prompt for ``count`` new questions in one reply, none repeating ``existing_questions``"""
+    return f"""
+        You are an expert technical interviewer for a tech company.
+
+        Job Context: {context}
+
+        Questions already prepared for this job: {existing_questions}
+
+        Generate {count} distinct {difficulty} level technical interview questions that:
+        1. Are relevant to the job context
+        2. Are different from each other and from the questions already prepared
+        3. Test both theoretical knowledge and practical application
+        4. Can each be answered in a few paragraphs
+
+        Format your response as a JSON array with {count} objects with these fields:
+        - question: the interview question
+        - category: the technical category (e.g., "Frontend Development", "Algorithms", etc.)
+        - difficulty: the difficulty level ("Beginner", "Intermediate", "Advanced")
+        """
+
+
+def parse_question_batch_reply(response_text):
+    """
+    Decode the model's reply to a batch question prompt into a list of dicts.
+
+    Accepts a JSON array, an object wrapping one, a single object or loose
+    objects in prose; entries without a question are dropped.
+    """
+    if not response_text:
+        raise ValueError("Empty response")
+
+    entries = None
+    start_idx = response_text.find('[')
+    end_idx = response_text.rfind(']') + 1
+    if start_idx >= 0 and end_idx > start_idx:
+        try:
+            entries = json.loads(response_text[start_idx:end_idx])
+        except ValueError:
+            entries = None
+    if not isinstance(entries, list):
+        entries = []
+        for match in _JSON_OBJECT.finditer(response_text):
+            try:
+                entries.append(json.loads(match.group(0)))
+            except ValueError:
+                continue
+    return [entry for entry in entries if isinstance(entry, dict) and entry.get("question")]
+
+
+def build_evaluation_prompt(question_text, answer_text):
+    return f"""
+        You are an expert technical interviewer evaluating a candidate's response.
+
+        Question: {question_text}
+
+        Candidate's Answer: {answer_text}
+
+        Evaluate the answer based on:
+        1. Technical accuracy
+        2. Completeness
+        3. Clarity of explanation
+        4. Practical application
+
+        Format your response as JSON with these fields:
+        - score: a value between 0.0 and 1.0 representing the quality of the answer
+        - feedback: constructive feedback for the candidate (2-3 sentences)
+        """
+
+
+def parse_evaluation_reply(response_text):
+    """Decode the model's evaluation into a (score clamped to [0, 1], feedback) pair"""
+    if not response_text.strip().startswith('{'):
+        start_idx = response_text.find('{')
+        end_idx = response_text.rfind('}') + 1
+        if start_idx >= 0 and end_idx > start_idx:
+            response_text = response_text[start_idx:end_idx]
+        else:
+            response_text = '{"score": 0.5, "feedback": "Could not generate proper feedback."}'
+
+    result = json.loads(response_text)
+    score = max(0, min(1, float(result.get("score", 0.5))))
+    feedback = result.get("feedback", "Your answer shows understanding but could be improved with more specific details.")
+    return score, feedback
+
+
+class JsonFieldStream:
+    """
+    Incrementally decode one string field of a JSON object arriving in chunks.
+
+    ``feed`` returns the newly decoded part of the field's value, so text can
+    be forwarded before the object is complete. Escapes split across chunks
+    are held back until the rest arrives.
+    """
+
+    def __init__(self, field):
+        self.key = f'"{field}"'
+        self.buffer = ''
+        self.position = None  # index of the next undecoded character of the value
+        self.done = False
+
+    def _value_start(self):
+        key_at = self.buffer.find(self.key)
+        if key_at < 0:
+            return None
+        index = key_at + len(self.key)
+        while index < len(self.buffer) and self.buffer[index] in ' \t\r\n:':
+            index += 1
+        if index < len(self.buffer) and self.buffer[index] == '"':
+            return index + 1
+        return None
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        if self.done:
+            return ''
+        if self.position is None:
+            self.position = self._value_start()
+            if self.position is None:
+                return ''
+
+        decoded = []
+        buffer, index = self.buffer, self.position
+        while index < len(buffer):
+            char = buffer[index]
+            if char == '"':
+                self.done = True
+                index += 1
+                break
+            if char != '\\':
+                decoded.append(char)
+                index += 1
+                continue
+            if index + 1 >= len(buffer):
+                break  # escape continues in the next chunk
+            escape = buffer[index + 1]
+            if escape == 'u':
+                if index + 6 > len(buffer):
+                    break
+                decoded.append(chr(int(buffer[index + 2:index + 6], 16)))
+                index += 6
+            else:
+                decoded.append(_ESCAPES.get(escape, escape))
+                index += 2
+        self.position = index
+        return ''.join(decoded)
+
+
+def build_batch_evaluation_prompt(items):
+    """Prompt scoring several answers at once; ``items`` are (item id, question text, answer text)"""
+    answers = "\n\n".join(
+        f"Item {item_id}\nQuestion: {question_text}\nCandidate's Answer: {answer_text}"
+        for item_id, question_text, answer_text in items
+    )
+    return f"""
+        You are an expert technical interviewer evaluating a candidate's responses.
+
+        {answers}
+
+        Evaluate each answer independently based on:
+        1. Technical accuracy
+        2. Completeness
+        3. Clarity of explanation
+        4. Practical application
+
+        Format your response as a JSON array with one object per item, in any order, with these fields:
+        - id: the item number
+        - score: a value between 0.0 and 1.0 representing the quality of the answer
+        - feedback: constructive feedback for the candidate (2-3 sentences)
+        """
+
+
+def parse_batch_evaluation_reply(response_text, item_ids):
+    """
+    Map item id -> (score, feedback) for every item the model scored.
+
+    Accepts a JSON array, an object wrapping one, or loose objects in prose;
+    entries without a usable id are matched by position. Items that cannot
+    be parsed are left out so the caller can report them.
+    """
+    entries = None
+    start_idx = response_text.find('[')
+    end_idx = response_text.rfind(']') + 1
+    if start_idx >= 0 and end_idx > start_idx:
+        try:
+            entries = json.loads(response_text[start_idx:end_idx])
+        except ValueError:
+            entries = None
+    if not isinstance(entries, list):
+        # Fall back to whatever well-formed objects the reply contains
+        entries = []
+        for match in _JSON_OBJECT.finditer(response_text):
+            try:
+                entries.append(json.loads(match.group(0)))
+            except ValueError:
+                continue
+
+    item_ids = list(item_ids)
+    results = {}
+    for position, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            continue
+        try:
+            item_id = int(entry.get("id"))
+        except (TypeError, ValueError):
+            item_id = item_ids[position] if position < len(item_ids) else None
+        if item_id not in item_ids or item_id in results:
+            continue
+        try:
+            score = max(0, min(1, float(entry.get("score"))))
+        except (TypeError, ValueError):
+            continue
+        feedback = entry.get("feedback") or "Your answer shows understanding but could be improved with more specific details."
+        results[item_id] = (score, feedback)
+    return results
@@ -0,0 +1,181 @@
+import heapq
+import threading
+
+import numpy as np
+
+
+class QuestionGraph:
+    """
+    Immutable category -> difficulty chain over the question bank.
+
+    Nodes are row positions in the question embedding index. Within each
+    category questions are chained from easiest to hardest; adjacency is
+    stored CSR-style, the out-neighbours of node ``n`` being
+    ``indices[indptr[n]:indptr[n + 1]]``.
+    """
+
+    def __init__(self, indptr, indices, node_category, category_names, category_nodes, version):
+        self.indptr = indptr
+        self.indices = indices
+        self.node_category = node_category
+        self.category_names = category_names
+        self.category_ids = {name: i for i, name in enumerate(category_names)}
+        self.category_nodes = category_nodes
+        self.version = version
+        self._adjacency = None
+        for array in (indptr, indices, node_category, *category_nodes):
+            array.setflags(write=False)
+
+    @classmethod
+    def build(cls, index):
+        """Compile the graph for the current contents of a QuestionEmbeddingIndex"""
+        n_nodes = len(index.question_ids)
+        category_names = sorted(set(index.categories))
+        category_ids = {name: i for i, name in enumerate(category_names)}
+        node_category = np.fromiter((category_ids[name] for name in index.categories), dtype=np.int32, count=n_nodes)
+        difficulties = np.asarray(index.difficulties, dtype=np.int32)
+
+        # Order nodes by category, then easiest first (Easy=2 ... Hard=0), then position
+        order = np.lexsort((np.arange(n_nodes), -difficulties, node_category))
+        boundaries = np.flatnonzero(np.diff(node_category[order])) + 1
+        category_nodes = [chain.astype(np.int32) for chain in np.split(order, boundaries)] if n_nodes else []
+
+        # Every node but the last of its chain has exactly one edge, to the next harder question
+        out_degree = np.zeros(n_nodes, dtype=np.int32)
+        targets = np.full(n_nodes, -1, dtype=np.int32)
+        for chain in category_nodes:
+            out_degree[chain[:-1]] = 1
+            targets[chain[:-1]] = chain[1:]
+        indptr = np.zeros(n_nodes + 1, dtype=np.int32)
+        np.cumsum(out_degree, out=indptr[1:])
+        indices = targets[targets >= 0] if n_nodes else np.zeros(0, dtype=np.int32)
+        # targets are laid out by source node, so the filtered order matches indptr
+        return cls(indptr, indices.astype(np.int32), node_category, category_names, category_nodes, index.version)
+
+    def __len__(self):
+        return len(self.node_category)
+
+    @property
+    def adjacency(self):
+        """Neighbour lists as plain Python lists, built once for the search inner loop"""
+        if self._adjacency is None:
+            self._adjacency = [chunk.tolist() for chunk in np.split(self.indices, self.indptr[1:-1])] if len(self) else []
+        return self._adjacency
+
+    def neighbors(self, node):
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def get(self, node, default=()):
+        """Dict-style access so the graph can stand in for an adjacency dict"""
+        if 0 <= node < len(self.node_category):
+            return self.neighbors(node)
+        return default
+
+    def start_node(self, category, asked=None):
+        """Easiest question of a category, skipping asked ones when possible"""
+        category_id = self.category_ids.get(category)
+        if category_id is None:
+            return None
+        chain = self.category_nodes[category_id]
+        if asked is not None:
+            unasked = chain[~asked[chain]]
+            if len(unasked):
+                return int(unasked[0])
+        return int(chain[0])
+
+
+_cached = (None, None)  # ((index id, index version), graph)
+_cache_lock = threading.Lock()
+
+
+def get_question_graph(index):
+    """Return the compiled graph for ``index``, rebuilding only when the bank version changed"""
+    global _cached
+    key = (id(index), index.version)
+    cached_key, graph = _cached
+    if cached_key != key:
+        with _cache_lock:
+            cached_key, graph = _cached
+            if cached_key != key:
+                graph = QuestionGraph.build(index)
+                _cached = (key, graph)
+    return graph
+
+
+class QuestionSelector:
+    """
+    A* search for the next question over a QuestionGraph.
+
+    Scores are a NumPy array and the asked set a boolean mask, both indexed by
+    node id. Asked nodes are walked through but never returned, so one pass
+    finds the best unasked reachable node. The g-score/came-from buffers and
+    the heap are reused between searches; only entries touched by the previous
+    search are reset.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._g_score = [-1] * len(graph)
+        self._came_from = [-1] * len(graph)
+        self._touched = []
+        self._heap = []
+
+    def _reset(self):
+        g_score, came_from = self._g_score, self._came_from
+        for node in self._touched:
+            g_score[node] = -1
+            came_from[node] = -1
+        self._touched.clear()
+        self._heap.clear()
+
+    def search(self, start, scores, asked, threshold=0.99):
+        """
+        Args:
+            start: starting node id
+            scores: array of scores for each node
+            asked: boolean array, True for nodes that have already been asked
+            threshold: early stopping threshold if a node is highly similar
+
+        Returns:
+            (path, best_node, best_score); best_node is None when every node
+            reachable from ``start`` has been asked.
+        """
+        self._reset()
+        adjacency = self.graph.adjacency
+        g_score, came_from, touched, open_set = self._g_score, self._came_from, self._touched, self._heap
+        score_of, is_asked = scores.item, asked.item
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        g_score[start] = 0
+        touched.append(start)
+        heappush(open_set, (1 - score_of(start), start))
+        best_node = None
+        best_score = float('-inf')
+
+        while open_set:
+            _, current = heappop(open_set)
+
+            if not is_asked(current):
+                score = score_of(current)
+                if score > best_score:
+                    best_node = current
+                    best_score = score
+                if score >= threshold:
+                    break
+
+            tentative_g_score = g_score[current] + 1
+            for neighbor in adjacency[current]:
+                known = g_score[neighbor]
+                if known < 0 or tentative_g_score < known:
+                    if known < 0:
+                        touched.append(neighbor)
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    heappush(open_set, (tentative_g_score + (1 - score_of(neighbor)), neighbor))
+
+        if best_node is None:
+            return [], None, None
+        path = [best_node]
+        while path[-1] != start:
+            path.append(came_from[path[-1]])
+        return path[::-1], best_node, best_score
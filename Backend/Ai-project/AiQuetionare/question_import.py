@@ -0,0 +1,264 @@
+import codecs
+import io
+import itertools
+import logging
+import threading
+import time
+
+import pandas as pd
+from django.db import transaction
+
+from AiQuetionare.embeddings import ensure_question_embeddings
+from AiQuetionare.models import Category, Question
+from AiQuetionare.sequences import reserve_question_numbers
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ['Question Number', 'Question', 'Answer', 'Category', 'Difficulty']
+DIFFICULTY_VALUES = {'Easy': 2, 'Medium': 1, 'Hard': 0}
+TEXT_COLUMNS = {
+    'question_number': 'Question Number',
+    'question_text': 'Question',
+    'answer': 'Answer',
+    'category': 'Category',
+}
+UPDATE_FIELDS = ['question_text', 'answer', 'category', 'difficulty']
+# Column limits of the target tables; a longer value would abort the whole bulk insert
+MAX_LENGTHS = {
+    'question_number': Question._meta.get_field('question_number').max_length,
+    'category': Category._meta.get_field('name').max_length,
+}
+
+
+def clean_rows(df):
+    """
+    Vectorized cleanup of a CSV frame. Returns (valid rows, per-row errors);
+    ``row`` holds the line number in the file, counting the header as line 1.
+    """
+    frame = pd.DataFrame({
+        field: df[column].astype('string').str.strip().replace('', pd.NA)
+        for field, column in TEXT_COLUMNS.items()
+    })
+    frame['difficulty'] = df['Difficulty'].map(DIFFICULTY_VALUES)
+    frame['row'] = df.index + 2
+
+    missing = frame[list(TEXT_COLUMNS)].isna()
+    missing['difficulty'] = df['Difficulty'].isna()
+    bad_difficulty = frame['difficulty'].isna() & df['Difficulty'].notna()
+    too_long = pd.DataFrame({
+        field: (frame[field].str.len() > limit).fillna(False).astype(bool) for field, limit in MAX_LENGTHS.items()
+    })
+    # PostgreSQL text columns cannot store NUL characters
+    has_nul = pd.DataFrame({
+        field: frame[field].str.contains('\x00', regex=False).fillna(False).astype(bool) for field in TEXT_COLUMNS
+    })
+    invalid = missing.any(axis=1) | bad_difficulty | too_long.any(axis=1) | has_nul.any(axis=1)
+
+    errors = []
+    for row, flags, long_flags, nul_flags, difficulty, is_bad in zip(
+        frame.loc[invalid, 'row'], missing[invalid].to_dict('records'), too_long[invalid].to_dict('records'),
+        has_nul[invalid].to_dict('records'), df.loc[invalid, 'Difficulty'], bad_difficulty[invalid],
+    ):
+        problems = []
+        if any(flags.values()):
+            problems.append(f"missing {', '.join(field for field, is_missing in flags.items() if is_missing)}")
+        if is_bad:
+            problems.append(f"invalid difficulty '{difficulty}'")
+        problems.extend(
+            f"{field} longer than {MAX_LENGTHS[field]} characters" for field, is_long in long_flags.items() if is_long
+        )
+        problems.extend(f"NUL character in {field}" for field, has in nul_flags.items() if has)
+        errors.append(f"Row {row}: {'; '.join(problems)}")
+    return frame[~invalid], errors
+
+
+def resolve_categories(names):
+    """Category rows by name, creating the missing ones with a single bulk insert"""
+    names = set(names)
+    categories = {category.name: category for category in Category.objects.filter(name__in=names)}
+    missing = [Category(name=name) for name in names - categories.keys()]
+    if missing:
+        Category.objects.bulk_create(missing, ignore_conflicts=True)
+        categories = {category.name: category for category in Category.objects.filter(name__in=names)}
+    return categories
+
+
+def upsert_questions(rows, stats, chunk_size=1000):
+    """
+    Insert or update the cleaned rows by question number, ``chunk_size`` rows
+    per statement. Rows whose number belongs to a pooled or job-generated
+    question are reported as errors and left out.
+    """
+    # A question number repeated in the file keeps its last row, as sequential updates would
+    unique = rows.drop_duplicates('question_number', keep='last')
+    stats['updated'] += len(rows) - len(unique)
+    categories = resolve_categories(unique['category'].unique())
+
+    imported = []
+    for start in range(0, len(unique), chunk_size):
+        chunk = unique.iloc[start:start + chunk_size]
+        existing = {
+            number: in_pool or job_id is not None
+            for number, in_pool, job_id in Question.objects.filter(
+                question_number__in=chunk['question_number'].tolist()
+            ).values_list('question_number', 'in_pool', 'job_description_id')
+        }
+        # Pooled and job-generated questions share the number space but are not the CSV's to overwrite
+        generated = chunk['question_number'].map(lambda number: existing.get(number, False)).astype(bool)
+        for row, number in zip(chunk.loc[generated, 'row'], chunk.loc[generated, 'question_number']):
+            stats['errors'].append(f"Row {row}: question number {number} belongs to a generated question")
+        stats['failed'] += int(generated.sum())
+        chunk = chunk[~generated]
+        numbers = chunk['question_number'].tolist()
+        if not numbers:
+            continue
+        Question.objects.bulk_create(
+            [
+                Question(
+                    question_number=number,
+                    question_text=text,
+                    answer=answer,
+                    category=categories[category],
+                    difficulty=int(difficulty),
+                )
+                for number, text, answer, category, difficulty in zip(
+                    numbers, chunk['question_text'], chunk['answer'], chunk['category'], chunk['difficulty']
+                )
+            ],
+            update_conflicts=True,
+            unique_fields=['question_number'],
+            update_fields=UPDATE_FIELDS,
+        )
+        # Within the import's transaction, so generated questions never take an imported number
+        reserve_question_numbers(numbers)
+        updated = sum(number in existing for number in numbers)
+        stats['created'] += len(numbers) - updated
+        stats['updated'] += updated
+        imported.append(numbers)
+    return imported
+
+
+def new_stats():
+    return {'created': 0, 'updated': 0, 'failed': 0, 'embedded': 0, 'errors': []}
+
+
+def embed_imported(imported, stats):
+    """Embed new or changed questions now so the interview never has to"""
+    try:
+        for numbers in imported:
+            stats['embedded'] += ensure_question_embeddings(Question.objects.filter(question_number__in=numbers))
+    except Exception as e:
+        stats['errors'].append(f"Embedding: {str(e)}")
+
+
+def import_rows(df, stats, chunk_size=1000):
+    """Validate a frame and upsert its valid rows in one transaction; returns the imported question numbers"""
+    rows, errors = clean_rows(df)
+    stats['failed'] += len(errors)
+    stats['errors'].extend(errors)
+    with transaction.atomic():
+        return upsert_questions(rows, stats, chunk_size)
+
+
+def import_questions(df, chunk_size=1000):
+    """
+    Import a validated question CSV frame: rows with missing fields are
+    reported and skipped, the rest are upserted in one transaction, then the
+    new or changed questions are embedded.
+    """
+    stats = new_stats()
+    embed_imported(import_rows(df, stats, chunk_size), stats)
+    return stats
+
+
+def detect_encoding(file, block_size=1 << 16):
+    """
+    'utf-8-sig' when the whole upload decodes as UTF-8, else 'latin-1'.
+    Decodes block by block, so memory use does not depend on the file size.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        for block in file.chunks(block_size):
+            decoder.decode(block)
+        decoder.decode(b'', final=True)
+        return 'utf-8-sig'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+def open_csv(file):
+    """Text stream over an uploaded CSV, decoded incrementally from the start of the file"""
+    encoding = detect_encoding(file)
+    file.seek(0)
+    return io.TextIOWrapper(file.file, encoding=encoding, newline='')
+
+
+class ImportProgress:
+    """Rows and chunks processed by the streaming imports currently running"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._running = {}
+        self.completed = 0
+        self.rows_imported = 0
+
+    def start(self, name):
+        import_id = next(self._ids)
+        with self._lock:
+            self._running[import_id] = {'file': name, 'rows': 0, 'chunks': 0, 'started_at': time.time()}
+        return import_id
+
+    def advance(self, import_id, rows):
+        with self._lock:
+            progress = self._running[import_id]
+            progress['rows'] += rows
+            progress['chunks'] += 1
+            self.rows_imported += rows
+            return dict(progress)
+
+    def finish(self, import_id):
+        with self._lock:
+            self._running.pop(import_id, None)
+            self.completed += 1
+
+    def stats(self):
+        with self._lock:
+            now = time.time()
+            return {
+                'completed': self.completed,
+                'rows_imported': self.rows_imported,
+                'running': [
+                    {'file': p['file'], 'rows': p['rows'], 'chunks': p['chunks'], 'elapsed_s': round(now - p['started_at'], 1)}
+                    for p in self._running.values()
+                ],
+            }
+
+
+import_progress = ImportProgress()
+
+
+def stream_questions(csv_stream, name='', chunk_rows=5000, chunk_size=1000):
+    """
+    Import a question CSV ``chunk_rows`` rows at a time, taking each chunk
+    through validate, upsert and embed before the next one is read, so only
+    one chunk is held in memory. Each chunk commits on its own; rows with an
+    unknown difficulty are reported per row instead of rejecting the file.
+    Raises ValueError if required columns are missing.
+    """
+    stats = new_stats()
+    stats.update(rows=0, chunks=0)
+    import_id = import_progress.start(name)
+    try:
+        for df in pd.read_csv(csv_stream, chunksize=chunk_rows):
+            missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+            if missing_columns:
+                raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+            embed_imported(import_rows(df, stats, chunk_size), stats)
+            stats['rows'] += len(df)
+            stats['chunks'] += 1
+            progress = import_progress.advance(import_id, len(df))
+            logger.info(f"Question import {name}: {progress['rows']} rows in {progress['chunks']} chunks")
+    finally:
+        import_progress.finish(import_id)
+    return stats
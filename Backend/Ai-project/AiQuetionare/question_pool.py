@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from AiQuetionare.embeddings import ensure_question_embeddings, question_index
+from AiQuetionare.llm import llm_client
+from AiQuetionare.models import Category, JobDescription, Question
+from AiQuetionare.prompts import build_question_batch_prompt, parse_question_batch_reply
+from AiQuetionare.sequences import next_question_numbers
+
+logger = logging.getLogger(__name__)
+
+DIFFICULTY_LEVELS = {"beginner": 2, "intermediate": 1, "advanced": 0}
+DIFFICULTY_LABELS = {value: label for label, value in DIFFICULTY_LEVELS.items()}
+
+
+def normalize_question(text):
+    return ' '.join(str(text).lower().split())
+
+
+class QuestionPool:
+    """
+    Pre-generated questions per job description and difficulty.
+
+    Pooled questions are ordinary Question rows with ``in_pool`` set. Serving
+    one claims it with a conditional UPDATE, so concurrent requests never get
+    the same row, and skips texts the candidate has already seen. Whenever a
+    pool drops below ``low_water`` a background task on the event loop asks
+    the model, in one call, for the questions missing to refill it to
+    ``size``, listing the pooled ones so they are not repeated. Duplicates
+    are dropped and the shortfall asked for again, up to ``refill_rounds``
+    calls; at most one refill runs per pool.
+    """
+
+    def __init__(self, low_water=3, size=10, client=None, claim_attempts=5, refill_rounds=3):
+        self.low_water = low_water
+        self.size = size
+        self.client = client or llm_client
+        self.claim_attempts = claim_attempts
+        self.refill_rounds = refill_rounds
+        self._refills = {}
+        self._lock = threading.Lock()
+        self.served = 0
+        self.empty = 0
+        self.generated = 0
+        self.failed = 0
+
+    def _count(self, **counters):
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def _claim(self, job_id, difficulty, previous_questions):
+        previous = {normalize_question(text) for text in previous_questions}
+        candidates = (
+            Question.objects.filter(job_description_id=job_id, difficulty=difficulty, in_pool=True)
+            .exclude(question_text__in=[str(text) for text in previous_questions])
+            .select_related('category')
+            .order_by('id')
+        )
+        # Walk the pool in batches of claim_attempts until a row is claimed or the pool is exhausted
+        last_id = 0
+        while True:
+            batch = list(candidates.filter(id__gt=last_id)[:self.claim_attempts])
+            if not batch:
+                return None
+            for question in batch:
+                if normalize_question(question.question_text) in previous:
+                    continue
+                # Only one request can flip in_pool for a given row
+                if Question.objects.filter(pk=question.pk, in_pool=True).update(in_pool=False):
+                    question.in_pool = False
+                    # The claimed row joins the question bank; update() sends no post_save.
+                    # It was embedded when generated, so the index folds it in on its next periodic refresh
+                    question_index.invalidate(deferred=True)
+                    return question
+            last_id = batch[-1].id
+
+    async def pop(self, job_id, difficulty, previous_questions=()):
+        """Claim a pooled question the candidate has not seen, or None when the pool is empty"""
+        job_id = int(job_id)
+        question = await sync_to_async(self._claim)(job_id, difficulty, previous_questions)
+        self._count(served=int(question is not None), empty=int(question is None))
+        self.schedule_refill(job_id, difficulty)
+        return question
+
+    def schedule_refill(self, job_id, difficulty):
+        """Start a background refill of this pool unless one is already running"""
+        key = (int(job_id), difficulty)
+        task = self._refills.get(key)
+        if task is not None and not task.done():
+            return task
+        task = asyncio.get_running_loop().create_task(self.refill(job_id, difficulty))
+        self._refills[key] = task
+        task.add_done_callback(self._refill_done)
+        return task
+
+    def _refill_done(self, task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Question pool refill failed: {task.exception()}")
+
+    def _pool_state(self, job_id, difficulty):
+        job = JobDescription.objects.filter(id=job_id).prefetch_related('skills').first()
+        if job is None:
+            return None, 0, []
+        context = f"{job.title}\n{job.description}\nRequired skills: {', '.join(skill.name for skill in job.skills.all())}"
+        pooled = list(Question.objects.filter(
+            job_description=job, difficulty=difficulty, in_pool=True
+        ).values_list('question_text', flat=True))
+        return context, len(pooled), pooled
+
+    def _store(self, job_id, difficulty, generated):
+        existing = {normalize_question(text) for text in Question.objects.filter(
+            job_description_id=job_id, difficulty=difficulty, in_pool=True
+        ).values_list('question_text', flat=True)}
+        categories = {}
+        questions = []
+        for question_text, category_name in generated:
+            key = normalize_question(question_text)
+            if not key or key in existing:
+                continue
+            existing.add(key)
+            if category_name not in categories:
+                categories[category_name], _ = Category.objects.get_or_create(name=category_name)
+            questions.append(Question(
+                question_text=question_text,
+                answer="",
+                category=categories[category_name],
+                difficulty=difficulty,
+                job_description_id=job_id,
+                in_pool=True,
+            ))
+        for question, number in zip(questions, next_question_numbers(len(questions))):
+            question.question_number = number
+        Question.objects.bulk_create(questions)
+        return [question.pk for question in questions]
+
+    def _embed(self, question_ids):
+        # Encoded ahead of time so a claimed question never makes the index rebuild call the model
+        try:
+            ensure_question_embeddings(Question.objects.filter(id__in=question_ids))
+        except Exception as e:
+            logger.warning(f"Could not embed pooled questions: {e}")
+
+    async def _generate(self, context, pooled, difficulty, count):
+        prompt = build_question_batch_prompt(context, pooled, DIFFICULTY_LABELS.get(difficulty, "beginner"), count)
+        try:
+            results = parse_question_batch_reply(await self.client.generate(prompt))
+        except Exception as e:
+            self._count(failed=1)
+            logger.warning(f"Discarding generated pool questions: {e}")
+            return []
+        return [(result["question"], result.get("category", "General")) for result in results[:count]]
+
+    async def refill(self, job_id, difficulty):
+        """Generate questions until the pool is back at ``size``; returns how many were added"""
+        context, available, pooled = await sync_to_async(self._pool_state)(job_id, difficulty)
+        if context is None or available >= self.low_water:
+            return 0
+
+        question_ids = []
+        for _ in range(self.refill_rounds):
+            generated = await self._generate(context, pooled, difficulty, self.size - available)
+            added = await sync_to_async(self._store)(job_id, difficulty, generated)
+            if not added:
+                break
+            question_ids.extend(added)
+            context, available, pooled = await sync_to_async(self._pool_state)(job_id, difficulty)
+            if context is None or available >= self.size:
+                break
+
+        if question_ids:
+            # Off the shared sync thread: encoding takes longer than the database work around it
+            await sync_to_async(self._embed, thread_sensitive=False)(question_ids)
+        created = len(question_ids)
+        self._count(generated=created)
+        logger.info(f"Added {created} questions to the pool of job {job_id}, difficulty {difficulty}")
+        return created
+
+    def stats(self):
+        with self._lock:
+            requests = self.served + self.empty
+            return {
+                'low_water': self.low_water,
+                'size': self.size,
+                'served': self.served,
+                'empty': self.empty,
+                'generated': self.generated,
+                'failed': self.failed,
+                'hit_rate': self.served / requests if requests else 0.0,
+                'refills_running': sum(not task.done() for task in self._refills.values()),
+            }
+
+
+question_pool = QuestionPool(
+    low_water=getattr(settings, 'QUESTION_POOL_LOW_WATER', 3),
+    size=getattr(settings, 'QUESTION_POOL_SIZE', 10),
+)
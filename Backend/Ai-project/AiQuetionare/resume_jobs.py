@@ -0,0 +1,203 @@
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from AiQuetionare.fetchskillsfromcv import get_data_from_cv
+from AiQuetionare.models import ParsedResume, ResumeParseJob
+from AiQuetionare.skills import attach_skills
+
+logger = logging.getLogger(__name__)
+
+RESUME_DIR = "media/resumes/"
+
+
+def hash_file(file):
+    """SHA-256 hex digest of an uploaded or stored file, read in chunks"""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks() if hasattr(file, 'chunks') else iter(lambda: file.read(1 << 16), b''):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def store_resume(upload):
+    """
+    Save an uploaded resume under its content hash and return (storage name, hash).
+    Re-uploading the same PDF reuses the stored copy instead of writing another one.
+    """
+    content_hash = hash_file(upload)
+    ext = os.path.splitext(upload.name)[1].lower() or '.pdf'
+    name = os.path.join(RESUME_DIR, f"{content_hash}{ext}")
+    if not default_storage.exists(name):
+        name = default_storage.save(name, upload)
+    return name, content_hash
+
+
+def apply_extracted_skills(candidate, extracted_skills):
+    """Attach the technical skills and CS topics parsed from a resume to the candidate"""
+    attach_skills(candidate, [*extracted_skills.get("technical_skills", []), *extracted_skills.get("cs_topics", [])])
+
+
+class ResumeJobQueue:
+    """
+    Runs ResumeParseJob rows on a local thread pool; the jobs table is the
+    queue, so no external broker is needed.
+
+    ``submit`` hands a job to the pool, typically from ``transaction.on_commit``
+    after the upload is saved. A job is claimed by flipping it from pending to
+    running with a conditional UPDATE, so the in-process pool and the
+    ``process_resume_jobs`` management command can run side by side without
+    parsing a resume twice. Parses are cached by the SHA-256 of the PDF, so an
+    unchanged re-upload never reaches pypdf or the model.
+    """
+
+    def __init__(self, max_workers=2, stale_after=600):
+        self.max_workers = max_workers
+        self.stale_after = stale_after
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='resume')
+        return self._pool
+
+    def enqueue(self, candidate, content_hash=''):
+        """
+        Create the parse job for a candidate's resume. A resume parsed before is
+        answered from the cache right away; otherwise the job is submitted to
+        the pool once the surrounding transaction commits.
+        """
+        job = ResumeParseJob.objects.create(candidate=candidate, content_hash=content_hash)
+        extracted_skills = self.cached_result(content_hash)
+        if extracted_skills is not None:
+            now = timezone.now()
+            apply_extracted_skills(candidate, extracted_skills)
+            job.status = ResumeParseJob.DONE
+            job.result = extracted_skills
+            job.started_at = job.finished_at = now
+            job.save(update_fields=['status', 'result', 'started_at', 'finished_at'])
+            with self._stats_lock:
+                self.completed += 1
+        else:
+            transaction.on_commit(lambda: self.submit(job.id))
+        return job
+
+    def cached_result(self, content_hash, count=True):
+        """Previously extracted skills for this PDF, or None; with ``count`` the lookup goes into the hit rate"""
+        if not content_hash:
+            return None
+        updated = ParsedResume.objects.filter(content_hash=content_hash).update(hits=F('hits') + 1)
+        if count:
+            with self._stats_lock:
+                if updated:
+                    self.cache_hits += 1
+                else:
+                    self.cache_misses += 1
+        if not updated:
+            return None
+        return ParsedResume.objects.values_list('result', flat=True).get(content_hash=content_hash)
+
+    def submit(self, job_id):
+        return self._get_pool().submit(self.run, job_id)
+
+    def run(self, job_id):
+        """Pool entry point: process the job and release this thread's database connection"""
+        try:
+            return self.process(job_id)
+        finally:
+            close_old_connections()
+
+    def process(self, job_id):
+        """Parse the resume of a pending job; returns False if another worker already claimed it"""
+        claimed = ResumeParseJob.objects.filter(id=job_id, status=ResumeParseJob.PENDING).update(
+            status=ResumeParseJob.RUNNING, started_at=timezone.now()
+        )
+        if not claimed:
+            return False
+
+        job = ResumeParseJob.objects.select_related('candidate').get(id=job_id)
+        try:
+            with job.candidate.resume.open('rb') as resume:
+                content_hash = job.content_hash or hash_file(resume)
+                # Another job may have parsed the same PDF while this one was queued;
+                # enqueue already counted this upload towards the hit rate
+                extracted_skills = self.cached_result(content_hash, count=False)
+                if extracted_skills is None:
+                    extracted_skills = get_data_from_cv(resume)
+                    if extracted_skills is None:
+                        raise ValueError("Error extracting skills from CV.")
+                    ParsedResume.objects.get_or_create(content_hash=content_hash, defaults={'result': extracted_skills})
+            apply_extracted_skills(job.candidate, extracted_skills)
+            job.status = ResumeParseJob.DONE
+            job.result = extracted_skills
+            counter = 'completed'
+        except Exception as e:
+            logger.exception(f"Error parsing resume for job {job_id}")
+            job.status = ResumeParseJob.FAILED
+            job.error = str(e)
+            counter = 'failed'
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+        return True
+
+    def requeue_stale(self):
+        """Return jobs left running by a worker that died to the pending state"""
+        cutoff = timezone.now() - timedelta(seconds=self.stale_after)
+        return ResumeParseJob.objects.filter(status=ResumeParseJob.RUNNING, started_at__lt=cutoff).update(
+            status=ResumeParseJob.PENDING, started_at=None
+        )
+
+    def pending_ids(self):
+        return list(ResumeParseJob.objects.filter(status=ResumeParseJob.PENDING).order_by('id').values_list('id', flat=True))
+
+    def stats(self):
+        counts = dict.fromkeys((choice for choice, _ in ResumeParseJob.STATUS_CHOICES), 0)
+        for row in ResumeParseJob.objects.values('status').annotate(total=Count('id')):
+            counts[row['status']] = row['total']
+        entries = ParsedResume.objects.count()
+        with self._stats_lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                'max_workers': self.max_workers,
+                'completed': self.completed,
+                'failed': self.failed,
+                'jobs': counts,
+                'parse_cache': {
+                    'entries': entries,
+                    'hits': self.cache_hits,
+                    'misses': self.cache_misses,
+                    'hit_rate': self.cache_hits / lookups if lookups else 0.0,
+                },
+            }
+
+    def shutdown(self, wait=True):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
+
+
+resume_jobs = ResumeJobQueue(
+    max_workers=getattr(settings, 'RESUME_JOB_WORKERS', 2),
+    stale_after=getattr(settings, 'RESUME_JOB_STALE_AFTER', 600),
+)
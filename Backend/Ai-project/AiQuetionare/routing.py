@@ -1,7 +1,8 @@
 
 from django.urls import path
 # from .consumers import *
-from AiQuetionare.consumer import * 
+# The interview socket is served by the consumer with the session, executor and streaming handlers
+from AiQuetionare.test_consumer import InterviewConsumer
 websocket_urlpatterns = [
     path('interview/<str:job_desc_id>/', InterviewConsumer.as_asgi()),
     # path('chat/group/<str:group_id>/', ChatConsumer.as_asgi()),
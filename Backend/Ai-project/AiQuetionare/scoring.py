@@ -0,0 +1,42 @@
+import numpy as np
+
+JD_WEIGHT = 0.6
+USER_WEIGHT = 0.4
+
+
+def normalize_rows(matrix):
+    """Return a float32 copy of ``matrix`` with every row scaled to unit length"""
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def score_questions(question_matrix, jd_matrix, user_matrix, normalized=False):
+    """
+    Score every question against the job and candidate skills at once.
+
+    Args:
+        question_matrix: (n_questions, dim) question embeddings
+        jd_matrix: (n_jd_skills, dim) job description skill embeddings
+        user_matrix: (n_user_skills, dim) candidate skill embeddings
+        normalized: set when ``question_matrix`` rows are already unit length
+
+    Returns:
+        (jd_score, user_score, score) arrays of length n_questions, where
+        jd_score is the best cosine similarity to any job skill, user_score
+        the mean similarity to the candidate skills and score the 0.6/0.4 blend.
+    """
+    questions = np.asarray(question_matrix, dtype=np.float32) if normalized else normalize_rows(question_matrix)
+    n_questions = questions.shape[0] if questions.size else 0
+
+    jd_score = np.zeros(n_questions, dtype=np.float32)
+    user_score = np.zeros(n_questions, dtype=np.float32)
+    if n_questions and len(jd_matrix):
+        jd_score = (questions @ normalize_rows(jd_matrix).T).max(axis=1)
+    if n_questions and len(user_matrix):
+        # mean of cosines == dot with the mean of the unit skill vectors
+        user_score = questions @ normalize_rows(user_matrix).mean(axis=0)
+
+    score = JD_WEIGHT * jd_score + USER_WEIGHT * user_score
+    return jd_score, user_score, score
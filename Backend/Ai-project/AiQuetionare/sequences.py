@@ -0,0 +1,64 @@
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, IntegerField, Max
+from django.db.models.functions import Cast, Greatest, Substr
+
+from AiQuetionare.models import Question, Sequence
+
+QUESTION_NUMBERS = 'question_number'
+QUESTION_NUMBER_PATTERN = re.compile(r'^Q([0-9]+)$')
+
+
+def allocate(name, count=1, seed=None):
+    """
+    Reserve ``count`` consecutive values of the named sequence and return them
+    as a range. The increment is a single UPDATE on one row, so concurrent
+    callers are serialized by the row lock and never get the same value.
+    ``seed`` is called once, when the sequence does not exist yet, for the
+    value it starts from.
+    """
+    if count < 1:
+        return range(0)
+    with transaction.atomic():
+        if not Sequence.objects.filter(name=name).update(value=F('value') + count):
+            try:
+                with transaction.atomic():
+                    Sequence.objects.create(name=name, value=(seed() if seed else 0) + count)
+            except IntegrityError:
+                # Another caller created it first; take the next block after theirs
+                Sequence.objects.filter(name=name).update(value=F('value') + count)
+        end = Sequence.objects.values_list('value', flat=True).get(name=name)
+    return range(end - count + 1, end + 1)
+
+
+def advance(name, value):
+    """
+    Move the named sequence forward to at least ``value``, so numbers taken
+    elsewhere are never allocated. A sequence that does not exist yet is left
+    alone; its seed will account for them.
+    """
+    Sequence.objects.filter(name=name).update(value=Greatest(F('value'), value))
+
+
+def highest_question_number():
+    """Largest n among existing 'Q<n>' question numbers, so the sequence continues after them"""
+    return Question.objects.filter(question_number__regex=r'^Q[0-9]+$').aggregate(
+        highest=Max(Cast(Substr('question_number', 2), IntegerField()))
+    )['highest'] or 0
+
+
+def next_question_numbers(count=1):
+    """``count`` fresh 'Q<n>' question numbers for generated questions"""
+    return [f"Q{value}" for value in allocate(QUESTION_NUMBERS, count, seed=highest_question_number)]
+
+
+def reserve_question_numbers(numbers):
+    """Keep the sequence past any 'Q<n>' in ``numbers`` written outside it, e.g. by a CSV import"""
+    values = [int(match.group(1)) for match in map(QUESTION_NUMBER_PATTERN.match, numbers) if match]
+    if values:
+        advance(QUESTION_NUMBERS, max(values))
+
+
+def next_question_number():
+    return next_question_numbers(1)[0]
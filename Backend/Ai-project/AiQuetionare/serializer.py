@@ -1,9 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Skill, JobDescription, Category, Question, Candidate, Assessment, CandidateAnswer
+from .models import Skill, JobDescription, Category, Question, Candidate, Assessment, CandidateAnswer, ResumeParseJob
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import authenticate
-from AiQuetionare.fetchskillsfromcv import get_data_from_cv
+from AiQuetionare.embeddings import unpack_embedding
+from AiQuetionare.resume_jobs import resume_jobs, store_resume
+from AiQuetionare.skills import attach_skills
 import json
 CustomUser = get_user_model()
 
@@ -110,9 +112,17 @@ class QuestionSerializer(serializers.ModelSerializer):
         model = Question
         fields = [
             'id', 'question_number', 'question_text', 'answer', 'category', 
-            'difficulty', 'embedding'
+            'difficulty'
         ]
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Raw embedding vectors are only sent when asked for explicitly
+        if self.context.get('include_embedding'):
+            embedding = unpack_embedding(instance.embedding)
+            data['embedding'] = None if embedding is None else embedding.tolist()
+        return data
+
 
 class CandidateSerializer(serializers.ModelSerializer):
     # user = CustomUserReadSerializer(read_only=True, required=False)
@@ -148,28 +158,14 @@ class CandidateSerializer(serializers.ModelSerializer):
             resume = validated_data.pop('resume', None)
             if resume:
                 print("Resume:", resume)
-                extracted_skills = get_data_from_cv(resume)
-               
-                if extracted_skills is None:
-                    raise serializers.ValidationError("Error extracting skills from CV.")
-                candidate = Candidate.objects.create(user=user, **validated_data)
-                for skill_name in extracted_skills.get("technical_skills", []):
-                    
-                    print(skill_name)
-                    skill, _ = Skill.objects.get_or_create(name=skill_name)
-                    candidate.skills.add(skill)
-                for skill_name in extracted_skills.get("cs_topics", []):
-                    
-                    print(skill_name)
-                    skill, _ = Skill.objects.get_or_create(name=skill_name)
-                    candidate.skills.add(skill)
+                # Skills are extracted by a background job, or straight from the cache for a known PDF
+                resume_name, content_hash = store_resume(resume)
+                candidate = Candidate.objects.create(user=user, resume=resume_name, **validated_data)
+                self.resume_job = resume_jobs.enqueue(candidate, content_hash)
             else:
                 skills_data = validated_data.pop('skills', [])
-                for skill_data in skills_data:
-                    skill_name = skill_data.get('name')
-                    if skill_name:
-                        skill, _ = Skill.objects.get_or_create(name=skill_name)
-                        candidate.skills.add(skill)
+                candidate = Candidate.objects.create(user=user, **validated_data)
+                attach_skills(candidate, [skill_data.get('name') for skill_data in skills_data])
             print("Candidate skills:", candidate.skills.all())
             # Save the candidate instance
             candidate.save()
@@ -181,6 +177,12 @@ class CandidateSerializer(serializers.ModelSerializer):
         except Exception as e:
             raise serializers.ValidationError(f"Error processing candidate creation: {str(e)}")
 
+class ResumeParseJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ResumeParseJob
+        fields = ['id', 'candidate', 'status', 'result', 'error', 'created_at', 'started_at', 'finished_at']
+
+
 class AssessmentSerializer(serializers.ModelSerializer):
     candidate = CandidateSerializer(read_only=True)
     job_description = JobDescriptionSerializer(read_only=True)
@@ -0,0 +1,138 @@
+import heapq
+import random
+
+import numpy as np
+
+from AiQuetionare.question_graph import QuestionSelector
+
+ALPHA = 0.7  # Weight for the original question score
+BETA = 0.3   # Weight for the answer similarity score
+TOP_CATEGORIES = 5
+
+
+class AssessmentSession:
+    """
+    In-memory interview state for one assessment.
+
+    Question scores are computed once when the socket connects; afterwards the
+    session tracks which questions were asked and folds each answer's
+    similarity into that question's score, so serving the next question needs
+    no database queries and no rescoring of the bank.
+
+    Each category keeps a lazy max-heap of its unasked questions and a
+    category-level heap orders categories by their best unasked score, so the
+    top-k categories are found in O(k log C) instead of a groupby per request.
+    """
+
+    def __init__(self, index, jd_score, user_score, score, asked_ids=(), graph=None, seed=None):
+        # The index is an immutable snapshot; a rebuild publishes a new one and leaves this one intact
+        self.question_ids = index.question_ids
+        self.question_numbers = index.question_numbers
+        self.categories = index.categories
+        self.difficulties = index.difficulties
+        self.positions = index.positions
+        self.index_version = index.version
+        self.graph = graph  # QuestionGraph compiled from the same index snapshot
+        self.selector = QuestionSelector(graph) if graph is not None else None
+        self.rng = random.Random(seed)
+
+        self.jd_score = np.asarray(jd_score, dtype=np.float32)
+        self.user_score = np.asarray(user_score, dtype=np.float32)
+        self.scores = np.array(score, dtype=np.float64)
+        self.asked = np.zeros(len(self.question_ids), dtype=bool)
+
+        self.category_names = sorted(set(self.categories))
+        self.category_ids = {name: i for i, name in enumerate(self.category_names)}
+        self.category_of = np.fromiter(
+            (self.category_ids[name] for name in self.categories), dtype=np.int32, count=len(self.categories)
+        )
+
+        for question_id in asked_ids:
+            position = self.positions.get(question_id)
+            if position is not None:
+                self.asked[position] = True
+
+        # Per-category max-heaps of (-score, position) for unasked questions, deleted lazily
+        self._question_heaps = [[] for _ in self.category_names]
+        for position in np.flatnonzero(~self.asked).tolist():
+            self._question_heaps[self.category_of[position]].append((-self.scores[position], position))
+        for heap in self._question_heaps:
+            heapq.heapify(heap)
+
+        # Max-heap of (-best unasked score, category id); an entry is live while it matches _category_best
+        self._category_best = np.full(len(self.category_names), -np.inf)
+        self._category_heap = []
+        for category_id in range(len(self.category_names)):
+            self._refresh_category(category_id)
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def position_of(self, question_id):
+        return self.positions.get(question_id)
+
+    def _category_head(self, category_id):
+        """Position of the best unasked question in a category, dropping dead heap entries"""
+        heap = self._question_heaps[category_id]
+        while heap:
+            neg_score, position = heap[0]
+            if self.asked[position] or -neg_score != self.scores[position]:
+                heapq.heappop(heap)
+                continue
+            return position
+        return None
+
+    def _refresh_category(self, category_id):
+        head = self._category_head(category_id)
+        best = -np.inf if head is None else self.scores[head]
+        if best != self._category_best[category_id]:
+            self._category_best[category_id] = best
+            if head is not None:
+                heapq.heappush(self._category_heap, (-best, category_id))
+
+    def mark_asked(self, question_id):
+        position = self.positions.get(question_id)
+        if position is not None and not self.asked[position]:
+            self.asked[position] = True
+            self._refresh_category(self.category_of[position])
+        return position
+
+    def update_score(self, question_id, similarity_score, alpha=ALPHA, beta=BETA):
+        """Blend an answer's similarity into the question score and return the new score"""
+        position = self.positions.get(question_id)
+        if position is None:
+            return None
+        updated = alpha * self.scores[position] + beta * similarity_score
+        self.scores[position] = updated
+        if not self.asked[position]:
+            category_id = self.category_of[position]
+            heapq.heappush(self._question_heaps[category_id], (-updated, position))
+            self._refresh_category(category_id)
+        return updated
+
+    def top_categories(self, k=TOP_CATEGORIES):
+        """Names of the k categories with the best unasked question, best first"""
+        heap = self._category_heap
+        taken = []
+        seen = set()
+        while heap and len(taken) < k:
+            neg_best, category_id = heapq.heappop(heap)
+            if category_id in seen or -neg_best != self._category_best[category_id]:
+                continue  # duplicate or outdated entry
+            seen.add(category_id)
+            taken.append((neg_best, category_id))
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return [self.category_names[category_id] for _, category_id in taken]
+
+    def choose_category(self, k=TOP_CATEGORIES):
+        """Pick one of the top-k categories at random (seeded per session)"""
+        top = self.top_categories(k)
+        return self.rng.choice(top) if top else None
+
+    def best_unasked(self):
+        """Position of the highest scoring question not yet asked, or None"""
+        top = self.top_categories(1)
+        if not top:
+            return None
+        return self._category_head(self.category_ids[top[0]])
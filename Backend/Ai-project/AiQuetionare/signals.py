@@ -0,0 +1,64 @@
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from AiQuetionare.models import JobDescription, Question, Skill
+from AiQuetionare.embeddings import question_index
+from AiQuetionare.job_cache import job_cache
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_index(sender, instance, created=False, **kwargs):
+    """Rebuild the in-memory embedding index after any question change"""
+    # A question generated during an interview only adds a row, like a pool claim
+    question_index.invalidate(deferred=created and getattr(instance, 'generated', False))
+
+
+@receiver(post_save, sender=JobDescription)
+@receiver(post_delete, sender=JobDescription)
+def invalidate_job_description(sender, instance, **kwargs):
+    job_cache.invalidate(instance.id)
+
+
+@receiver(pre_delete, sender=JobDescription)
+def delete_unserved_pool_questions(sender, instance, **kwargs):
+    """Questions still waiting in the job's pool go with it; served ones stay in the bank"""
+    Question.objects.filter(job_description=instance, in_pool=True).delete()
+
+
+@receiver(post_save, sender=Skill)
+def invalidate_jobs_with_skill(sender, instance, created, **kwargs):
+    """A renamed skill changes the serialized form of every job that requires it"""
+    if not created:
+        job_cache.invalidate(*instance.job_descriptions.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Skill)
+def collect_jobs_with_skill(sender, instance, **kwargs):
+    """The cascade to the job links sends no m2m_changed, so note the affected jobs first"""
+    instance._deleted_job_ids = list(instance.job_descriptions.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Skill)
+def invalidate_jobs_without_skill(sender, instance, **kwargs):
+    job_ids = getattr(instance, '_deleted_job_ids', [])
+    if job_ids:
+        JobDescription.objects.filter(id__in=job_ids).update(updated_at=timezone.now())
+        job_cache.invalidate(*job_ids)
+
+
+@receiver(m2m_changed, sender=JobDescription.skills.through)
+def invalidate_job_skills(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop cached jobs whose skill set changed and move their Last-Modified forward"""
+    if reverse:
+        # instance is a Skill; collect the affected jobs before a clear removes the links
+        if action == 'pre_clear':
+            instance._cleared_job_ids = list(instance.job_descriptions.values_list('id', flat=True))
+            return
+        job_ids = list(pk_set or getattr(instance, '_cleared_job_ids', []))
+    else:
+        job_ids = [instance.id]
+    if action in ('post_add', 'post_remove', 'post_clear') and job_ids:
+        JobDescription.objects.filter(id__in=job_ids).update(updated_at=timezone.now())
+        job_cache.invalidate(*job_ids)
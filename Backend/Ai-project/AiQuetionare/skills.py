@@ -0,0 +1,51 @@
+from django.db.models.functions import Lower
+
+from AiQuetionare.models import Skill
+
+
+def normalize_skill_names(names):
+    """Trim and collapse whitespace, drop blanks and case-insensitive duplicates, keeping the first spelling"""
+    normalized = {}
+    for name in names or []:
+        name = ' '.join(str(name).split())
+        if name and name.lower() not in normalized:
+            normalized[name.lower()] = name
+    return list(normalized.values())
+
+
+def resolve_skills(names):
+    """
+    Skill rows for ``names``, creating the missing ones. Existing skills are
+    matched case-insensitively with one IN query and the rest are inserted
+    with a single bulk_create, so the cost does not grow with the number of
+    skills.
+    """
+    names = normalize_skill_names(names)
+    if not names:
+        return []
+    wanted = {name.lower(): name for name in names}
+
+    def lookup():
+        return {skill.lname: skill for skill in Skill.objects.annotate(lname=Lower('name')).filter(lname__in=wanted)}
+
+    found = lookup()
+    missing = [Skill(name=name) for key, name in wanted.items() if key not in found]
+    if missing:
+        # Concurrent uploads may insert the same names; ignore those and read the winners back
+        Skill.objects.bulk_create(missing, ignore_conflicts=True)
+        found = lookup()
+    return [found[key] for key in wanted if key in found]
+
+
+def attach_skills(instance, names, replace=False):
+    """
+    Upsert ``names`` and link them to ``instance.skills`` (a candidate or job
+    description). ``add``/``set`` write the through table with one bulk insert
+    and still send m2m_changed. Returns the attached Skill rows.
+    """
+    skills = resolve_skills(names)
+    if replace:
+        instance.skills.set(skills)
+    elif skills:
+        instance.skills.add(*skills)
+    return skills
@@ -5,17 +5,22 @@ from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.utils import timezone
 import asyncio
+import time
 from AiQuetionare.models import *
 from AiQuetionare.serializer import *
 from asgiref.sync import sync_to_async
-from sentence_transformers import SentenceTransformer, util
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 import pandas as pd
 import pickle
-import random
-from collections import defaultdict
 from django.db.models import Avg
+from AiQuetionare.embeddings import answer_similarity, embedding_service, get_question_index, skill_cache
+from AiQuetionare.inference import run_inference
+from AiQuetionare.scoring import score_questions
+from AiQuetionare.session import AssessmentSession
+from AiQuetionare.question_graph import get_question_graph
+from AiQuetionare.job_cache import job_cache
+from AiQuetionare.llm import llm_client
+from AiQuetionare.prompts import JsonFieldStream, build_evaluation_prompt, parse_evaluation_reply
 
 
 class InterviewConsumer(AsyncWebsocketConsumer):
@@ -23,6 +28,7 @@ class InterviewConsumer(AsyncWebsocketConsumer):
         super().__init__(*args, **kwargs)
         self.assessment = None
         self.model = None
+        self.session = None
         
     async def get_job_description(self, job_desc_id):
         try:
@@ -63,10 +69,8 @@ class InterviewConsumer(AsyncWebsocketConsumer):
     def load_sentence_transformer_model(self):
         """Load the sentence transformer model"""
         try:
-            if not hasattr(self, '_cached_model'):
-                print("Loading SentenceTransformer model...")
-                self._cached_model = SentenceTransformer('all-MiniLM-L6-v2')
-            return self._cached_model
+            # One shared model per worker process, not per connection
+            return embedding_service.get_model()
         except Exception as e:
             print(f"Error loading sentence transformer model: {e}")
             return None
@@ -98,112 +102,68 @@ class InterviewConsumer(AsyncWebsocketConsumer):
     def get_job_skills(self, job_description_id):
         """Get the skills required for the job"""
         try:
-            job_description = JobDescription.objects.get(id=job_description_id)
-            return list(job_description.skills.values_list('name', flat=True))
+            return job_cache.skills(job_description_id)
         except Exception as e:
             print(f"Error getting job skills: {e}")
             return []
     
-    async def calculate_question_scores(self, job_skills, candidate_skills):
-        """Calculate scores for questions based on skills"""
-        try:
-            questions = await sync_to_async(list)(Question.objects.all())
-            questions_data = []
-            model = SentenceTransformer('all-MiniLM-L6-v2')
-            job_skill_embeddings = [model.encode(skill) for skill in job_skills]
-            user_skill_embeddings = [model.encode(skill) for skill in candidate_skills]
-            for question in questions:
-                question_embedding = np.array(question.embedding) if question.embedding else model.encode(question.question_text)
-                jd_score = self.calculate_max_similarity(question_embedding, job_skill_embeddings)
-                user_score = self.calculate_avg_similarity(question_embedding, user_skill_embeddings)
-                score = 0.6 * jd_score + 0.4 * user_score
-                asked = await sync_to_async(CandidateAnswer.objects.filter)(assessment=self.assessment, question=question)
-                questions_data.append({
-                    'question_number': question.question_number,
-                    'category': question.category.name,
-                    'difficulty': question.difficulty,
-                    'jd_score': jd_score,
-                    'user_score': user_score,
-                    'score': score,
-                    'asked': asked.exists()
-                })
-            return pd.DataFrame(questions_data)
-        except Exception as e:
-            print(f"Error calculating question scores: {e}")
-            return pd.DataFrame()
-    
-    def calculate_max_similarity(self, question_embedding, skill_embeddings):
-        """Calculates the maximum cosine similarity between a question and any of the provided skills."""
-        if not skill_embeddings:
-            return 0.0
-        similarities = [cosine_similarity([skill_embedding], [question_embedding])[0][0]
-                        for skill_embedding in skill_embeddings]
-        return max(similarities) if similarities else 0.0
-    
-    def calculate_avg_similarity(self, question_embedding, user_skill_embeddings):
-        """Calculates the average cosine similarity between a question and any of the user's skills."""
-        if not user_skill_embeddings:
-            return 0.0
-        similarities = [cosine_similarity([skill_embedding], [question_embedding])[0][0]
-                        for skill_embedding in user_skill_embeddings]
-        return sum(similarities) / len(similarities) if similarities else 0.0
-    
-    async def build_question_graph(self, questions_df):
-        """Build a graph of questions based on difficulty and category"""
+    @database_sync_to_async
+    def get_asked_question_ids(self):
+        """Get the ids of questions already answered in this assessment"""
+        return list(CandidateAnswer.objects.filter(assessment=self.assessment).values_list('question_id', flat=True))
+
+    async def build_session(self, job_skills, candidate_skills):
+        """Score every question once for this assessment and return the session state"""
         try:
-            graph = defaultdict(list)
-            
-            for category in questions_df["category"].unique():
-                cat_qs = questions_df[questions_df["category"] == category].sort_values("difficulty")
-                prev_row = None
-                for _, current_row in cat_qs.iterrows():
-                    if prev_row is not None:
-                        graph[prev_row["question_number"]].append(current_row["question_number"])
-                    prev_row = current_row
-            
-            return graph
+            # Question embeddings are precomputed at ingest; hold this snapshot for the whole session build
+            index = await sync_to_async(get_question_index)()
+            # Skill embeddings come from the shared cache, misses are encoded in one batch
+            job_skill_embeddings = await run_inference(skill_cache.encode, job_skills)
+            user_skill_embeddings = await run_inference(skill_cache.encode, candidate_skills)
+            jd_scores, user_scores, scores = await run_inference(
+                score_questions,
+                index.normalized, job_skill_embeddings, user_skill_embeddings, normalized=True
+            )
+            asked_ids = await self.get_asked_question_ids()
+            graph = get_question_graph(index)
+            return AssessmentSession(index, jd_scores, user_scores, scores, asked_ids, graph=graph)
         except Exception as e:
-            print(f"Error building question graph: {e}")
-            return defaultdict(list)
+            print(f"Error building assessment session: {e}")
+            return None
+
+    async def get_session(self):
+        """Return the assessment session, building it on first use"""
+        if self.session is None:
+            self.session = await self.build_session(
+                await self.get_job_skills(self.assessment.job_description_id),
+                await self.get_candidate_skills()
+            )
+        return self.session
     
-    async def select_next_question(self, questions_df):
+    async def select_next_question(self, session):
         """Select the next question using the A* algorithm"""
         try:
-            if questions_df.empty:
-                return None
-            
-            # Get top 5 categories
-            category_scores = questions_df.groupby("category")["score"].max()
-            top_5_categories = category_scores.sort_values(ascending=False).head(5).index.tolist()
-            
-            if not top_5_categories:
+            # Randomly select one of the top 5 categories by best unasked score
+            selected_category = session.choose_category()
+            if selected_category is None:
                 return None
-                
-            # Randomly select a category
-            selected_category = random.choice(top_5_categories)
-            
-            # Filter questions by category and get the easiest one as starting point
-            cat_df = questions_df[questions_df["category"] == selected_category].sort_values("difficulty", ascending=False)
             
-            if cat_df.empty:
+            # The easiest question of the category is the starting point
+            start_q = session.graph.start_node(selected_category)
+            if start_q is None:
                 return None
-                
-            start_q = cat_df["question_number"].values[0]
-            asked_nodes = set(questions_df[questions_df["asked"] == True]["question_number"])
-            score_dict = dict(zip(questions_df["question_number"], questions_df["score"]))
-            
-            # Build graph
-            graph = await self.build_question_graph(questions_df)
             
-            # Run A* algorithm
-            path, best_node, best_score = self.a_star_search(graph, start_q, score_dict, asked_nodes)
+            # Run A* on the precompiled graph; asked questions are passed through, never returned
+            path, best_node, best_score = session.selector.search(start_q, session.scores, session.asked)
             
-            # If question already asked, try again with an empty asked set
-            if path[-1] in asked_nodes:
-                path, best_node, best_score = self.a_star_search(graph, start_q, score_dict, set())
+            # Nothing unasked left in this category: take the best unasked question overall
+            if best_node is None:
+                best_node = session.best_unasked()
+                if best_node is None:
+                    return None
             
             # Get the question object
-            question = await sync_to_async(Question.objects.get)(question_number=path[-1])
+            question = await sync_to_async(Question.objects.get)(id=session.question_ids[best_node])
             
             # Update the current question in the assessment
             self.assessment.current_question = question
@@ -214,114 +174,56 @@ class InterviewConsumer(AsyncWebsocketConsumer):
             print(f"Error selecting next question: {e}")
             return None
     
-    def a_star_search(self, graph, start, scores, asked_nodes, threshold=0.99):
-        """
-        A* search algorithm to find the best question
-        
-        Args:
-            graph: dict of adjacency list for the tree {node: [children]}
-            start: starting node id
-            scores: dict of scores for each node
-            asked_nodes: set of nodes (question numbers) that have already been asked
-            threshold: early stopping threshold if a node is highly similar
-        """
-        import heapq
-        
-        open_set = []
-        heapq.heappush(open_set, (1 - scores.get(start, 0), start))
-        came_from = {}
-        g_score = {start: 0}
-        best_node = start
-        best_score = scores.get(start, 0)
-        
-        while open_set:
-            _, current = heapq.heappop(open_set)
-            
-            if current in asked_nodes:
-                continue
-                
-            if scores.get(current, 0) > best_score:
-                best_node = current
-                best_score = scores.get(current, 0)
-                
-            if scores.get(current, 0) >= threshold:
-                break
-                
-            for neighbor in graph.get(current, []):
-                if neighbor in asked_nodes:
-                    continue
-                    
-                tentative_g_score = g_score[current] + 1
-                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g_score
-                    f_score = tentative_g_score + (1 - scores.get(neighbor, 0))
-                    heapq.heappush(open_set, (f_score, neighbor))
-        
-        path = []
-        current = best_node
-        while current in came_from:
-            path.append(current)
-            current = came_from[current]
-        path.append(start)
-        return path[::-1], best_node, best_score
-    
     async def evaluate_answer(self, question, answer_text):
         """Evaluate the candidate's answer using semantic similarity"""
         try:
             # Get original answer
             original_answer = question.answer
             
-            # Calculate similarity
-            model = self.model or SentenceTransformer('all-MiniLM-L6-v2')
-            embedding_orig = model.encode(original_answer)
-            embedding_user = model.encode(answer_text)
+            # Calculate similarity off the event loop
+            model = self.model or embedding_service.get_model()
+            similarity_score = await run_inference(answer_similarity, original_answer, answer_text, model)
             
-            similarity_score = util.cos_sim(embedding_orig, embedding_user).item()
-            
-            # Calculate timestamps for response time
-            now = timezone.now()
-            question_asked_at = await sync_to_async(self.assessment.answers.filter)(question=question).first()
-            response_time = None
-            
-            if question_asked_at:
-                response_time = (now - question_asked_at.asked_at).total_seconds()
-            
-            # Record the answer
-            answer, created = await sync_to_async(CandidateAnswer.objects.update_or_create)(
-                assessment=self.assessment,
-                question=question,
-                defaults={
-                    'answer_text': answer_text,
-                    'similarity_score': similarity_score,
-                    'response_time_seconds': response_time
-                }
-            )
-            
-            # Update question score
-            alpha = 0.7  # Weight for original score
-            beta = 0.3   # Weight for similarity score
-            
-            # Get the question from DataFrame
-            questions_df = await self.calculate_question_scores(
-                await self.get_job_skills(self.assessment.job_description.id),
-                await self.get_candidate_skills()
-            )
-            
-            qn_row = questions_df[questions_df["question_number"] == question.question_number]
-            if not qn_row.empty:
-                original_score = qn_row["score"].values[0]
-                updated_score = alpha * original_score + beta * similarity_score
-                answer.question_score = updated_score
-                await sync_to_async(answer.save)()
-            
-            return {
-                'similarity_score': similarity_score,
-                'answer_id': answer.id
-            }
+            return await self.record_answer(question, answer_text, similarity_score)
         except Exception as e:
             print(f"Error evaluating answer: {e}")
             return {'similarity_score': 0.0, 'answer_id': None}
+
+    async def record_answer(self, question, answer_text, similarity_score):
+        """Store the answer and fold its score into the session"""
+        # Calculate timestamps for response time
+        now = timezone.now()
+        question_asked_at = await sync_to_async(
+            lambda: self.assessment.answers.filter(question=question).first()
+        )()
+        response_time = None
+        
+        if question_asked_at:
+            response_time = (now - question_asked_at.asked_at).total_seconds()
+        
+        # Record the answer
+        answer, created = await sync_to_async(CandidateAnswer.objects.update_or_create)(
+            assessment=self.assessment,
+            question=question,
+            defaults={
+                'answer_text': answer_text,
+                'similarity_score': similarity_score,
+                'response_time_seconds': response_time
+            }
+        )
+        
+        # Update only this question's score in the session (0.7 original, 0.3 similarity)
+        session = await self.get_session()
+        updated_score = session.update_score(question.id, similarity_score) if session else None
+        if updated_score is not None:
+            session.mark_asked(question.id)
+            answer.question_score = updated_score
+            await sync_to_async(answer.save)()
+        
+        return {
+            'similarity_score': similarity_score,
+            'answer_id': answer.id
+        }
     
     async def make_hire_decision(self):
         """Make a hiring decision based on the ML model"""
@@ -348,8 +250,8 @@ class InterviewConsumer(AsyncWebsocketConsumer):
                 return {"decision": "No model available", "probability": [0.5, 0.5]}
             
             # Make prediction
-            prediction = ml_model.predict(new_candidate_data)
-            probability = ml_model.predict_proba(new_candidate_data)
+            prediction = await run_inference(ml_model.predict, new_candidate_data)
+            probability = await run_inference(ml_model.predict_proba, new_candidate_data)
             
             # Update assessment
             self.assessment.weighted_score = avg_weighted_score
@@ -401,6 +303,7 @@ class InterviewConsumer(AsyncWebsocketConsumer):
 
             self.model = await self.load_sentence_transformer_model()
             self.ml_model = await self.load_ml_model()
+            await self.get_session()
         except Exception as e:
             print(f"Error in initialize_connection: {e}")
     
@@ -427,6 +330,10 @@ class InterviewConsumer(AsyncWebsocketConsumer):
                 question_id = text_data_json.get('question_id')
                 answer_text = text_data_json.get('answer')
                 await self.handle_submit_answer(question_id, answer_text)
+            elif message_type == 'submit_answer_stream':
+                question_id = text_data_json.get('question_id')
+                answer_text = text_data_json.get('answer')
+                await self.handle_submit_answer_stream(question_id, answer_text)
             elif message_type == 'finish_interview':
                 await self.handle_finish_interview()
             else:
@@ -457,14 +364,9 @@ class InterviewConsumer(AsyncWebsocketConsumer):
                 'difficulty': question.get_difficulty_display()
             }
         try:
-            # Calculate scores for questions
-            print("hello Questions")
-            job_skills = await self.get_job_skills(self.assessment.job_description.id)
-            print("hello Questions")
-            candidate_skills = await self.get_candidate_skills()
-            questions_df = await self.calculate_question_scores(job_skills, candidate_skills)
-            # Select next question
-            question = await self.select_next_question(questions_df)
+            # Scores were computed once for this assessment; only the asked set changes
+            session = await self.get_session()
+            question = await self.select_next_question(session) if session else None
 
             if not question:
                 await self.send(text_data=json.dumps({
@@ -473,6 +375,8 @@ class InterviewConsumer(AsyncWebsocketConsumer):
                 }))
                 return
 
+            session.mark_asked(question.id)
+
             # Serialize question using sync_to_async
             question_data = await sync_to_async(get_question_data)(question)
             print("hello Questions2 ")
@@ -517,6 +421,52 @@ class InterviewConsumer(AsyncWebsocketConsumer):
                 'message': f'Error submitting answer: {str(e)}'
             }))
     
+    async def handle_submit_answer_stream(self, question_id, answer_text):
+        """Evaluate an answer with the LLM, forwarding feedback tokens as they arrive"""
+        try:
+            question = await sync_to_async(Question.objects.get)(id=question_id)
+            prompt = build_evaluation_prompt(question.question_text, answer_text)
+
+            feedback_stream = JsonFieldStream('feedback')
+            chunks = []
+            started_at = time.perf_counter()
+            ttfb = None
+            async for chunk in llm_client.stream(prompt, cached=True):
+                if ttfb is None:
+                    ttfb = time.perf_counter() - started_at
+                chunks.append(chunk)
+                token = feedback_stream.feed(chunk)
+                if token:
+                    await self.send(text_data=json.dumps({
+                        'type': 'evaluation_token',
+                        'question_id': question_id,
+                        'token': token
+                    }))
+
+            # The score is only trusted once the whole JSON reply has arrived
+            score, feedback = parse_evaluation_reply(''.join(chunks))
+            result = await self.record_answer(question, answer_text, score)
+            await self.send(text_data=json.dumps({
+                'type': 'answer_evaluation',
+                'question_id': question_id,
+                'similarity_score': score,
+                'feedback': feedback,
+                'answer_id': result['answer_id'],
+                'ttfb_ms': round(1000 * ttfb, 1) if ttfb is not None else None,
+                'total_ms': round(1000 * (time.perf_counter() - started_at), 1)
+            }))
+        except Question.DoesNotExist:
+            await self.send(text_data=json.dumps({
+                'type': 'error',
+                'message': 'Question not found'
+            }))
+        except Exception as e:
+            print(f"Error streaming answer evaluation: {e}")
+            await self.send(text_data=json.dumps({
+                'type': 'error',
+                'message': f'Error evaluating answer: {str(e)}'
+            }))
+
     async def handle_finish_interview(self):
         """Handle request to finish the interview"""
         try:
@@ -0,0 +1,189 @@
+import sys
+import types
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import numpy as np
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase, SimpleTestCase
+from AiQuetionare.models import Category, Question
+from AiQuetionare.embeddings import (
+    MODEL_NAME, EmbeddingService, QuestionEmbeddingIndex, SkillEmbeddingCache, ensure_question_embeddings, embedding_key,
+    unpack_embedding,
+)
+from AiQuetionare.serializer import QuestionSerializer
+
+
+class FakeModel:
+    """Deterministic stand-in for SentenceTransformer.encode"""
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.calls = 0
+
+    def encode(self, texts, **kwargs):
+        self.calls += 1
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        vectors = np.array([
+            np.random.default_rng(sum(map(ord, text))).random(self.dim) for text in texts
+        ], dtype=np.float32)
+        return vectors[0] if single else vectors
+
+
+class QuestionEmbeddingIndexTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Python')
+        self.q1 = Question.objects.create(
+            question_number='1', question_text='What is a list?', answer='A sequence',
+            category=self.category, difficulty=2
+        )
+        self.q2 = Question.objects.create(
+            question_number='2', question_text='What is a dict?', answer='A mapping',
+            category=self.category, difficulty=1
+        )
+        self.model = FakeModel()
+
+    def test_ensure_embeddings_fills_missing(self):
+        """Questions without embeddings are encoded in one batch"""
+        self.assertEqual(ensure_question_embeddings(model=self.model), 2)
+        self.assertEqual(self.model.calls, 1)
+        self.q1.refresh_from_db()
+        self.assertEqual(unpack_embedding(self.q1.embedding).shape, (8,))
+        self.assertEqual(self.q1.embedding_key, embedding_key(self.q1.question_text))
+        # Nothing left to do on a second pass
+        self.assertEqual(ensure_question_embeddings(model=self.model), 0)
+
+    def test_embedding_is_packed_float32_and_not_serialized(self):
+        """Embeddings are stored as 4 bytes per dimension and left out of API payloads by default"""
+        ensure_question_embeddings(model=self.model)
+        self.q1.refresh_from_db()
+        self.assertEqual(len(bytes(self.q1.embedding)), 8 * 4)
+        self.assertNotIn('embedding', QuestionSerializer(self.q1).data)
+        data = QuestionSerializer(self.q1, context={'include_embedding': True}).data
+        np.testing.assert_allclose(data['embedding'], self.model.encode('What is a list?'))
+
+    def test_changed_text_is_reencoded(self):
+        """Editing the question text makes its embedding stale"""
+        ensure_question_embeddings(model=self.model)
+        self.q2.refresh_from_db()
+        self.q2.question_text = 'What is a tuple?'
+        self.q2.save()
+        self.assertEqual(ensure_question_embeddings(model=self.model), 1)
+
+    def test_index_matrix(self):
+        """The index holds one float32 row per question"""
+        index = QuestionEmbeddingIndex(model=self.model).get()
+        self.assertEqual(index.matrix.shape, (2, 8))
+        self.assertEqual(index.matrix.dtype, np.float32)
+        self.assertEqual(index.question_numbers, ('1', '2'))
+        self.assertEqual(index.categories, ('Python', 'Python'))
+        np.testing.assert_allclose(index.embedding_for(self.q1.id), self.model.encode('What is a list?'))
+
+    def test_index_rebuilds_after_invalidate(self):
+        """An invalidated index publishes a new snapshot and leaves the old one intact"""
+        index = QuestionEmbeddingIndex(model=self.model)
+        snapshot = index.get()
+        Question.objects.create(
+            question_number='3', question_text='What is a set?', answer='Unique items',
+            category=self.category, difficulty=0
+        )
+        index.invalidate()
+        rebuilt = index.get()
+        self.assertEqual(len(rebuilt), 3)
+        self.assertEqual(rebuilt.version, snapshot.version + 1)
+        self.assertEqual(len(snapshot), 2)
+        self.assertEqual(snapshot.matrix.shape, (2, 8))
+
+    def test_failed_rebuild_stays_stale(self):
+        """A rebuild that raises keeps the previous snapshot and retries on next access"""
+        index = QuestionEmbeddingIndex(model=self.model)
+        snapshot = index.get()
+        index.invalidate()
+        with mock.patch('AiQuetionare.embeddings.ensure_question_embeddings', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                index.get()
+        self.assertIs(index.snapshot, snapshot)
+        self.assertEqual(index.get().version, snapshot.version + 1)
+
+
+    def test_change_in_another_process_triggers_rebuild(self):
+        """Indexes sharing a cache backend, as worker processes do, see each other's invalidations"""
+        backend = LocMemCache('question-bank', {})
+        worker, other_worker = QuestionEmbeddingIndex(self.model, backend), QuestionEmbeddingIndex(self.model, backend)
+        snapshot = worker.get()
+        other_worker.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            Question.objects.create(
+                question_number='3', question_text='What is a set?', answer='Unique items',
+                category=self.category, difficulty=0
+            )
+            other_worker.invalidate()
+        self.assertIs(worker.get(), worker.get())
+        self.assertEqual(len(worker.get()), 3)
+        self.assertEqual(worker.get().version, snapshot.version + 1)
+
+
+    def test_deferred_invalidation_waits_for_refresh_interval(self):
+        """Pool claims only add questions; they are folded in by the periodic refresh, not every access"""
+        index = QuestionEmbeddingIndex(self.model, LocMemCache('question-bank', {}), refresh_interval=60)
+        snapshot = index.get()
+        Question.objects.create(
+            question_number='3', question_text='What is a set?', answer='Unique items',
+            category=self.category, difficulty=0
+        )
+        index.invalidate(deferred=True)
+        self.assertIs(index.get(), snapshot)
+        index.refresh_interval = 0
+        self.assertEqual(len(index.get()), 3)
+
+
+class SkillEmbeddingCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.model = FakeModel()
+        self.cache = SkillEmbeddingCache(maxsize=3, model=self.model)
+
+    def test_normalized_keys_share_an_entry(self):
+        """Case and whitespace variants of a skill hit the same entry"""
+        first = self.cache.encode(['React JS'])
+        second = self.cache.encode(['  react   js '])
+        np.testing.assert_array_equal(first, second)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_misses_are_batched(self):
+        """All misses of one call are encoded with a single model call"""
+        matrix = self.cache.encode(['Python', 'Docker', 'Python'])
+        self.assertEqual(matrix.shape, (3, 8))
+        self.assertEqual(self.model.calls, 1)
+        self.cache.encode(['Python', 'Docker'])
+        self.assertEqual(self.model.calls, 1)
+
+    def test_lru_eviction(self):
+        """The least recently used skill is evicted once maxsize is exceeded"""
+        self.cache.encode(['a', 'b', 'c'])
+        self.cache.encode(['a'])
+        self.cache.encode(['d'])
+        self.assertEqual(len(self.cache), 3)
+        self.cache.encode(['b'])
+        self.assertEqual(self.model.calls, 3)
+
+    def test_empty_input(self):
+        self.assertEqual(self.cache.encode([]).size, 0)
+
+
+class EmbeddingServiceTest(SimpleTestCase):
+    def test_model_loaded_once_across_threads(self):
+        """Concurrent first calls share a single model instance"""
+        loads = []
+
+        def fake_transformer(name):
+            loads.append(name)
+            return FakeModel()
+
+        fake_module = types.SimpleNamespace(SentenceTransformer=fake_transformer)
+        service = EmbeddingService()
+        with mock.patch.dict(sys.modules, {'sentence_transformers': fake_module}):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                models = list(pool.map(lambda _: service.get_model(), range(16)))
+        self.assertEqual(loads, [MODEL_NAME])
+        self.assertTrue(all(model is models[0] for model in models))
+        self.assertTrue(service.loaded)
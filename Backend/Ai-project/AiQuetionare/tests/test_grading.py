@@ -0,0 +1,63 @@
+import asyncio
+from unittest import mock
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from AiQuetionare import gemini_views
+from AiQuetionare.grading import AnswerGrader
+from AiQuetionare.models import Category, Question
+
+
+class VectorModel:
+    """Encodes each known text to a fixed vector so similarities are exact"""
+    VECTORS = {
+        'reference': [1.0, 0.0],
+        'same idea': [0.95, 0.05],
+        'partly right': [0.6, 0.8],
+        'unrelated': [0.0, 1.0],
+    }
+
+    def encode(self, texts, **kwargs):
+        return np.array([self.VECTORS[text] for text in texts], dtype=np.float32)
+
+
+class FailingClient:
+    async def generate(self, prompt, **kwargs):
+        raise AssertionError("the model should not be called")
+
+
+class AnswerGraderTest(SimpleTestCase):
+    def setUp(self):
+        self.grader = AnswerGrader(low=0.45, high=0.8, model=VectorModel())
+
+    def triage(self, reference, answer):
+        return asyncio.run(self.grader.triage(reference, answer))
+
+    def test_clear_match_and_miss_are_local(self):
+        score, _ = self.triage('reference', 'same idea')
+        self.assertGreater(score, 0.8)
+        self.assertEqual(self.triage('reference', 'unrelated')[0], 0.0)
+
+    def test_ambiguous_and_missing_reference_escalate(self):
+        self.assertIsNone(self.triage('reference', 'partly right'))  # similarity 0.6
+        self.assertIsNone(self.triage('', 'same idea'))
+        stats = self.grader.stats()
+        self.assertEqual((stats['embedding'], stats['llm_ambiguous'], stats['llm_no_reference']), (0, 1, 1))
+        self.assertEqual(stats['llm_rate'], 1.0)
+
+
+class TieredEvaluateAnswerViewTest(TestCase):
+    def test_clear_match_skips_the_llm(self):
+        question = Question.objects.create(
+            question_number='Q1', question_text='What is a hash map?', answer='reference',
+            category=Category.objects.create(name='General'), difficulty=1,
+        )
+        grader = AnswerGrader(model=VectorModel())
+        with mock.patch.object(gemini_views, 'answer_grader', grader), \
+                mock.patch.object(gemini_views, 'llm_client', FailingClient()):
+            response = self.client.post(reverse('evaluate_answer'), {'question_id': question.id, 'answer': 'same idea'},
+                                        content_type='application/json')
+        data = response.json()
+        self.assertEqual(data['tier'], 'embedding')
+        self.assertGreater(data['score'], 0.8)
+        self.assertEqual(grader.stats()['embedding_hit_rate'], 1.0)
@@ -0,0 +1,46 @@
+import asyncio
+import threading
+import time
+from django.test import SimpleTestCase
+from AiQuetionare.inference import InferenceExecutor, InferenceBusy
+
+
+class InferenceExecutorTest(SimpleTestCase):
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_runs_off_the_event_loop(self):
+        """Work runs on a pool thread and its metrics are recorded"""
+        self.executor = InferenceExecutor(max_workers=1, max_queue=1)
+        loop_thread = threading.get_ident()
+        worker_thread = asyncio.run(self.executor.run(threading.get_ident))
+        self.assertNotEqual(worker_thread, loop_thread)
+        stats = self.executor.stats()
+        self.assertEqual(stats['completed'], 1)
+        self.assertEqual(stats['in_flight'], 0)
+
+    def test_back_pressure_rejects_after_timeout(self):
+        """Callers beyond workers + queue wait and are rejected after the timeout"""
+        self.executor = InferenceExecutor(max_workers=1, max_queue=0, queue_timeout=0.05)
+
+        async def scenario():
+            slow = asyncio.ensure_future(self.executor.run(time.sleep, 0.3))
+            await asyncio.sleep(0.01)
+            with self.assertRaises(InferenceBusy):
+                await self.executor.run(time.sleep, 0)
+            await slow
+
+        asyncio.run(scenario())
+        stats = self.executor.stats()
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(stats['completed'], 1)
+
+    def test_queue_wait_is_measured(self):
+        """A queued task reports the time it waited for the busy worker"""
+        self.executor = InferenceExecutor(max_workers=1, max_queue=4)
+
+        async def scenario():
+            await asyncio.gather(*(self.executor.run(time.sleep, 0.05) for _ in range(3)))
+
+        asyncio.run(scenario())
+        self.assertGreaterEqual(self.executor.stats()['max_wait_ms'], 50)
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from AiQuetionare.job_cache import job_cache
+from AiQuetionare.models import JobDescription, Skill
+
+User = get_user_model()
+
+
+class JobDescriptionCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='recruiter@example.com', username='recruiter', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.job = JobDescription.objects.create(title='Backend Engineer', description='Build APIs', created_by=self.user)
+        self.job.skills.add(Skill.objects.create(name='Python'))
+        self.url = reverse('job_description_detail', args=[self.job.id])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_detail_is_served_from_cache_with_conditional_get(self):
+        # An in-process backend so the query count covers only the read model, not cache lookups
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['skills'][0]['name'], 'Python')
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_skill_change_invalidates_entry_and_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(job_cache.skills(self.job.id), ['Python'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.skills.add(Skill.objects.create(name='Django'))
+        self.assertEqual(sorted(job_cache.skills(self.job.id)), ['Django', 'Python'])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_save_and_delete_invalidate(self):
+        self.client.get(self.url)
+        self.job.title = 'Platform Engineer'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.save()
+        self.assertEqual(self.client.get(self.url).data['title'], 'Platform Engineer')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_invalidation_waits_for_commit(self):
+        self.client.get(self.url)
+        self.job.title = 'Platform Engineer'
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.job.save()
+            # Until the writer commits, the entry is not dropped for a reader to refill with old rows
+            self.assertIsNotNone(cache.get(job_cache.key(self.job.id)))
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(cache.get(job_cache.key(self.job.id)))
+
+    def test_deleting_skill_invalidates_jobs(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.get(name='Python').delete()
+        self.assertEqual(job_cache.skills(self.job.id), [])
+
+    def test_default_cache_is_shared_between_processes(self):
+        """The read model must not live in a per-process cache, or invalidations would not reach other workers"""
+        self.assertNotIn('locmem', settings.CACHES['default']['BACKEND'])
+        self.client.get(self.url)
+        self.assertIsNotNone(cache.get(job_cache.key(self.job.id)))
@@ -0,0 +1,343 @@
+import asyncio
+import json
+import sys
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from AiQuetionare import gemini_views, test_consumer
+from AiQuetionare.llm import AsyncLLMClient, LLMBusy, LLMTimeout
+from AiQuetionare.llm_cache import LLMResponseCache, prompt_key
+from AiQuetionare.models import Assessment, Candidate, CandidateAnswer, Category, JobDescription, LLMResponse, Question
+from AiQuetionare.prompts import JsonFieldStream, parse_batch_evaluation_reply
+from AiQuetionare.routing import websocket_urlpatterns
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from stub_llm import start_stub_server  # noqa: E402
+
+User = get_user_model()
+
+
+class AsyncLLMClientTest(SimpleTestCase):
+    def setUp(self):
+        self.server = start_stub_server(latency=0.05)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def make_client(self, **kwargs):
+        return AsyncLLMClient(base_url=self.server.url, api_key='stub', **kwargs)
+
+    def run_with(self, client, coroutine_fn):
+        async def scenario():
+            try:
+                return await coroutine_fn()
+            finally:
+                await client.aclose()
+        return asyncio.run(scenario())
+
+    def test_concurrent_calls_share_the_pool(self):
+        client = self.make_client(max_concurrency=10)
+        replies = self.run_with(client, lambda: asyncio.gather(
+            *(client.generate("You are evaluating a candidate's response") for _ in range(10))
+        ))
+        self.assertEqual(len(replies), 10)
+        self.assertEqual(json.loads(replies[0])['score'], 0.72)
+        self.assertEqual(client.stats()['completed'], 10)
+        self.assertEqual(self.server.requests_served, 10)
+
+    def test_timeout(self):
+        client = self.make_client()
+        with self.assertRaises(LLMTimeout):
+            self.run_with(client, lambda: client.generate("question", timeout=0.01))
+        self.assertEqual(client.stats()['timeouts'], 1)
+
+    def test_busy_after_queue_timeout(self):
+        """Calls beyond max_concurrency wait for a slot and are rejected after the queue timeout"""
+        client = self.make_client(max_concurrency=1, queue_timeout=0.01)
+
+        async def scenario():
+            first = asyncio.ensure_future(client.generate("question"))
+            await asyncio.sleep(0)
+            with self.assertRaises(LLMBusy):
+                await client.generate("question")
+            await first
+
+        self.run_with(client, scenario)
+        stats = client.stats()
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(stats['completed'], 1)
+
+
+class GeminiViewsStubTest(TestCase):
+    def setUp(self):
+        self.server = start_stub_server()
+        patcher = mock.patch.object(gemini_views, 'llm_client', AsyncLLMClient(base_url=self.server.url, api_key='stub'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_generate_question_stores_question(self):
+        response = self.client.post(reverse('generate_question'), {'difficulty': 'beginner'}, content_type='application/json')
+        data = response.json()
+        self.assertEqual(data['category'], 'Data Structures')
+        self.assertTrue(Question.objects.filter(id=data['id']).exists())
+
+    def test_evaluate_answer(self):
+        question = Question.objects.create(
+            question_number='Q1', question_text='What is a hash map?', answer='',
+            category=Category.objects.create(name='General'), difficulty=1,
+        )
+        response = self.client.post(reverse('evaluate_answer'), {'question_id': question.id, 'answer': 'A table'},
+                                    content_type='application/json')
+        self.assertEqual(response.json()['score'], 0.72)
+
+    def test_resubmitted_answer_updates_stored_row(self):
+        user = User.objects.create_user(email='c@example.com', username='candidate', password='pw',
+                                        fullname='C', phone_number='01234567890')
+        job = JobDescription.objects.create(title='Backend Developer', description='Django', created_by=user)
+        assessment = Assessment.objects.create(candidate=Candidate.objects.create(user=user), job_description=job)
+        question = Question.objects.create(
+            question_number='Q1', question_text='What is a hash map?', answer='',
+            category=Category.objects.create(name='General'), difficulty=1,
+        )
+        body = {'question_id': question.id, 'answer': 'A table', 'assessment_id': assessment.id}
+        for answer in ('A table', 'A table', 'A table keyed by hash'):  # retry, then an edited answer
+            body['answer'] = answer
+            response = self.client.post(reverse('evaluate_answer'), body, content_type='application/json')
+            self.assertNotIn('error', response.json())
+            self.assertEqual(response.json()['score'], 0.72)
+        stored = CandidateAnswer.objects.get(assessment=assessment, question=question)
+        self.assertEqual(stored.answer_text, 'A table keyed by hash')
+
+
+class LLMResponseCacheTest(TestCase):
+    def setUp(self):
+        self.cache = LLMResponseCache(ttl=60, max_entries=2, evict_every=1)
+
+    def test_hit_after_set_ignores_whitespace(self):
+        self.assertIsNone(async_to_sync(self.cache.get)('model', 'Evaluate:  answer'))
+        async_to_sync(self.cache.set)('model', 'Evaluate:  answer', '{"score": 1}')
+        self.assertEqual(async_to_sync(self.cache.get)('model', '\n  Evaluate: answer\n'), '{"score": 1}')
+        self.assertIsNone(async_to_sync(self.cache.get)('other-model', 'Evaluate: answer'))
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+        self.assertEqual(LLMResponse.objects.get().hits, 1)
+
+    def test_expired_entry_is_a_miss(self):
+        async_to_sync(self.cache.set)('model', 'prompt', 'old')
+        LLMResponse.objects.update(created_at=timezone.now() - timedelta(seconds=120))
+        self.assertIsNone(async_to_sync(self.cache.get)('model', 'prompt'))
+        self.assertEqual(self.cache.stats()['expired'], 1)
+
+    def test_evicts_least_recently_used(self):
+        for prompt in ('a', 'b'):
+            async_to_sync(self.cache.set)('model', prompt, prompt)
+        LLMResponse.objects.filter(key=prompt_key('model', 'a')).update(last_used_at=timezone.now() - timedelta(seconds=30))
+        async_to_sync(self.cache.set)('model', 'c', 'c')
+        self.assertEqual(LLMResponse.objects.count(), 2)
+        self.assertIsNone(async_to_sync(self.cache.get)('model', 'a'))
+        self.assertEqual(self.cache.stats()['evicted'], 1)
+
+    def test_eviction_runs_every_n_stores(self):
+        cache = LLMResponseCache(ttl=60, max_entries=2, evict_every=3)
+        for prompt in ('a', 'b', 'c'):
+            async_to_sync(cache.set)('model', prompt, prompt)
+        self.assertEqual(LLMResponse.objects.count(), 2)  # third store sweeps
+        for prompt in ('d', 'e'):
+            async_to_sync(cache.set)('model', prompt, prompt)
+        self.assertEqual(LLMResponse.objects.count(), 4)  # over the cap until the next sweep
+        async_to_sync(cache.set)('model', 'f', 'f')
+        self.assertEqual(LLMResponse.objects.count(), 2)
+
+    def test_client_skips_model_on_hit(self):
+        server = start_stub_server()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        client = AsyncLLMClient(base_url=server.url, api_key='stub', cache=self.cache)
+
+        async def ask_twice():
+            try:
+                return [await client.generate('evaluating a candidate', cached=True) for _ in range(2)]
+            finally:
+                await client.aclose()
+
+        first, second = async_to_sync(ask_twice)()
+        self.assertEqual(first, second)
+        self.assertEqual(server.requests_served, 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+
+class JsonFieldStreamTest(SimpleTestCase):
+    def test_decodes_field_across_any_chunking(self):
+        reply = json.dumps({"score": 0.8, "feedback": 'Say "why" \\ caf\u00e9\nnext', "extra": "x"})
+        for size in (1, 2, 5, len(reply)):
+            stream = JsonFieldStream('feedback')
+            decoded = ''.join(stream.feed(reply[i:i + size]) for i in range(0, len(reply), size))
+            self.assertEqual(decoded, json.loads(reply)['feedback'])
+            self.assertTrue(stream.done)
+
+    def test_missing_field(self):
+        stream = JsonFieldStream('feedback')
+        self.assertEqual(stream.feed('{"score": 1}'), '')
+        self.assertFalse(stream.done)
+
+
+class InterviewRoutingTest(SimpleTestCase):
+    def test_socket_reaches_the_session_consumer(self):
+        """The interview URL is served by the consumer that implements the streaming handlers"""
+        self.assertIs(websocket_urlpatterns[0].callback.consumer_class, test_consumer.InterviewConsumer)
+
+        async def connect():
+            communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), '/interview/1/')
+            communicator.scope['user'] = AnonymousUser()
+            return await communicator.connect()
+
+        self.assertEqual(async_to_sync(connect)(), (False, 401))
+
+
+class StreamingEvaluationTest(TestCase):
+    def setUp(self):
+        self.server = start_stub_server(token_delay=0.01)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        patcher = mock.patch.object(test_consumer, 'llm_client', AsyncLLMClient(base_url=self.server.url, api_key='stub'))
+        self.llm_client = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.question = Question.objects.create(
+            question_number='Q1', question_text='What is a hash map?', answer='',
+            category=Category.objects.create(name='General'), difficulty=1,
+        )
+
+    def test_tokens_then_final_score(self):
+        consumer = test_consumer.InterviewConsumer()
+        sent = []
+
+        async def send(text_data):
+            sent.append(json.loads(text_data))
+
+        async def record_answer(question, answer_text, score):
+            return {'similarity_score': score, 'answer_id': 7}
+
+        consumer.send = send
+        consumer.record_answer = record_answer
+        async_to_sync(consumer.handle_submit_answer_stream)(self.question.id, 'A table of buckets')
+
+        tokens = [message for message in sent if message['type'] == 'evaluation_token']
+        final = sent[-1]
+        self.assertGreater(len(tokens), 1)
+        self.assertEqual(''.join(message['token'] for message in tokens), final['feedback'])
+        self.assertEqual(final['type'], 'answer_evaluation')
+        self.assertEqual(final['similarity_score'], 0.72)
+        self.assertEqual(final['answer_id'], 7)
+        self.assertLessEqual(final['ttfb_ms'], final['total_ms'])
+        self.assertEqual(self.llm_client.stats()['streams'], 1)
+
+
+class BatchEvaluationParseTest(SimpleTestCase):
+    def test_array_in_prose_with_shuffled_ids(self):
+        reply = 'Here you go:\n```json\n[{"id": 2, "score": 1.4, "feedback": "b"}, {"id": 1, "score": 0.3}]\n```'
+        scored = parse_batch_evaluation_reply(reply, [1, 2, 3])
+        self.assertEqual(scored[2], (1, 'b'))  # clamped to [0, 1]
+        self.assertEqual(scored[1][0], 0.3)
+        self.assertNotIn(3, scored)
+
+    def test_loose_objects_and_missing_ids_fall_back_to_position(self):
+        reply = '{"score": 0.9, "feedback": "first"} oops {"score": "bad"} {"id": "x", "score": 0.1}'
+        scored = parse_batch_evaluation_reply(reply, [1, 2, 3])
+        self.assertEqual(scored, {1: (0.9, 'first'), 3: (0.1, scored[3][1])})
+
+
+class BatchEvaluationViewTest(TestCase):
+    def setUp(self):
+        self.server = start_stub_server()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        patcher = mock.patch.object(gemini_views, 'llm_client', AsyncLLMClient(base_url=self.server.url, api_key='stub'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        user = User.objects.create_user(email='c@example.com', username='candidate', password='pw',
+                                        fullname='C', phone_number='01234567890')
+        job = JobDescription.objects.create(title='Backend Developer', description='Django', created_by=user)
+        self.assessment = Assessment.objects.create(candidate=Candidate.objects.create(user=user), job_description=job)
+        category = Category.objects.create(name='General')
+        self.questions = [
+            Question.objects.create(question_number=f'Q{i}', question_text=f'Question {i}?', answer='',
+                                    category=category, difficulty=1)
+            for i in range(5)
+        ]
+
+    def test_chunks_share_llm_calls_and_one_write(self):
+        CandidateAnswer.objects.create(assessment=self.assessment, question=self.questions[0], answer_text='old')
+        payload = {
+            'assessment_id': self.assessment.id,
+            'chunk_size': 2,
+            'answers': [{'question_id': question.id, 'answer': f'Answer {i}'} for i, question in enumerate(self.questions)],
+        }
+        with self.assertNumQueries(3):  # assessment, questions, one upsert
+            response = self.client.post(reverse('evaluate_answers_batch'), payload, content_type='application/json')
+        data = response.json()
+        self.assertEqual(data['llm_calls'], 3)
+        self.assertEqual(self.server.requests_served, 3)
+        self.assertTrue(all(result['evaluated'] and result['score'] == 0.72 for result in data['results']))
+        self.assertEqual(CandidateAnswer.objects.filter(assessment=self.assessment).count(), 5)
+        self.assertEqual(CandidateAnswer.objects.get(question=self.questions[0]).answer_text, 'Answer 0')
+
+    def test_repeated_question_keeps_last_answer(self):
+        payload = {
+            'assessment_id': self.assessment.id,
+            'answers': [
+                {'question_id': self.questions[0].id, 'answer': 'First try'},
+                {'question_id': self.questions[1].id, 'answer': 'Other answer'},
+                {'question_id': self.questions[0].id, 'answer': 'Second try'},
+            ],
+        }
+        with mock.patch.object(CandidateAnswer.objects, 'bulk_create', wraps=CandidateAnswer.objects.bulk_create) as bulk_create:
+            response = self.client.post(reverse('evaluate_answers_batch'), payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([answer.question_id for answer in bulk_create.call_args.args[0]],
+                         [self.questions[0].id, self.questions[1].id])
+        self.assertEqual(CandidateAnswer.objects.get(question=self.questions[0]).answer_text, 'Second try')
+
+    def test_malformed_answers_are_rejected(self):
+        payload = {
+            'assessment_id': self.assessment.id,
+            'answers': [{'question_id': self.questions[0].id, 'answer': 'Fine'}, {'question_id': 'abc', 'answer': 'x'}],
+        }
+        response = self.client.post(reverse('evaluate_answers_batch'), payload, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('answers[1].question_id', response.json()['error'])
+        for bad in ({'answers': ['not an object']}, {'answers': [{'answer': 'no id'}]}, {'chunk_size': 'many'}):
+            response = self.client.post(reverse('evaluate_answers_batch'), dict(bad, assessment_id=self.assessment.id),
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(CandidateAnswer.objects.exists())
+
+    def test_regrades_stored_answers(self):
+        for question in self.questions[:3]:
+            CandidateAnswer.objects.create(assessment=self.assessment, question=question, answer_text='stored')
+        response = self.client.post(reverse('evaluate_answers_batch'), {'assessment_id': self.assessment.id},
+                                    content_type='application/json')
+        self.assertEqual(response.json()['llm_calls'], 1)
+        self.assertEqual(set(CandidateAnswer.objects.values_list('similarity_score', flat=True)), {0.72})
+
+    def test_llm_failure_keeps_stored_grades(self):
+        CandidateAnswer.objects.create(assessment=self.assessment, question=self.questions[0], answer_text='stored',
+                                       similarity_score=0.95, question_score=0.95)
+        with mock.patch.object(gemini_views.llm_client, 'generate', side_effect=LLMTimeout('down')):
+            response = self.client.post(reverse('evaluate_answers_batch'), {'assessment_id': self.assessment.id},
+                                        content_type='application/json')
+        self.assertFalse(response.json()['results'][0]['evaluated'])
+        self.assertEqual(CandidateAnswer.objects.get(question=self.questions[0]).similarity_score, 0.95)
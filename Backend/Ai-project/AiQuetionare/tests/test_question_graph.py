@@ -0,0 +1,88 @@
+import types
+import numpy as np
+from django.test import SimpleTestCase
+from AiQuetionare.question_graph import QuestionGraph, QuestionSelector, get_question_graph
+
+
+def make_index(categories, difficulties, version=1):
+    return types.SimpleNamespace(
+        question_ids=list(range(len(categories))),
+        categories=categories,
+        difficulties=np.array(difficulties, dtype=np.int8),
+        version=version,
+    )
+
+
+class QuestionGraphTest(SimpleTestCase):
+    def setUp(self):
+        # positions:        0         1        2         3        4
+        self.index = make_index(['React', 'Python', 'React', 'Python', 'React'], [0, 2, 2, 1, 1])
+        self.graph = QuestionGraph.build(self.index)
+
+    def test_chains_run_easiest_to_hardest(self):
+        """Each category is a single chain Easy -> Medium -> Hard"""
+        react = self.graph.category_nodes[self.graph.category_ids['React']]
+        self.assertEqual(react.tolist(), [2, 4, 0])
+        self.assertEqual(self.graph.neighbors(2).tolist(), [4])
+        self.assertEqual(self.graph.neighbors(4).tolist(), [0])
+        self.assertEqual(self.graph.neighbors(0).tolist(), [])
+        self.assertEqual(self.graph.get(1).tolist(), [3])
+
+    def test_start_node(self):
+        asked = np.zeros(5, dtype=bool)
+        self.assertEqual(self.graph.start_node('React'), 2)
+        asked[2] = True
+        self.assertEqual(self.graph.start_node('React', asked), 4)
+        self.assertIsNone(self.graph.start_node('Go'))
+
+    def test_graph_is_immutable(self):
+        with self.assertRaises(ValueError):
+            self.graph.indices[0] = 1
+
+    def test_cached_per_bank_version(self):
+        """The compiled graph is reused until the index version changes"""
+        first = get_question_graph(self.index)
+        self.assertIs(get_question_graph(self.index), first)
+        self.index.version += 1
+        self.assertIsNot(get_question_graph(self.index), first)
+
+    def test_empty_bank(self):
+        graph = QuestionGraph.build(make_index([], []))
+        self.assertEqual(len(graph), 0)
+        self.assertIsNone(graph.start_node('React'))
+
+
+class QuestionSelectorTest(SimpleTestCase):
+    def setUp(self):
+        # One React chain 2 -> 4 -> 0 and one Python chain 1 -> 3
+        self.graph = QuestionGraph.build(make_index(['React', 'Python', 'React', 'Python', 'React'], [0, 2, 2, 1, 1]))
+        self.selector = QuestionSelector(self.graph)
+        self.scores = np.array([0.8, 0.3, 0.2, 0.9, 0.5])
+        self.asked = np.zeros(5, dtype=bool)
+
+    def test_finds_best_reachable_node(self):
+        path, best_node, best_score = self.selector.search(2, self.scores, self.asked)
+        self.assertEqual(best_node, 0)
+        self.assertEqual(path, [2, 4, 0])
+        self.assertAlmostEqual(best_score, 0.8)
+
+    def test_walks_past_asked_nodes(self):
+        """An asked start node does not stop the search from reaching unasked ones"""
+        self.asked[[2, 0]] = True
+        path, best_node, _ = self.selector.search(2, self.scores, self.asked)
+        self.assertEqual(best_node, 4)
+        self.assertEqual(path, [2, 4])
+
+    def test_all_reachable_asked(self):
+        self.asked[[2, 4, 0]] = True
+        self.assertEqual(self.selector.search(2, self.scores, self.asked), ([], None, None))
+
+    def test_early_exit_above_threshold(self):
+        self.scores[4] = 0.995
+        _, best_node, _ = self.selector.search(2, self.scores, self.asked)
+        self.assertEqual(best_node, 4)
+
+    def test_state_is_reset_between_searches(self):
+        self.selector.search(2, self.scores, self.asked)
+        path, best_node, _ = self.selector.search(1, self.scores, self.asked)
+        self.assertEqual((path, best_node), ([1, 3], 3))
@@ -0,0 +1,113 @@
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from AiQuetionare.models import Category, JobDescription, Question
+from AiQuetionare.question_import import import_progress
+
+User = get_user_model()
+
+CSV = (
+    "Question Number,Question,Answer,Category,Difficulty\n"
+    "Q1,What is a list?,An ordered collection,Python,Easy\n"
+    "Q2,What is a dict?,,Python,Medium\n"
+    "Q3,What is a JOIN?,Combines tables,SQL,Hard\n"
+    "Q1,What is a Python list?,A mutable sequence,Python,Easy\n"
+)
+
+
+@mock.patch('AiQuetionare.question_import.ensure_question_embeddings', return_value=0)
+class QuestionCSVImportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email='admin@example.com', username='admin', password='password123'))
+        Question.objects.create(question_number='Q3', question_text='Old', answer='Old',
+                                category=Category.objects.create(name='SQL'), difficulty=1)
+
+    def upload(self, content, encoding='utf-8', query=''):
+        return self.client.post(reverse('upload_questionnaire') + query,
+                                {'file': SimpleUploadedFile('questions.csv', content.encode(encoding))}, format='multipart')
+
+    def test_rows_are_upserted_and_invalid_rows_reported(self, embed):
+        response = self.upload(CSV)
+        self.assertEqual(response.status_code, 200)
+        stats = response.data['stats']
+        self.assertEqual((stats['created'], stats['updated'], stats['failed']), (1, 2, 1))
+        self.assertEqual(stats['errors'], ["Row 3: missing answer"])
+
+        self.assertEqual(Question.objects.get(question_number='Q1').question_text, 'What is a Python list?')
+        joined = Question.objects.get(question_number='Q3')
+        self.assertEqual((joined.answer, joined.difficulty), ('Combines tables', 0))
+        self.assertEqual(Category.objects.count(), 2)
+        self.assertFalse(Question.objects.filter(question_number='Q2').exists())
+
+    def test_pooled_and_job_questions_are_not_overwritten(self, embed):
+        job = JobDescription.objects.create(title='Backend', description='APIs', created_by=User.objects.get())
+        category = Category.objects.get(name='SQL')
+        Question.objects.create(question_number='Q5', question_text='Pooled', answer='', category=category,
+                                difficulty=1, job_description=job, in_pool=True)
+        Question.objects.create(question_number='Q6', question_text='Served', answer='', category=category,
+                                difficulty=1, job_description=job)
+        response = self.upload(
+            "Question Number,Question,Answer,Category,Difficulty\n"
+            "Q5,From the CSV?,Yes,SQL,Easy\n"
+            "Q6,Also from the CSV?,Yes,SQL,Easy\n"
+            "Q7,New?,Yes,SQL,Easy\n"
+        )
+        stats = response.data['stats']
+        self.assertEqual((stats['created'], stats['updated'], stats['failed']), (1, 0, 2))
+        self.assertEqual(stats['errors'], ["Row 2: question number Q5 belongs to a generated question",
+                                           "Row 3: question number Q6 belongs to a generated question"])
+        pooled = Question.objects.get(question_number='Q5')
+        self.assertEqual((pooled.question_text, pooled.in_pool), ('Pooled', True))
+        self.assertEqual(Question.objects.get(question_number='Q6').question_text, 'Served')
+
+    def test_rows_over_column_limits_are_reported_not_fatal(self, embed):
+        """A value the database would reject fails its own row instead of the whole import"""
+        long_number, long_category = 'Q' * 21, 'C' * 101
+        response = self.upload(
+            "Question Number,Question,Answer,Category,Difficulty\n"
+            f"{long_number},Too long a number?,Yes,Python,Easy\n"
+            f"Q4,Too long a category?,Yes,{long_category},Easy\n"
+            "Q5,Fine?,Yes,Python,Easy\n"
+        )
+        self.assertEqual(response.status_code, 200)
+        stats = response.data['stats']
+        self.assertEqual((stats['created'], stats['failed']), (1, 2))
+        self.assertEqual(stats['errors'], [
+            "Row 2: question_number longer than 20 characters",
+            "Row 3: category longer than 100 characters",
+        ])
+        self.assertTrue(Question.objects.filter(question_number='Q5').exists())
+
+    def test_import_cost_does_not_grow_per_row(self, embed):
+        def queries(prefix, count):
+            rows = ''.join(f"{prefix}{i},Question {i},Answer {i},{prefix} {i % 7},Medium\n" for i in range(count))
+            with CaptureQueriesContext(connection) as context:
+                response = self.upload("Question Number,Question,Answer,Category,Difficulty\n" + rows)
+            self.assertEqual(response.data['stats']['created'], count)
+            return len(context)
+
+        self.assertEqual(queries('A', 20), queries('B', 80))
+
+    def test_latin1_upload_is_decoded_from_the_start(self, embed):
+        response = self.upload(CSV.replace('What is a JOIN?', 'Qu\u00e9 es un JOIN?'), encoding='latin-1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Question.objects.get(question_number='Q3').question_text, 'Qu\u00e9 es un JOIN?')
+
+    @override_settings(QUESTION_IMPORT_STREAM_ROWS=2)
+    def test_streaming_import_processes_fixed_size_chunks(self, embed):
+        completed = import_progress.stats()['completed']
+        response = self.upload(CSV + "Q4,What is a set?,Unique items,Python,Trivial\n", query='?stream=true')
+        self.assertEqual(response.status_code, 200)
+        stats = response.data['stats']
+        self.assertEqual((stats['rows'], stats['chunks']), (5, 3))
+        self.assertEqual((stats['created'], stats['updated'], stats['failed']), (1, 2, 2))
+        self.assertEqual(stats['errors'], ["Row 3: missing answer", "Row 6: invalid difficulty 'Trivial'"])
+        self.assertEqual(embed.call_count, 2)  # the last chunk has no valid rows
+        self.assertEqual(import_progress.stats()['completed'], completed + 1)
+        self.assertEqual(Question.objects.get(question_number='Q1').question_text, 'What is a Python list?')
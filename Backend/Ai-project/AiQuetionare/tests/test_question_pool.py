@@ -0,0 +1,190 @@
+import json
+import re
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from AiQuetionare import gemini_views
+from AiQuetionare.models import Assessment, Candidate, CandidateAnswer, Category, JobDescription, Question
+from AiQuetionare.question_pool import QuestionPool
+
+User = get_user_model()
+
+
+class CountingClient:
+    """Stands in for the LLM client, numbering every question it generates"""
+
+    def __init__(self):
+        self.calls = 0
+        self.questions = 0
+
+    async def generate(self, prompt, **kwargs):
+        self.calls += 1
+        count = int(re.search(r'Generate (\d+) distinct', prompt).group(1))
+        replies = []
+        for _ in range(count):
+            self.questions += 1
+            replies.append({"question": f"Generated question {self.questions}?", "category": "Python"})
+        return json.dumps(replies)
+
+
+class RepeatingClient:
+    """Returns the same question for every slot, like a model ignoring the distinctness instruction"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate(self, prompt, **kwargs):
+        self.calls += 1
+        count = int(re.search(r'Generate (\d+) distinct', prompt).group(1))
+        question = {"question": f"Repeated question {self.calls}?", "category": "Python"}
+        return json.dumps([question] * count)
+
+
+class SingleQuestionClient:
+    async def generate(self, prompt, **kwargs):
+        return json.dumps({"question": "Freshly generated question?", "category": "Python", "difficulty": "Beginner"})
+
+
+class FailingClient:
+    async def generate(self, prompt, **kwargs):
+        raise AssertionError("the model should not be called")
+
+
+class QuestionPoolTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(email='r@example.com', username='recruiter', password='pw',
+                                        fullname='R', phone_number='01234567890')
+        self.job = JobDescription.objects.create(title='Backend Developer', description='Django APIs', created_by=user)
+        self.client_stub = CountingClient()
+        self.pool = QuestionPool(low_water=2, size=4, client=self.client_stub)
+        patcher = mock.patch('AiQuetionare.question_pool.ensure_question_embeddings', return_value=0)
+        self.embed = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def pooled(self, difficulty=2):
+        return Question.objects.filter(job_description=self.job, difficulty=difficulty, in_pool=True)
+
+    def test_refill_tops_up_to_size(self):
+        self.assertEqual(async_to_sync(self.pool.refill)(self.job.id, 2), 4)
+        self.assertEqual(self.pooled().count(), 4)
+        # New pool questions are embedded when generated, not when the index next rebuilds
+        self.assertEqual(set(self.embed.call_args.args[0].values_list('id', flat=True)),
+                         set(self.pooled().values_list('id', flat=True)))
+        # Above the low-water mark nothing is generated
+        self.assertEqual(async_to_sync(self.pool.refill)(self.job.id, 2), 0)
+        # All missing questions come from one call
+        self.assertEqual(self.client_stub.calls, 1)
+
+    def test_pop_skips_previous_questions_and_refills(self):
+        async_to_sync(self.pool.refill)(self.job.id, 2)
+
+        async def pop_and_wait():
+            question = await self.pool.pop(self.job.id, 2, ['generated  QUESTION 1?'])
+            await self.pool._refills[(self.job.id, 2)]
+            return question
+
+        question = async_to_sync(pop_and_wait)()
+        self.assertEqual(question.question_text, 'Generated question 2?')
+        self.assertFalse(Question.objects.get(pk=question.pk).in_pool)
+        self.assertEqual(self.pooled().count(), 3)  # still above low water, no refill
+        self.assertEqual(self.pool.stats()['served'], 1)
+
+    def test_claim_defers_question_index_refresh(self):
+        async_to_sync(self.pool.refill)(self.job.id, 2)
+        with mock.patch('AiQuetionare.question_pool.question_index') as index, \
+                mock.patch.object(self.pool, 'schedule_refill'):
+            self.assertIsNotNone(async_to_sync(self.pool.pop)(self.job.id, 2))
+        index.invalidate.assert_called_once_with(deferred=True)
+
+    def test_claim_looks_past_the_first_batch(self):
+        async_to_sync(self.pool.refill)(self.job.id, 2)
+        pool = QuestionPool(low_water=2, size=4, client=self.client_stub, claim_attempts=1)
+        seen = [f'generated question {i}?' for i in range(1, 4)]
+        with mock.patch.object(pool, 'schedule_refill'):
+            question = async_to_sync(pool.pop)(self.job.id, 2, seen)
+        self.assertEqual(question.question_text, 'Generated question 4?')
+
+    def test_deleting_job_keeps_served_questions_and_answers(self):
+        async_to_sync(self.pool.refill)(self.job.id, 2)
+        candidate = Candidate.objects.create(user=self.job.created_by)
+        other_job = JobDescription.objects.create(title='Data Engineer', description='Pipelines',
+                                                  created_by=self.job.created_by)
+        other_assessment = Assessment.objects.create(candidate=candidate, job_description=other_job)
+        with mock.patch.object(self.pool, 'schedule_refill'):
+            served = async_to_sync(self.pool.pop)(self.job.id, 2)
+        CandidateAnswer.objects.create(assessment=other_assessment, question=served, answer_text='Answer')
+
+        self.job.delete()
+        served.refresh_from_db()
+        self.assertIsNone(served.job_description_id)
+        self.assertTrue(CandidateAnswer.objects.filter(question=served).exists())
+        self.assertFalse(Question.objects.filter(in_pool=True).exists())
+
+    def test_duplicate_generations_are_dropped(self):
+        category = Category.objects.create(name='Python')
+        Question.objects.create(question_number='Q1', question_text='Generated question 1?', answer='',
+                                category=category, difficulty=2, job_description=self.job, in_pool=True)
+        # The duplicate is dropped and the shortfall asked for again
+        self.assertEqual(async_to_sync(self.pool.refill)(self.job.id, 2), 3)
+        self.assertEqual(self.pooled().count(), 4)
+        self.assertEqual(self.client_stub.calls, 2)
+
+    def test_refill_stops_after_refill_rounds(self):
+        client = RepeatingClient()
+        pool = QuestionPool(low_water=2, size=4, client=client, refill_rounds=3)
+        self.assertEqual(async_to_sync(pool.refill)(self.job.id, 2), 3)
+        self.assertEqual(self.pooled().count(), 3)
+        self.assertEqual(client.calls, 3)
+
+    def test_view_serves_from_pool(self):
+        async_to_sync(self.pool.refill)(self.job.id, 1)
+        with mock.patch.object(gemini_views, 'question_pool', self.pool), \
+                mock.patch.object(gemini_views, 'llm_client', FailingClient()), \
+                mock.patch.object(self.pool, 'schedule_refill'):
+            response = self.client.post(reverse('generate_question'),
+                                        {'job_id': self.job.id, 'difficulty': 'Intermediate'},
+                                        content_type='application/json')
+        data = response.json()
+        self.assertEqual(data['question'], 'Generated question 1?')
+        self.assertEqual(data['difficulty'], 'Intermediate')
+        self.assertEqual(self.pooled(1).count(), 3)
+
+    def test_generated_question_defers_index_refresh(self):
+        with mock.patch.object(gemini_views, 'question_pool', self.pool), \
+                mock.patch.object(gemini_views, 'llm_client', SingleQuestionClient()), \
+                mock.patch.object(self.pool, 'schedule_refill'), \
+                mock.patch('AiQuetionare.signals.question_index') as index:
+            response = self.client.post(reverse('generate_question'), {'job_id': self.job.id},
+                                        content_type='application/json')
+        self.assertEqual(response.json()['question'], 'Freshly generated question?')
+        # The empty pool fell back to the model; the new row waits for the periodic refresh
+        index.invalidate.assert_called_once_with(deferred=True)
+
+    def test_view_rejects_non_integer_job_id(self):
+        with mock.patch.object(gemini_views, 'question_pool', self.pool), \
+                mock.patch.object(gemini_views, 'llm_client', FailingClient()):
+            response = self.client.post(reverse('generate_question'), {'job_id': 'abc'},
+                                        content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.pool.stats()['served'] + self.pool.stats()['empty'], 0)
+
+    def test_pop_accepts_job_id_as_string(self):
+        async_to_sync(self.pool.refill)(self.job.id, 2)
+        with mock.patch.object(self.pool, 'schedule_refill') as schedule_refill:
+            self.assertIsNotNone(async_to_sync(self.pool.pop)(str(self.job.id), 2))
+        schedule_refill.assert_called_once_with(self.job.id, 2)
+
+    def test_response_is_lean_unless_expanded(self):
+        candidate = Candidate.objects.create(user=self.job.created_by)
+        async_to_sync(self.pool.refill)(self.job.id, 2)
+        body = {'job_id': self.job.id, 'candidate_id': candidate.user_id}
+        with mock.patch.object(gemini_views, 'question_pool', self.pool), \
+                mock.patch.object(self.pool, 'schedule_refill'):
+            lean = self.client.post(reverse('generate_question'), body, content_type='application/json').json()
+            expanded = self.client.post(reverse('generate_question') + '?expand=1', body,
+                                        content_type='application/json').json()
+        self.assertEqual(set(lean), {'id', 'question', 'category', 'difficulty', 'assessment_id'})
+        self.assertEqual(expanded['assessment']['id'], lean['assessment_id'])
+        self.assertEqual(expanded['question_data']['id'], expanded['id'])
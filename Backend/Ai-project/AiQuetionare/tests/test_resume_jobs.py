@@ -0,0 +1,108 @@
+import shutil
+import tempfile
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from AiQuetionare.models import Candidate, ParsedResume, ResumeParseJob
+from AiQuetionare.resume_jobs import ResumeJobQueue, store_resume
+
+User = get_user_model()
+EXTRACTED = {"technical_skills": ["Python", "Django"], "cs_topics": ["Algorithms"]}
+
+
+class ResumeJobTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, True)
+        self.user = User.objects.create_user(email='candidate@example.com', username='candidate', password='password123')
+
+    def resume(self):
+        return SimpleUploadedFile('resume.pdf', b'%PDF-1.4 resume', content_type='application/pdf')
+
+
+class ResumeJobQueueTest(ResumeJobTestCase):
+    def setUp(self):
+        super().setUp()
+        self.candidate = Candidate.objects.create(user=self.user, resume=self.resume())
+        self.job = ResumeParseJob.objects.create(candidate=self.candidate)
+        self.queue = ResumeJobQueue()
+
+    def test_process_applies_skills_and_claims_once(self):
+        with mock.patch('AiQuetionare.resume_jobs.get_data_from_cv', return_value=EXTRACTED) as parse:
+            self.assertTrue(self.queue.process(self.job.id))
+            self.assertFalse(self.queue.process(self.job.id))
+        parse.assert_called_once()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, ResumeParseJob.DONE)
+        self.assertEqual(self.job.result, EXTRACTED)
+        self.assertEqual(set(self.candidate.skills.values_list('name', flat=True)), {'Python', 'Django', 'Algorithms'})
+        self.assertEqual(self.queue.stats()['jobs'][ResumeParseJob.DONE], 1)
+
+    def test_failed_parse_is_recorded(self):
+        with mock.patch('AiQuetionare.resume_jobs.get_data_from_cv', return_value=None):
+            self.queue.process(self.job.id)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, ResumeParseJob.FAILED)
+        self.assertIn("Error extracting skills", self.job.error)
+        self.assertEqual(self.queue.stats()['failed'], 1)
+
+    def test_stale_running_jobs_are_requeued(self):
+        ResumeParseJob.objects.filter(id=self.job.id).update(status=ResumeParseJob.RUNNING, started_at='2000-01-01T00:00:00Z')
+        self.assertEqual(self.queue.requeue_stale(), 1)
+        self.assertEqual(self.queue.pending_ids(), [self.job.id])
+
+
+class ParsedResumeCacheTest(ResumeJobTestCase):
+    def test_identical_upload_reuses_file_and_parse(self):
+        queue = ResumeJobQueue()
+        name, content_hash = store_resume(self.resume())
+        self.assertEqual(store_resume(self.resume()), (name, content_hash))
+
+        first = Candidate.objects.create(user=self.user, resume=name)
+        job = ResumeParseJob.objects.create(candidate=first, content_hash=content_hash)
+        with mock.patch('AiQuetionare.resume_jobs.get_data_from_cv', return_value=EXTRACTED) as parse:
+            queue.process(job.id)
+            other = User.objects.create_user(email='other@example.com', username='other', password='password123')
+            second = Candidate.objects.create(user=other, resume=name)
+            cached_job = queue.enqueue(second, content_hash)
+        parse.assert_called_once()
+
+        self.assertEqual(cached_job.status, ResumeParseJob.DONE)
+        self.assertEqual(set(second.skills.values_list('name', flat=True)), {'Python', 'Django', 'Algorithms'})
+        self.assertEqual(ParsedResume.objects.get(content_hash=content_hash).hits, 1)
+        # Only enqueue counts a lookup; the worker's re-check does not
+        self.assertEqual(queue.stats()['parse_cache']['hits'], 1)
+        self.assertEqual(queue.stats()['parse_cache']['misses'], 0)
+
+
+class ResumeJobViewTest(ResumeJobTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_upload_returns_job_and_status_is_pollable(self):
+        with mock.patch('AiQuetionare.serializer.resume_jobs.submit') as submit, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('candidate'), {'resume': self.resume(), 'user_id': self.user.id}, format='multipart')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data['resume_job']['id']
+        self.assertEqual(response.data['resume_job']['status'], ResumeParseJob.PENDING)
+        submit.assert_called_once_with(job_id)
+
+        response = self.client.get(reverse('resume_job_status', args=[job_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], ResumeParseJob.PENDING)
+
+    def test_other_users_cannot_see_the_job(self):
+        job = ResumeParseJob.objects.create(candidate=Candidate.objects.create(user=self.user))
+        other = User.objects.create_user(email='other@example.com', username='other', password='password123')
+        self.client.force_authenticate(user=other)
+        response = self.client.get(reverse('resume_job_status', args=[job.id]))
+        self.assertEqual(response.status_code, 404)
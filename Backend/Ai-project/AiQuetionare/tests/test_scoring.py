@@ -0,0 +1,33 @@
+import numpy as np
+from django.test import SimpleTestCase
+from sklearn.metrics.pairwise import cosine_similarity
+from AiQuetionare.scoring import score_questions, normalize_rows
+
+
+class ScoreQuestionsTest(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.questions = rng.standard_normal((20, 16)).astype(np.float32)
+        self.jd_skills = rng.standard_normal((4, 16)).astype(np.float32)
+        self.user_skills = rng.standard_normal((6, 16)).astype(np.float32)
+
+    def test_matches_pairwise_cosine(self):
+        """Vectorized scores equal the per-pair cosine similarity definition"""
+        jd_score, user_score, score = score_questions(self.questions, self.jd_skills, self.user_skills)
+        similarities_jd = cosine_similarity(self.questions, self.jd_skills)
+        similarities_user = cosine_similarity(self.questions, self.user_skills)
+        np.testing.assert_allclose(jd_score, similarities_jd.max(axis=1), atol=1e-5)
+        np.testing.assert_allclose(user_score, similarities_user.mean(axis=1), atol=1e-5)
+        np.testing.assert_allclose(score, 0.6 * jd_score + 0.4 * user_score, atol=1e-6)
+
+    def test_prenormalized_questions(self):
+        """Passing unit-length rows with normalized=True gives the same scores"""
+        expected = score_questions(self.questions, self.jd_skills, self.user_skills)[2]
+        actual = score_questions(normalize_rows(self.questions), self.jd_skills, self.user_skills, normalized=True)[2]
+        np.testing.assert_allclose(actual, expected, atol=1e-6)
+
+    def test_missing_skills_score_zero(self):
+        """An empty skill list contributes a zero component"""
+        jd_score, user_score, score = score_questions(self.questions, [], self.user_skills)
+        self.assertFalse(jd_score.any())
+        np.testing.assert_allclose(score, 0.4 * user_score, atol=1e-6)
@@ -0,0 +1,107 @@
+import types
+import numpy as np
+from django.test import SimpleTestCase
+from AiQuetionare.session import AssessmentSession
+
+
+def make_index(categories, difficulties=None):
+    question_ids = list(range(100, 100 + len(categories)))
+    return types.SimpleNamespace(
+        question_ids=question_ids,
+        question_numbers=[str(i) for i in range(1, len(categories) + 1)],
+        categories=categories,
+        difficulties=np.array(difficulties or [1] * len(categories), dtype=np.int8),
+        positions={question_id: i for i, question_id in enumerate(question_ids)},
+        version=1,
+    )
+
+
+class AssessmentSessionTest(SimpleTestCase):
+    def setUp(self):
+        scores = np.array([0.2, 0.9, 0.5, 0.7, 0.1])
+        self.session = AssessmentSession(make_index(['Python'] * 5), scores, scores, scores, asked_ids=[101])
+
+    def test_asked_ids_are_excluded(self):
+        """Questions answered before connecting are never the best unasked"""
+        self.assertTrue(self.session.asked[1])
+        self.assertEqual(self.session.best_unasked(), 3)
+
+    def test_mark_asked_advances_best(self):
+        self.session.mark_asked(103)
+        self.assertEqual(self.session.best_unasked(), 2)
+
+    def test_update_score_blends_similarity(self):
+        """An answer updates only its own question with the 0.7/0.3 blend"""
+        updated = self.session.update_score(102, 1.0)
+        self.assertAlmostEqual(updated, 0.7 * 0.5 + 0.3 * 1.0)
+        self.assertAlmostEqual(self.session.scores[3], 0.7)
+        self.assertEqual(self.session.best_unasked(), 3)
+        self.session.update_score(104, 10.0)
+        self.assertEqual(self.session.best_unasked(), 4)
+
+    def test_all_asked(self):
+        for question_id in range(100, 105):
+            self.session.mark_asked(question_id)
+        self.assertIsNone(self.session.best_unasked())
+        self.assertEqual(self.session.top_categories(), [])
+        self.assertIsNone(self.session.choose_category())
+
+    def test_unknown_question(self):
+        self.assertIsNone(self.session.update_score(999, 1.0))
+        self.assertIsNone(self.session.mark_asked(999))
+
+
+class TopCategoriesTest(SimpleTestCase):
+    def setUp(self):
+        self.categories = ['A', 'A', 'B', 'B', 'C', 'D', 'E', 'F', 'G']
+        self.scores = np.array([0.9, 0.1, 0.8, 0.85, 0.3, 0.4, 0.5, 0.6, 0.2])
+
+    def make_session(self, seed=None):
+        return AssessmentSession(make_index(self.categories), self.scores, self.scores, self.scores, seed=seed)
+
+    def expected_top(self, session, k=5):
+        """Reference: groupby max over unasked questions, then sort"""
+        best = {}
+        for position, category in enumerate(self.categories):
+            if not session.asked[position]:
+                best[category] = max(best.get(category, -np.inf), session.scores[position])
+        return sorted(best, key=best.get, reverse=True)[:k]
+
+    def test_matches_groupby_max(self):
+        session = self.make_session()
+        self.assertEqual(session.top_categories(), ['A', 'B', 'F', 'E', 'D'])
+        self.assertEqual(session.top_categories(), self.expected_top(session))
+
+    def test_ranks_by_unasked_questions_only(self):
+        """
+        Unlike the old groupby over every question, an asked question no longer
+        holds its category up: A ranks by its remaining 0.1 and an exhausted
+        category is never offered.
+        """
+        session = AssessmentSession(make_index(self.categories), self.scores, self.scores, self.scores,
+                                    asked_ids=[100, 104])
+        self.assertEqual(session.top_categories(k=10), ['B', 'F', 'E', 'D', 'G', 'A'])
+        self.assertNotIn('C', session.top_categories(k=10))
+
+    def test_tracks_asks_and_score_updates(self):
+        """Heaps follow asked questions and score changes incrementally"""
+        session = self.make_session()
+        session.mark_asked(100)                   # A drops to 0.1
+        self.assertEqual(session.top_categories(), self.expected_top(session))
+        session.update_score(104, 3.0)            # C rises to 1.11
+        self.assertEqual(session.top_categories()[0], 'C')
+        session.update_score(103, 0.0)            # B's best drops from 0.85 to 0.8
+        self.assertEqual(session.top_categories(), self.expected_top(session))
+        for question_id in (102, 103):
+            session.mark_asked(question_id)       # B exhausted
+        self.assertNotIn('B', session.top_categories(k=10))
+        self.assertEqual(session.top_categories(k=10), self.expected_top(session, k=10))
+
+    def test_seeded_choice_is_deterministic(self):
+        first = [self.make_session(seed=7).choose_category() for _ in range(3)]
+        session_a, session_b = self.make_session(seed=7), self.make_session(seed=7)
+        picks_a = [session_a.choose_category() for _ in range(10)]
+        picks_b = [session_b.choose_category() for _ in range(10)]
+        self.assertEqual(picks_a, picks_b)
+        self.assertEqual(len(set(first)), 1)
+        self.assertTrue(set(picks_a) <= set(session_a.top_categories()))
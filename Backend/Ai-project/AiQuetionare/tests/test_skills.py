@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from AiQuetionare.models import Candidate, Skill
+from AiQuetionare.skills import attach_skills, normalize_skill_names, resolve_skills
+
+User = get_user_model()
+
+
+class SkillUpsertTest(TestCase):
+    def setUp(self):
+        self.candidate = Candidate.objects.create(
+            user=User.objects.create_user(email='skills@example.com', username='skills', password='password123')
+        )
+
+    def test_normalize_drops_blanks_and_case_duplicates(self):
+        self.assertEqual(normalize_skill_names(['  Python ', 'python', '', 'Machine   Learning']),
+                         ['Python', 'Machine Learning'])
+
+    def test_existing_skills_are_matched_case_insensitively(self):
+        existing = Skill.objects.create(name='Python')
+        skills = resolve_skills(['python', 'Go'])
+        self.assertEqual(skills[0], existing)
+        self.assertEqual(Skill.objects.count(), 2)
+
+    def test_query_count_does_not_grow_with_skill_count(self):
+        def queries(names):
+            with CaptureQueriesContext(connection) as context:
+                attach_skills(self.candidate, names)
+            return len(context)
+
+        small = queries([f"Small {i}" for i in range(5)])
+        large = queries([f"Large {i}" for i in range(40)])
+        self.assertEqual(small, large)
+        self.assertEqual(self.candidate.skills.count(), 45)
+
+    def test_patch_replaces_the_candidate_skill_set(self):
+        attach_skills(self.candidate, ['Python', 'Django'])
+        client = APIClient()
+        client.force_authenticate(user=self.candidate.user)
+        response = client.patch(reverse('user_skills'), {'skills': ['django', 'React']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(self.candidate.skills.values_list('name', flat=True)), ['Django', 'React'])
@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
@@ -304,6 +304,81 @@ class JobDescriptionAPITest(APITestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['title'], 'Test Job')
 
+    def test_job_descriptions_are_paginated_by_cursor(self):
+        """Test walking the listing page by page through the Link header"""
+        for i in range(5):
+            JobDescription.objects.create(title=f'Job {i}', description='Description', created_by=self.user)
+
+        titles = []
+        url = f"{self.job_url}?page_size=2"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data), 2)
+            titles.extend(job['title'] for job in response.data)
+            link = response.headers.get('Link', '')
+            url = next((part.split(';')[0].strip(' <>') for part in link.split(',') if 'rel="next"' in part), None)
+        self.assertEqual(titles, [f'Job {i}' for i in reversed(range(5))])
+
+    def test_listing_etag_changes_with_page_links(self):
+        """Test a page whose rows are unchanged is not a 304 once its next link changes"""
+        oldest = JobDescription.objects.create(title='Job 0', description='Description', created_by=self.user)
+        for i in range(1, 3):
+            JobDescription.objects.create(title=f'Job {i}', description='Description', created_by=self.user)
+        url = f"{self.job_url}?page_size=2"
+        response = self.client.get(url)
+        self.assertIn('rel="next"', response['Link'])
+
+        oldest.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('Link', response)
+
+    def test_pagination_headers_are_exposed_to_the_frontend(self):
+        """Test a cross-origin client may read the Link and ETag headers"""
+        JobDescription.objects.create(title='Job', description='Description', created_by=self.user)
+        response = self.client.get(self.job_url, HTTP_ORIGIN='http://localhost:5173')
+        exposed = [header.strip() for header in response['Access-Control-Expose-Headers'].split(',')]
+        self.assertIn('Link', exposed)
+        self.assertIn('ETag', exposed)
+
+    def test_job_descriptions_filter_and_search(self):
+        """Test filtering the listing by creator and title"""
+        other = User.objects.create_user(email='other@example.com', username='other', password='other123')
+        JobDescription.objects.create(title='Python Developer', description='Description', created_by=self.user)
+        JobDescription.objects.create(title='Java Developer', description='Description', created_by=self.user)
+        JobDescription.objects.create(title='Python Lead', description='Description', created_by=other)
+
+        response = self.client.get(f"{self.job_url}?created_by=me&search=python")
+        self.assertEqual([job['title'] for job in response.data], ['Python Developer'])
+        response = self.client.get(f"{self.job_url}?created_by={other.id}")
+        self.assertEqual([job['title'] for job in response.data], ['Python Lead'])
+
+    def test_job_descriptions_search_covers_description_and_skills(self):
+        """Test the search box matches what the job list used to filter on the client"""
+        by_skill = JobDescription.objects.create(title='Backend', description='APIs', created_by=self.user)
+        by_skill.skills.add(self.skill1, self.skill2)
+        JobDescription.objects.create(title='Frontend', description='Builds React apps', created_by=self.user)
+        JobDescription.objects.create(title='Data', description='Pipelines', created_by=self.user)
+
+        response = self.client.get(f"{self.job_url}?search={self.skill1.name[:3].lower()}")
+        self.assertEqual([job['title'] for job in response.data], ['Backend'])
+        response = self.client.get(f"{self.job_url}?search=react")
+        self.assertEqual([job['title'] for job in response.data], ['Frontend'])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_job_description_listing_query_count(self):
+        """Test the listing does not query skills once per job description"""
+        for i in range(10):
+            job = JobDescription.objects.create(title=f'Job {i}', description='Description', created_by=self.user)
+            job.skills.add(self.skill1, self.skill2)
+        # Page of ids, then the cache misses: job descriptions plus their prefetched skills
+        with self.assertNumQueries(3):
+            response = self.client.get(self.job_url)
+        self.assertEqual(len(response.data), 10)
+        with self.assertNumQueries(1):
+            self.client.get(self.job_url)
+
     def test_update_job_description(self):
         """Test updating a job description"""
         # Create a job
@@ -2,7 +2,7 @@ from django.urls import path, include
 from . import views
 from rest_framework.routers import DefaultRouter
 from .views import UserView, LogoutView, CustomTokenObtainPairView, candidateView, JobDescriptionView ,QuestionCSVUploadView
-from .gemini_views import generate_question, evaluate_answer, generate_result
+from .gemini_views import generate_question, evaluate_answer, evaluate_answers_batch, generate_result
 
 
 urlpatterns = [
@@ -11,11 +11,14 @@ urlpatterns = [
     path('login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('skills/', views.UserSkills.as_view(), name='user_skills'),
     path('candidate/', candidateView.as_view(), name='candidate'),
+    path('candidate/resume-job/<int:id>/', views.ResumeJobStatusView.as_view(), name='resume_job_status'),
     path('JobDescription/', JobDescriptionView.as_view(), name='job_description'),
     path('JobDescription/<int:id>/', views.getdobbyid.as_view(), name='job_description_detail'),
     path('upload_Questionnaire/', QuestionCSVUploadView.as_view(), name='upload_questionnaire'),
+    path('stats/', views.PerformanceStatsView.as_view(), name='performance_stats'),
       # Gemini API endpoints
     path('gemini/question/', generate_question, name='generate_question'),
     path('gemini/evaluate/', evaluate_answer, name='evaluate_answer'),
+    path('gemini/evaluate/batch/', evaluate_answers_batch, name='evaluate_answers_batch'),
     path('gemini/result/', generate_result, name='generate_result'),
 ]
\ No newline at end of file
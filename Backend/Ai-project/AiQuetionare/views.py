@@ -5,18 +5,32 @@ from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.permissions import IsAuthenticated
-from AiQuetionare.serializer import EmailTokenObtainPairSerializer, CustomUserSerializer, CustomUserReadSerializer, CandidateSerializer, JobDescriptionSerializer, Category, Question, SkillSerializer
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from AiQuetionare.serializer import EmailTokenObtainPairSerializer, CustomUserSerializer, CustomUserReadSerializer, CandidateSerializer, JobDescriptionSerializer, Category, Question, SkillSerializer, ResumeParseJobSerializer
 from AiQuetionare.Error import CustomError
 from django.shortcuts import get_object_or_404
-from django.db.models import Count
+from django.db.models import Count, Exists, OuterRef, Q
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny
-from AiQuetionare.models import Candidate, JobDescription, Skill
+from AiQuetionare.models import Candidate, JobDescription, ResumeParseJob, Skill
+from AiQuetionare.pagination import JobDescriptionPagination
+from AiQuetionare.job_cache import job_cache
+from AiQuetionare.embeddings import question_index, skill_cache
+from AiQuetionare.inference import inference_executor
+from AiQuetionare.grading import answer_grader
+from AiQuetionare.llm import llm_client
+from AiQuetionare.llm_cache import llm_cache
+from AiQuetionare.question_import import DIFFICULTY_VALUES, REQUIRED_COLUMNS, import_progress, import_questions, open_csv, stream_questions
+from AiQuetionare.question_pool import question_pool
+from AiQuetionare.resume_jobs import resume_jobs
+from AiQuetionare.skills import attach_skills, normalize_skill_names
 from django.contrib.auth.models import Group
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 import pandas as pd
-from io import StringIO
 import csv
+import hashlib
 
 User = get_user_model()
 
@@ -275,6 +289,11 @@ class candidateView(APIView):
             if serializer.is_valid():
                 candidate = serializer.save()
                 read_serializer = CandidateSerializer(candidate)
+                resume_job = getattr(serializer, 'resume_job', None)
+                if resume_job:
+                    # The resume is parsed in the background; poll the job for the extracted skills
+                    data = dict(read_serializer.data, resume_job=ResumeParseJobSerializer(resume_job).data)
+                    return Response(data, status=status.HTTP_202_ACCEPTED)
                 return Response(read_serializer.data, status=status.HTTP_201_CREATED)
             raise CustomError("Invalid data", code="CANDIDATE_CREATION_ERROR", details=serializer.errors, status_code=status.HTTP_400_BAD_REQUEST)
         except ValidationError as ve:
@@ -286,18 +305,71 @@ class candidateView(APIView):
             status_code = getattr(e, 'status_code', status.HTTP_400_BAD_REQUEST)
             raise CustomError(message, code=code, details=details, status_code=status_code)
         
+class ResumeJobStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, id):
+        try:
+            job = ResumeParseJob.objects.select_related('candidate').filter(id=id).first()
+            if not job or (job.candidate.user_id != request.user.id and not request.user.is_staff):
+                raise CustomError("Resume job not found", code="RESUME_JOB_NOT_FOUND", status_code=status.HTTP_404_NOT_FOUND)
+            return Response(ResumeParseJobSerializer(job).data, status=status.HTTP_200_OK)
+        except Exception as e:
+            details = getattr(e, 'details', {"error": str(e)})
+            code = getattr(e, 'code', "RESUME_JOB_RETRIEVAL_ERROR")
+            message = getattr(e, 'message', "Failed to retrieve resume job")
+            status_code = getattr(e, 'status_code', status.HTTP_400_BAD_REQUEST)
+            raise CustomError(message, code=code, details=details, status_code=status_code)
+
+
+def conditional_response(request, response, etag, last_modified):
+    """
+    Tag ``response`` with an ETag and Last-Modified and return 304 Not Modified
+    instead when the client's If-None-Match / If-Modified-Since still match.
+    """
+    response['ETag'] = quote_etag(etag)
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return get_conditional_response(
+        request, etag=response['ETag'], last_modified=int(last_modified.timestamp()), response=response
+    )
+
+
 class JobDescriptionView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
         try:
-            # user = CustomUserReadSerializer(request.user)
+            # Optional filters: ?created_by=<user id|me>&search=<text in the title, description or a skill name>
             job_description = JobDescription.objects.all()
-            print(job_description)
-            if not job_description:
+            created_by = request.query_params.get('created_by')
+            if created_by:
+                if created_by == 'me':
+                    created_by = request.user.id
+                elif not created_by.isdigit():
+                    raise CustomError("created_by must be a user id or 'me'", code="INVALID_FILTER", status_code=status.HTTP_400_BAD_REQUEST)
+                job_description = job_description.filter(created_by_id=created_by)
+            search = request.query_params.get('search', '').strip()
+            if search:
+                skill_match = JobDescription.skills.through.objects.filter(
+                    jobdescription_id=OuterRef('pk'), skill__name__icontains=search
+                )
+                job_description = job_description.filter(
+                    Q(title__icontains=search) | Q(description__icontains=search) | Exists(skill_match)
+                )
+
+            # One page of ids per request; the cursor for the next page is in the Link header
+            paginator = JobDescriptionPagination()
+            page = paginator.paginate_queryset(job_description.only('id'), request, view=self)
+            if not page:
                 raise CustomError("Job Description not found", code="JOB_DESCRIPTION_NOT_FOUND", status_code=status.HTTP_404_NOT_FOUND)
-            job_description_serz = JobDescriptionSerializer(job_description, many=True)
-            return Response(job_description_serz.data, status=status.HTTP_200_OK)
+            # The serialized job descriptions come from the read model
+            entries = job_cache.get_many([job.id for job in page])
+            response = paginator.get_paginated_response([entry['data'] for entry in entries])
+            # The Link header is part of the page, so a 304 must not keep a stale next/prev cursor
+            etag_input = [entry['etag'] for entry in entries] + [response.get('Link', '')]
+            etag = hashlib.sha256(' '.join(etag_input).encode('utf-8')).hexdigest()[:32]
+            return conditional_response(request, response, etag, max(entry['updated_at'] for entry in entries))
         except Exception as e:
             details = getattr(e, 'details', {"error": str(e)})
             code = getattr(e, 'code', "USER_RETRIEVAL_ERROR")
@@ -381,12 +453,10 @@ class getdobbyid(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, id):
-        try:
-            job_description = JobDescription.objects.get(id=id)
-            serializer = JobDescriptionSerializer(job_description)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        except JobDescription.DoesNotExist:
+        entry = job_cache.get(id)
+        if entry is None:
             raise CustomError("Job Description not found", code="JOB_DESCRIPTION_NOT_FOUND", status_code=status.HTTP_404_NOT_FOUND)
+        return conditional_response(request, Response(entry['data'], status=status.HTTP_200_OK), entry['etag'], entry['updated_at'])
 
 class QuestionCSVUploadView(APIView):
     """
@@ -409,18 +479,31 @@ class QuestionCSVUploadView(APIView):
             
             # Read the CSV file
             try:
-                # Handle encoding issues by trying multiple encodings
-                try:
-                    content = file.read().decode('utf-8')
-                except UnicodeDecodeError:
-                    content = file.read().decode('latin-1')  # Fallback to latin-1 encoding
-                
-                csv_data = StringIO(content)
+                # Decoded incrementally as UTF-8, falling back to latin-1
+                csv_data = open_csv(file)
+
+                # Large files (or ?stream=true) are imported chunk by chunk with bounded memory
+                stream = request.query_params.get('stream', '').lower() in ('1', 'true', 'yes')
+                if stream or file.size > getattr(settings, 'QUESTION_IMPORT_STREAM_THRESHOLD', 5 * 1024 * 1024):
+                    try:
+                        stats = stream_questions(
+                            csv_data,
+                            name=file.name,
+                            chunk_rows=getattr(settings, 'QUESTION_IMPORT_STREAM_ROWS', 5000),
+                            chunk_size=getattr(settings, 'QUESTION_IMPORT_CHUNK_SIZE', 1000),
+                        )
+                    except ValueError as e:
+                        raise CustomError(str(e), code="MISSING_COLUMNS", status_code=status.HTTP_400_BAD_REQUEST)
+                    question_index.invalidate()
+                    return Response({
+                        'message': f"Processed {stats['rows']} questions in {stats['chunks']} chunks.",
+                        'stats': stats
+                    }, status=status.HTTP_200_OK)
+
                 df = pd.read_csv(csv_data)
                 
                 # Check if the CSV has the required columns
-                required_columns = ['Question Number', 'Question', 'Answer', 'Category', 'Difficulty']
-                missing_columns = [col for col in required_columns if col not in df.columns]
+                missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
                 
                 if missing_columns:
                     raise CustomError(
@@ -430,8 +513,7 @@ class QuestionCSVUploadView(APIView):
                     )
                 
                 # Validate difficulty values
-                valid_difficulties = {'Easy': 2, 'Medium': 1, 'Hard': 0}
-                invalid_difficulties = df[~df['Difficulty'].isin(valid_difficulties.keys())]['Difficulty'].unique()
+                invalid_difficulties = df[~df['Difficulty'].isin(DIFFICULTY_VALUES.keys())]['Difficulty'].unique()
                 
                 if len(invalid_difficulties) > 0:
                     raise CustomError(
@@ -440,44 +522,9 @@ class QuestionCSVUploadView(APIView):
                         status_code=status.HTTP_400_BAD_REQUEST
                     )
                 
-                # Initialize stats
-                stats = {'created': 0, 'updated': 0, 'failed': 0, 'errors': []}
-                
-                # Process each row
-                for idx, row in df.iterrows():
-                    try:
-                        # Get or create the category
-                        category_name = row['Category'].strip()
-                        category, _ = Category.objects.get_or_create(name=category_name)
-
-                        # Map difficulty string to integer value
-                        difficulty_value = valid_difficulties[row['Difficulty']]
-                        
-                        # Create or update the question
-                        question_number = str(row['Question Number']).strip()
-                        question_text = row['Question'].strip()
-                        answer = row['Answer'].strip()
-                        
-                        question, created = Question.objects.update_or_create(
-                            question_number=question_number,
-                            defaults={
-                                'question_text': question_text,
-                                'answer': answer,
-                                'category': category,
-                                'difficulty': difficulty_value,
-                                'embedding': None  # Placeholder for embedding
-                            }
-                        )
-                        
-                        # Update stats
-                        if created:
-                            stats['created'] += 1
-                        else:
-                            stats['updated'] += 1
-                            
-                    except Exception as e:
-                        stats['failed'] += 1
-                        stats['errors'].append(f"Row {idx+2}: {str(e)}")
+                stats = import_questions(df, chunk_size=getattr(settings, 'QUESTION_IMPORT_CHUNK_SIZE', 1000))
+                # New bank version: the embedding index and question graph rebuild on next use
+                question_index.invalidate()
             
                 return Response({
                     'message': f"Processed {len(df)} questions.",
@@ -525,30 +572,24 @@ class UserSkills(APIView):
             user = CustomUserReadSerializer(request.user)
             user_id = user.data['id']
             
-            # Get skill name from request data
+            # Accept a single skill name or a list of them
             skill_name = request.data.get('skill')
-            if not skill_name or not skill_name.strip():
+            skill_names = normalize_skill_names([skill_name] if skill_name else request.data.get('skills', []))
+            if not skill_names:
                 raise CustomError("Skill name is required", code="SKILL_REQUIRED", status_code=status.HTTP_400_BAD_REQUEST)
-            
-            # Trim any whitespace from skill name
-            skill_name = skill_name.strip()
 
             # Get candidate profile
             candidate = Candidate.objects.filter(user=user_id).first()
             if not candidate:
                 raise CustomError("Candidate not found", code="CANDIDATE_NOT_FOUND", status_code=status.HTTP_404_NOT_FOUND)
             
-            # Check if skill already exists for this candidate
-            existing_skills = candidate.skills.all()
-            for existing_skill in existing_skills:
-                if existing_skill.name.lower() == skill_name.lower():
-                    raise CustomError("Skill already exists", code="SKILL_EXISTS", status_code=status.HTTP_400_BAD_REQUEST)
-            
-            # Get or create the skill
-            skill_obj, created = Skill.objects.get_or_create(name=skill_name)
+            # Check if the skills already exist for this candidate
+            existing_skills = {name.lower() for name in candidate.skills.values_list('name', flat=True)}
+            if all(name.lower() in existing_skills for name in skill_names):
+                raise CustomError("Skill already exists", code="SKILL_EXISTS", status_code=status.HTTP_400_BAD_REQUEST)
             
-            # Add skill to candidate
-            candidate.skills.add(skill_obj)
+            # Upsert the skills and add them to the candidate in bulk
+            attach_skills(candidate, skill_names)
             
             # Return updated skills list
             return Response([skill.name for skill in candidate.skills.all()], status=status.HTTP_200_OK)
@@ -621,15 +662,35 @@ class UserSkills(APIView):
             candidate = Candidate.objects.filter(user=user_id).first()
             if not candidate:
                 raise CustomError("Candidate not found", code="CANDIDATE_NOT_FOUND", status_code=status.HTTP_404_NOT_FOUND)
-            skills = candidate.skills.all()
-            for skill in skills:
-                skill.name = request.data.get('name', skill.name)
-                skill.level = request.data.get('level', skill.level)
-                skill.save()
-            return Response({"message": "Skills updated successfully"}, status=status.HTTP_200_OK)
+            skill_names = request.data.get('skills')
+            if not isinstance(skill_names, list):
+                raise CustomError("A list of skills is required", code="SKILLS_REQUIRED", status_code=status.HTTP_400_BAD_REQUEST)
+            # Replace the candidate's skill set
+            skills = attach_skills(candidate, skill_names, replace=True)
+            return Response({"message": "Skills updated successfully", "skills": [skill.name for skill in skills]}, status=status.HTTP_200_OK)
         except Exception as e:
             details = getattr(e, 'details', {"error": str(e)})
             code = getattr(e, 'code', "USER_RETRIEVAL_ERROR")
             message = getattr(e, 'message', "Failed to retrieve user data")
             status_code = getattr(e, 'status_code', status.HTTP_400_BAD_REQUEST)
-            raise CustomError(message, code=code, details=details, status_code=status_code)
\ No newline at end of file
+            raise CustomError(message, code=code, details=details, status_code=status_code)
+
+class PerformanceStatsView(APIView):
+    """
+    Cache and executor counters for tuning the interview hot paths.
+    Only staff users can access this endpoint.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'inference': inference_executor.stats(),
+            'skill_embedding_cache': skill_cache.stats(),
+            'llm': llm_client.stats(),
+            'llm_cache': llm_cache.stats(),
+            'question_pool': question_pool.stats(),
+            'grading': answer_grader.stats(),
+            'resume_jobs': resume_jobs.stats(),
+            'question_import': import_progress.stats(),
+            'job_descriptions': job_cache.stats(),
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+"""
+Micro-benchmarks for the MockMate interview hot paths.
+Each benchmark compares the original implementation against its replacement
+on synthetic data and checks both produce the same result.
+
+    python benchmark.py scoring --questions 5000 --skills 30
+    python benchmark.py selector --questions 50000 --categories 100
+    python benchmark.py llm --requests 200 --concurrency 50 --latency 0.5
+    python benchmark.py payload --skills 40
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def timed(fn, repeat):
+    """Return (best wall time in seconds, last result) over ``repeat`` runs"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(name, legacy_time, new_time):
+    print(f"{name}: legacy {legacy_time * 1000:.2f} ms, new {new_time * 1000:.2f} ms, "
+          f"speed-up {legacy_time / new_time:.1f}x")
+
+
+def bench_scoring(args):
+    """Per-pair cosine_similarity scoring vs. the vectorized score_questions"""
+    import pandas as pd
+    from sklearn.metrics.pairwise import cosine_similarity
+    from AiQuetionare.scoring import score_questions
+
+    rng = np.random.default_rng(args.seed)
+    questions = rng.standard_normal((args.questions, args.dim)).astype(np.float32)
+    jd_skills = list(rng.standard_normal((args.skills, args.dim)).astype(np.float32))
+    user_skills = list(rng.standard_normal((args.skills, args.dim)).astype(np.float32))
+
+    def calculate_max_similarity(question_embedding, skill_embeddings):
+        similarities = [cosine_similarity([skill_embedding], [question_embedding])[0][0]
+                        for skill_embedding in skill_embeddings]
+        return max(similarities) if similarities else 0.0
+
+    def calculate_avg_similarity(question_embedding, skill_embeddings):
+        similarities = [cosine_similarity([skill_embedding], [question_embedding])[0][0]
+                        for skill_embedding in skill_embeddings]
+        return sum(similarities) / len(similarities) if similarities else 0.0
+
+    def legacy():
+        df = pd.DataFrame({'embedding': list(questions)})
+        df['jd_score'] = df['embedding'].apply(lambda x: calculate_max_similarity(x, jd_skills))
+        df['user_score'] = df['embedding'].apply(lambda x: calculate_avg_similarity(x, user_skills))
+        df['score'] = 0.6 * df['jd_score'] + 0.4 * df['user_score']
+        return df['score'].to_numpy()
+
+    def vectorized():
+        return score_questions(questions, jd_skills, user_skills)[2]
+
+    legacy_time, legacy_scores = timed(legacy, 1)
+    new_time, new_scores = timed(vectorized, args.repeat)
+    np.testing.assert_allclose(legacy_scores, new_scores, atol=1e-5)
+    report(f"scoring {args.questions} questions x {args.skills} skills", legacy_time, new_time)
+
+
+def legacy_a_star_search(graph, start, scores, asked_nodes, threshold=0.99):
+    """The consumer's original dict-based A* search"""
+    import heapq
+
+    open_set = []
+    heapq.heappush(open_set, (1 - scores.get(start, 0), start))
+    came_from = {}
+    g_score = {start: 0}
+    best_node = start
+    best_score = scores.get(start, 0)
+
+    while open_set:
+        _, current = heapq.heappop(open_set)
+        if current in asked_nodes:
+            continue
+        if scores.get(current, 0) > best_score:
+            best_node = current
+            best_score = scores.get(current, 0)
+        if scores.get(current, 0) >= threshold:
+            break
+        for neighbor in graph.get(current, []):
+            if neighbor in asked_nodes:
+                continue
+            tentative_g_score = g_score[current] + 1
+            if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative_g_score
+                f_score = tentative_g_score + (1 - scores.get(neighbor, 0))
+                heapq.heappush(open_set, (f_score, neighbor))
+
+    path = []
+    current = best_node
+    while current in came_from:
+        path.append(current)
+        current = came_from[current]
+    path.append(start)
+    return path[::-1], best_node, best_score
+
+
+def bench_selector(args):
+    """Dict-based A* with asked-set rerun vs. the array-based QuestionSelector"""
+    import types
+    from collections import defaultdict
+    from AiQuetionare.question_graph import QuestionGraph, QuestionSelector
+
+    rng = np.random.default_rng(args.seed)
+    n = args.questions
+    index = types.SimpleNamespace(
+        question_ids=list(range(n)),
+        categories=[f"Category {i}" for i in rng.integers(0, args.categories, n)],
+        difficulties=rng.integers(0, 3, n).astype(np.int8),
+        version=1,
+    )
+    # Stay below the early-exit threshold so both searches walk the whole chain
+    scores = rng.uniform(0, 0.98, n)
+    asked = np.zeros(n, dtype=bool)
+
+    graph = QuestionGraph.build(index)
+    selector = QuestionSelector(graph)
+    category = graph.category_names[0]
+    start = graph.start_node(category)
+
+    # The legacy search keys everything by question number strings
+    numbers = [f"Q{i}" for i in range(n)]
+    legacy_graph = defaultdict(list)
+    for chain in graph.category_nodes:
+        for a, b in zip(chain[:-1], chain[1:]):
+            legacy_graph[numbers[a]].append(numbers[b])
+
+    def legacy():
+        score_dict = dict(zip(numbers, scores))
+        asked_nodes = {numbers[i] for i in np.flatnonzero(asked)}
+        path, best_node, best_score = legacy_a_star_search(legacy_graph, numbers[start], score_dict, asked_nodes)
+        if path[-1] in asked_nodes:
+            path, best_node, best_score = legacy_a_star_search(legacy_graph, numbers[start], score_dict, set())
+        return best_node
+
+    def array_based():
+        return selector.search(start, scores, asked)[1]
+
+    legacy_time, legacy_best = timed(legacy, args.repeat)
+    new_time, new_best = timed(array_based, args.repeat)
+    assert legacy_best == numbers[new_best], (legacy_best, new_best)
+    report(f"selector, {n} questions, {args.categories} categories, nothing asked", legacy_time, new_time)
+
+    # Ask the start node: the legacy search dead-ends and reruns, the selector walks past it
+    asked[start] = True
+    legacy_time, _ = timed(legacy, args.repeat)
+    new_time, new_best = timed(array_based, args.repeat)
+    assert new_best is not None and not asked[new_best]
+    report(f"selector, {n} questions, start node asked", legacy_time, new_time)
+
+
+def bench_llm(args):
+    """Blocking Gemini calls on a fixed worker pool vs. the pooled async client, against stub_llm.py"""
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mockmate.settings')
+    django.setup()
+    from google import genai
+    from google.genai import types
+    from AiQuetionare.llm import AsyncLLMClient
+    from stub_llm import start_stub_server
+
+    server = start_stub_server(latency=args.latency)
+    prompt = "Generate a beginner level technical interview question"
+
+    # One sync worker per thread, each blocked for the whole round-trip like the old views
+    sync_client = genai.Client(api_key='stub', http_options=types.HttpOptions(base_url=server.url))
+
+    def legacy():
+        def call(_):
+            return sync_client.models.generate_content(model='gemini-2.0-flash', contents=prompt).text
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            return list(pool.map(call, range(args.requests)))
+
+    async_client = AsyncLLMClient(base_url=server.url, api_key='stub', max_concurrency=args.concurrency,
+                                  max_connections=args.concurrency, queue_timeout=600)
+
+    async def run_async():
+        try:
+            return await asyncio.gather(*(async_client.generate(prompt) for _ in range(args.requests)))
+        finally:
+            await async_client.aclose()
+
+    legacy_time, legacy_replies = timed(legacy, 1)
+    new_time, new_replies = timed(lambda: asyncio.run(run_async()), 1)
+    server.shutdown()
+    assert legacy_replies == list(new_replies)
+    report(f"llm, {args.requests} calls at {args.latency}s each, "
+           f"{args.workers} sync workers vs {args.concurrency} async slots", legacy_time, new_time)
+    print(async_client.stats())
+
+
+def bench_payload(args):
+    """
+    Question response before the lean payload (nested serializers with the
+    embedding as a JSON float list), the expand mode and the lean default,
+    on a throwaway test database
+    """
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mockmate.settings')
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from AiQuetionare.embeddings import pack_embedding, unpack_embedding
+    from AiQuetionare.gemini_views import serialize_question
+    from AiQuetionare.models import Assessment, Candidate, Category, JobDescription, Question, Skill
+
+    test_db = connection.creation.create_test_db(verbosity=0)
+    try:
+        rng = np.random.default_rng(args.seed)
+        skills = Skill.objects.bulk_create([Skill(name=f"Skill {i}") for i in range(args.skills)])
+        user = get_user_model().objects.create_user(email='bench@example.com', username='bench', password='bench')
+        candidate = Candidate.objects.create(user=user)
+        candidate.skills.set(skills)
+        job = JobDescription.objects.create(title='Backend Engineer', description='Build APIs ' * 50, created_by=user)
+        job.skills.set(skills)
+        question = Question.objects.create(
+            question_number='Q1', question_text='Explain how a hash map handles collisions.', answer='Chaining or probing.',
+            category=Category.objects.create(name='Data Structures'), difficulty=1,
+            embedding=pack_embedding(rng.standard_normal(args.dim)),
+        )
+        assessment = Assessment.objects.create(candidate=candidate, job_description=job, current_question=question)
+
+        def render(expand):
+            return json.dumps(serialize_question(question, assessment, 'intermediate', expand=expand)).encode('utf-8')
+
+        def render_legacy():
+            # The old serializers also sent the stored embedding, as a float list, in both nested questions
+            data = serialize_question(question, assessment, 'intermediate', expand=True)
+            embedding = unpack_embedding(question.embedding).tolist()
+            data['question_data']['embedding'] = embedding
+            data['assessment']['current_question']['embedding'] = embedding
+            return json.dumps(data).encode('utf-8')
+
+        legacy_time, legacy_body = timed(render_legacy, args.repeat)
+        expanded_body = render(True)
+        new_time, new_body = timed(lambda: render(False), args.repeat)
+        assert json.loads(new_body).items() <= json.loads(expanded_body).items()
+        assert 'embedding' not in json.loads(expanded_body)['question_data']
+        report(f"payload, {args.skills} skills, {args.dim}-dim embedding", legacy_time, new_time)
+        print(f"payload size: legacy {len(legacy_body)} bytes, expanded {len(expanded_body)} bytes, "
+              f"lean {len(new_body)} bytes, {len(legacy_body) / len(new_body):.0f}x smaller")
+    finally:
+        connection.creation.destroy_test_db(test_db, verbosity=0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run MockMate micro-benchmarks')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the synthetic data')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs of the new implementation (best is reported)')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    scoring = subparsers.add_parser('scoring', help='Question scoring against JD and candidate skills')
+    scoring.add_argument('--questions', type=int, default=5000)
+    scoring.add_argument('--skills', type=int, default=30)
+    scoring.add_argument('--dim', type=int, default=384)
+    scoring.set_defaults(func=bench_scoring)
+
+    selector = subparsers.add_parser('selector', help='Next-question A* search')
+    selector.add_argument('--questions', type=int, default=50000)
+    selector.add_argument('--categories', type=int, default=100)
+    selector.set_defaults(func=bench_selector)
+
+    llm = subparsers.add_parser('llm', help='Gemini round-trips against the local stub server')
+    llm.add_argument('--requests', type=int, default=200)
+    llm.add_argument('--workers', type=int, default=8, help='Sync worker threads for the blocking client')
+    llm.add_argument('--concurrency', type=int, default=50, help='Concurrent calls for the async client')
+    llm.add_argument('--latency', type=float, default=0.5, help='Stub model latency in seconds')
+    llm.set_defaults(func=bench_llm)
+
+    payload = subparsers.add_parser('payload', help='generate_question response size and serialization time')
+    payload.add_argument('--skills', type=int, default=40, help='Skills on the candidate and the job description')
+    payload.add_argument('--dim', type=int, default=384)
+    payload.set_defaults(func=bench_payload)
+
+    args = parser.parse_args()
+    args.func(args)
@@ -12,9 +12,15 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
 # Initialize Django ASGI application early to ensure the AppRegistry
 # is populated before importing code that may import ORM models.
 django_asgi_app = get_asgi_application()
+
+from django.conf import settings
+from AiQuetionare.embeddings import embedding_service
+
+if settings.EMBEDDING_WARMUP:
+    embedding_service.warm()
+
 from django.urls import path
 
-from AiQuetionare.consumer import * 
 from AiQuetionare import routing
 
 application = ProtocolTypeRouter({
@@ -58,6 +58,8 @@ CORS_ALLOWED_ORIGINS = [
 ]
 APPEND_SLASH=False
 CORS_ALLOW_CREDENTIALS = True  
+# Let the frontend read the listing's pagination links and the conditional GET validators
+CORS_EXPOSE_HEADERS = ['Link', 'ETag']
 
 
 MIDDLEWARE = [
@@ -150,6 +152,70 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Number of distinct skill embeddings kept in memory per worker process
+SKILL_EMBEDDING_CACHE_SIZE = 10000
+# Load the SentenceTransformer when the ASGI worker starts instead of on the first interview
+EMBEDDING_WARMUP = env.bool('EMBEDDING_WARMUP', default=False)
+# Thread pool for CPU-bound inference awaited by the interview consumer
+INFERENCE_MAX_WORKERS = env.int('INFERENCE_MAX_WORKERS', default=2)
+INFERENCE_MAX_QUEUE = env.int('INFERENCE_MAX_QUEUE', default=32)
+INFERENCE_QUEUE_TIMEOUT = env.float('INFERENCE_QUEUE_TIMEOUT', default=30.0)
+# Async Gemini client used by the gemini/* views; set LLM_BASE_URL to stub_llm.py for offline load tests
+LLM_MODEL = env('LLM_MODEL', default='gemini-2.0-flash')
+LLM_BASE_URL = env('LLM_BASE_URL', default=None)
+LLM_TIMEOUT = env.float('LLM_TIMEOUT', default=30.0)
+LLM_MAX_CONCURRENCY = env.int('LLM_MAX_CONCURRENCY', default=16)
+LLM_MAX_CONNECTIONS = env.int('LLM_MAX_CONNECTIONS', default=32)
+LLM_QUEUE_TIMEOUT = env.float('LLM_QUEUE_TIMEOUT', default=10.0)
+# Answers graded per LLM call by the batch evaluation endpoint (callers may ask for up to the max)
+LLM_BATCH_CHUNK_SIZE = env.int('LLM_BATCH_CHUNK_SIZE', default=10)
+LLM_BATCH_MAX_CHUNK_SIZE = env.int('LLM_BATCH_MAX_CHUNK_SIZE', default=25)
+# Grade answers by embedding similarity to the reference answer; only similarities inside the band go to the LLM
+GRADING_TIERED = env.bool('GRADING_TIERED', default=True)
+GRADING_SIMILARITY_LOW = env.float('GRADING_SIMILARITY_LOW', default=0.45)
+GRADING_SIMILARITY_HIGH = env.float('GRADING_SIMILARITY_HIGH', default=0.8)
+# Local thread pool parsing uploaded resumes; running jobs older than the stale timeout are requeued
+RESUME_JOB_WORKERS = env.int('RESUME_JOB_WORKERS', default=2)
+RESUME_JOB_STALE_AFTER = env.int('RESUME_JOB_STALE_AFTER', default=600)  # seconds
+# Database cache of evaluation/result replies keyed by model + normalized prompt
+LLM_CACHE_ENABLED = env.bool('LLM_CACHE_ENABLED', default=True)
+LLM_CACHE_TTL = env.int('LLM_CACHE_TTL', default=7 * 24 * 3600)  # seconds
+LLM_CACHE_MAX_ENTRIES = env.int('LLM_CACHE_MAX_ENTRIES', default=10000)
+LLM_CACHE_EVICT_EVERY = env.int('LLM_CACHE_EVICT_EVERY', default=100)  # stores between eviction sweeps
+# Pre-generated questions per job description and difficulty; refilled to QUESTION_POOL_SIZE below the low-water mark
+QUESTION_POOL_ENABLED = env.bool('QUESTION_POOL_ENABLED', default=True)
+QUESTION_POOL_LOW_WATER = env.int('QUESTION_POOL_LOW_WATER', default=3)
+QUESTION_POOL_SIZE = env.int('QUESTION_POOL_SIZE', default=10)
+# Questions served from a pool join the embedding index at most this often per worker
+QUESTION_INDEX_REFRESH_INTERVAL = env.int('QUESTION_INDEX_REFRESH_INTERVAL', default=60)  # seconds
+# Rows per upserting INSERT when importing a question CSV
+QUESTION_IMPORT_CHUNK_SIZE = env.int('QUESTION_IMPORT_CHUNK_SIZE', default=1000)
+# Uploads above the threshold are read, validated, upserted and embedded QUESTION_IMPORT_STREAM_ROWS rows at a time
+QUESTION_IMPORT_STREAM_THRESHOLD = env.int('QUESTION_IMPORT_STREAM_THRESHOLD', default=5 * 1024 * 1024)  # bytes
+QUESTION_IMPORT_STREAM_ROWS = env.int('QUESTION_IMPORT_STREAM_ROWS', default=5000)
+# Job descriptions per page of the listing API (clients may ask for up to 100 with ?page_size=)
+JOB_DESCRIPTION_PAGE_SIZE = env.int('JOB_DESCRIPTION_PAGE_SIZE', default=20)
+# Serialized job descriptions in the default cache; entries are invalidated on change, the timeout only expires idle ones
+JOB_DESCRIPTION_CACHE_TIMEOUT = env.int('JOB_DESCRIPTION_CACHE_TIMEOUT', default=3600)  # seconds
+
+# The default cache is shared by every worker process so an invalidation in one is seen by all.
+# Production needs Redis (REDIS_URL): the job description read model and the question bank version are
+# read on every request. Without it a database table is used (created by migrate), so each cache hit is a query.
+REDIS_URL = env('REDIS_URL', default=None)
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'mockmate_cache',
+        },
+    }
 
 from datetime import timedelta
 
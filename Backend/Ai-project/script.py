@@ -18,6 +18,7 @@ from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.tree import DecisionTreeClassifier, export_text
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
+from AiQuetionare.scoring import score_questions
 
 user_skills = [
     "C/C++",
@@ -144,35 +145,12 @@ user_skill_embeddings = [model.encode(skill) for skill in user_skills]
 
 questions_df["embedding"] = questions_df["Question"].apply(lambda x: model.encode(str(x)))
 
-def calculate_max_similarity(question_embedding, skill_embeddings):
-    """Calculates the maximum cosine similarity between a question and any of the provided skills."""
-    if not skill_embeddings:
-        return 0.0
-    similarities = [cosine_similarity([skill_embedding], [question_embedding])[0][0]
-                    for skill_embedding in skill_embeddings]
-    return max(similarities) if similarities else 0.0
-
-def calculate_avg_similarity(question_embedding, user_skill_embeddings):
-    """Calculates the average cosine similarity between a question and any of the user's skills."""
-    similarities = [cosine_similarity([skill_embedding], [question_embedding])[0][0]
-                    for skill_embedding in user_skill_embeddings]
-    avg = 0
-    for val in similarities:
-      avg = avg + val
-    avg = avg / len(similarities)
-    return avg if similarities else 0.0
-
-
-questions_df["jd_score"] = questions_df["embedding"].apply(
-    lambda x: calculate_max_similarity(x, job_skill_embeddings)
-)
-
-
-questions_df["user_score"] = questions_df["embedding"].apply(
-    lambda x: calculate_avg_similarity(x, user_skill_embeddings)
-)
-
-questions_df['score'] = 0.6*questions_df['jd_score'] + 0.4*questions_df['user_score']
+# Score every question against all skills with one normalized matrix multiply
+question_matrix = np.vstack(questions_df["embedding"].values)
+jd_score, user_score, score = score_questions(question_matrix, job_skill_embeddings, user_skill_embeddings)
+questions_df["jd_score"] = jd_score
+questions_df["user_score"] = user_score
+questions_df['score'] = score
 print(questions_df[["Question", "Difficulty", "jd_score", "user_score"]].head())
 
 graph = defaultdict(list)
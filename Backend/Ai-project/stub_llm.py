@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""
+Offline stand-in for the Gemini REST API, for load-testing the LLM views
+without network access or API quota.
+
+    python stub_llm.py --port 8765 --latency 0.8
+    LLM_BASE_URL=http://127.0.0.1:8765 daphne mockmate.asgi:application
+
+Answers ``POST /<version>/models/<model>:generateContent`` with a canned JSON
+reply chosen from the prompt (question, question batch, evaluation, batch evaluation or hiring
+result) after sleeping ``latency`` seconds (+/- ``jitter``) to mimic model time.
+``:streamGenerateContent`` sends the same reply as server-sent events, a few
+characters per event, ``token_delay`` seconds apart after the initial latency.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GENERATE_PATH = re.compile(r'^/[^/]+/models/(?P<model>[^/:]+):(?P<method>generateContent|streamGenerateContent)$')
+BATCH_ITEM = re.compile(r'^\s*Item (\d+)$', re.MULTILINE)
+QUESTION_COUNT = re.compile(r'Generate (\d+) distinct')
+STREAM_CHUNK_CHARS = 8
+
+QUESTION_REPLY = {
+    "question": "Explain how a hash map handles collisions and what that means for lookup time.",
+    "category": "Data Structures",
+    "difficulty": "Intermediate",
+}
+EVALUATION_REPLY = {
+    "score": 0.72,
+    "feedback": "Good grasp of the basics. Mention concrete trade-offs to strengthen the answer.",
+}
+RESULT_REPLY = {
+    "decision": "Hire",
+    "probability": [0.3, 0.7],
+    "summary": "The candidate answered consistently well across the interview.",
+}
+
+
+def canned_reply(prompt):
+    """Pick the reply the real model would be asked for by this prompt"""
+    if "one object per item" in prompt:
+        return [dict(EVALUATION_REPLY, id=int(item_id)) for item_id in BATCH_ITEM.findall(prompt)]
+    if "hiring decision" in prompt:
+        return RESULT_REPLY
+    if "evaluating a candidate" in prompt:
+        return EVALUATION_REPLY
+    count = QUESTION_COUNT.search(prompt)
+    if count:
+        # Distinct per call too, so pool refills are not dropped as duplicates
+        tag = random.getrandbits(32)
+        return [dict(QUESTION_REPLY, question=f"{QUESTION_REPLY['question']} (variant {tag:x}-{index})")
+                for index in range(int(count.group(1)))]
+    return QUESTION_REPLY
+
+
+def candidate_payload(text):
+    return {
+        "candidates": [{
+            "content": {"role": "model", "parts": [{"text": text}]},
+            "finishReason": "STOP",
+            "index": 0,
+        }],
+    }
+
+
+def prompt_text(body):
+    return "\n".join(
+        part.get("text", "")
+        for content in body.get("contents", [])
+        for part in content.get("parts", [])
+    )
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so client connection pooling is exercised
+    latency = 0.0
+    jitter = 0.0
+    token_delay = 0.0
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        match = GENERATE_PATH.match(self.path.split("?")[0])
+        if not match:
+            self.send_json(404, {"error": {"code": 404, "message": f"Unknown path {self.path}"}})
+            return
+
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        self.server.count()
+        reply = json.dumps(canned_reply(prompt_text(body)))
+        if match.group("method") == "streamGenerateContent":
+            self.send_stream(reply)
+        else:
+            self.send_json(200, candidate_payload(reply))
+
+    def send_stream(self, reply):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        for start in range(0, len(reply), STREAM_CHUNK_CHARS):
+            if start and self.token_delay:
+                time.sleep(self.token_delay)
+            event = json.dumps(candidate_payload(reply[start:start + STREAM_CHUNK_CHARS]))
+            self.wfile.write(f"data: {event}\r\n\r\n".encode())
+            self.wfile.flush()
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # one line per request would dominate a load test
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # listen() backlog; socketserver's default of 5 drops connections once a
+    # load test opens more than a handful at once (benchmark.py defaults to 50)
+    request_queue_size = 128
+
+    def __init__(self, address, latency=0.0, jitter=0.0, token_delay=0.0):
+        handler = type("Handler", (StubLLMHandler,), {"latency": latency, "jitter": jitter, "token_delay": token_delay})
+        super().__init__(address, handler)
+        self.requests_served = 0
+        self._lock = threading.Lock()
+
+    def handle_error(self, request, client_address):
+        # Clients that hit their own timeout hang up before the reply is written
+        pass
+
+    def count(self):
+        with self._lock:
+            self.requests_served += 1
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub_server(host="127.0.0.1", port=0, latency=0.0, jitter=0.0, token_delay=0.0):
+    """Serve the stub from a daemon thread and return the server (``port=0`` picks a free port)"""
+    server = StubLLMServer((host, port), latency=latency, jitter=jitter, token_delay=token_delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve canned Gemini responses for offline load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds to wait before each reply")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Random +/- seconds added to the latency")
+    parser.add_argument("--token-delay", type=float, default=0.05, help="Seconds between streamed chunks")
+    args = parser.parse_args()
+
+    server = StubLLMServer((args.host, args.port), latency=args.latency, jitter=args.jitter,
+                           token_delay=args.token_delay)
+    print(f"Stub LLM listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -4,6 +4,30 @@ import { toast } from 'sonner';
 import { useAuth } from '../context/AuthContext';
 import { FileText } from 'lucide-react';
 
+const API_URL = 'http://localhost:8000/api';
+const POLL_INTERVAL_MS = 1500;
+const POLL_TIMEOUT_MS = 120000;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// The resume is parsed in the background; wait for its job to finish
+const waitForResumeJob = async (jobId) => {
+  const deadline = Date.now() + POLL_TIMEOUT_MS;
+  while (Date.now() < deadline) {
+    const response = await fetch(`${API_URL}/candidate/resume-job/${jobId}/`, { credentials: 'include' });
+    if (!response.ok) {
+      throw new Error('Failed to check CV processing status');
+    }
+    const job = await response.json();
+    if (job.status === 'done') return job;
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'We could not read skills from your CV');
+    }
+    await sleep(POLL_INTERVAL_MS);
+  }
+  throw new Error('CV processing is taking longer than expected. Please check back later.');
+};
+
 const CVUpload = () => {
   const [file, setFile] = useState(null);
   const [uploading, setUploading] = useState(false);
@@ -40,7 +64,7 @@ const CVUpload = () => {
     formData.append('user_id', user.id);
 
     try {
-      const response = await fetch('http://localhost:8000/api/candidate/', {
+      const response = await fetch(`${API_URL}/candidate/`, {
         method: 'POST',
         body: formData,
         credentials: 'include'
@@ -57,8 +81,18 @@ const CVUpload = () => {
       toast.success('CV uploaded successfully!');
       setFile(null);
 
-      // Update skills state with the skills from the response
-      setSkills(data.skills || []);
+      // A new CV is answered with 202 before parsing; poll its job, then reload the candidate's skills
+      let candidate = data;
+      const job = data.resume_job;
+      if (job && job.status !== 'done') {
+        await waitForResumeJob(job.id);
+        const candidateResponse = await fetch(`${API_URL}/candidate/`, { credentials: 'include' });
+        if (!candidateResponse.ok) {
+          throw new Error('Failed to load your skills');
+        }
+        candidate = await candidateResponse.json();
+      }
+      setSkills(candidate.skills || []);
     } catch (err) {
       console.error('Upload error:', err);
       toast.error(err.message || 'Failed to upload CV. Please try again.');
@@ -178,7 +212,7 @@ const CVUpload = () => {
                     <circle className="opacity-25" cx="12" cy="12" r="10" stroke="currentColor" strokeWidth="4"></circle>
                     <path className="opacity-75" fill="currentColor" d="M4 12a8 8 0 018-8V0C5.373 0 0 5.373 0 12h4zm2 5.291A7.962 7.962 0 014 12H0c0 3.042 1.135 5.824 3 7.938l3-2.647z"></path>
                   </svg>
-                  Uploading...
+                  {file ? 'Uploading...' : 'Reading your CV...'}
                 </>
               ) : (
                 'Upload CV'
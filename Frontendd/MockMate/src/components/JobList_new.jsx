@@ -2,55 +2,86 @@ import axios from 'axios';
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 
+const nextPageUrl = (linkHeader) => {
+  const match = /<([^>]+)>;\s*rel="next"/.exec(linkHeader || '');
+  return match ? match[1] : null;
+};
+
+const JOBS_URL = 'http://localhost:8000/api/JobDescription/';
+
+// One page of the cursor-paginated listing and the URL of the next page, if any
+const fetchJobPage = async (url) => {
+  try {
+    const response = await axios.get(url, {withCredentials: true});
+    return { jobs: response.data, next: nextPageUrl(response.headers.link) };
+  } catch (err) {
+    // The API answers an empty listing with 404
+    if (err.response && err.response.status === 404) return { jobs: [], next: null };
+    throw err;
+  }
+};
+
 const JobList = () => {
   const navigate = useNavigate();
   const [jobs, setJobs] = useState([]);
+  const [nextUrl, setNextUrl] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
   const [searchTerm, setSearchTerm] = useState('');
+  const [query, setQuery] = useState('');
   const [selectedJob, setSelectedJob] = useState(null);
   const [showModal, setShowModal] = useState(false);
 
+  // Search on the server once typing pauses
   useEffect(() => {
-    fetchJobs();
-  }, []);
+    const timer = setTimeout(() => setQuery(searchTerm.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
 
-  const fetchJobs = async () => {
+  // First page for the current search; later pages are loaded on demand
+  useEffect(() => {
+    let ignore = false;
+    const params = new URLSearchParams();
+    if (query) params.set('search', query);
+    fetchJobPage(`${JOBS_URL}?${params}`)
+      .then(({ jobs, next }) => {
+        if (ignore) return;
+        setJobs(jobs);
+        setNextUrl(next);
+        setError('');
+      })
+      .catch((err) => {
+        if (ignore) return;
+        setError('Failed to load jobs. Please try again later.');
+        console.error(err);
+      })
+      .finally(() => {
+        if (!ignore) setLoading(false);
+      });
+    return () => {
+      ignore = true;
+    };
+  }, [query]);
+
+  const loadMore = async () => {
+    setLoadingMore(true);
     try {
-      const response = await axios.get('http://localhost:8000/api/JobDescription/', {withCredentials: true});
-      if (!response) {
-        console.error(response);
-        throw new Error('Failed to fetch jobs');
-      }
-      console.log(response.data);
-      setJobs([...response.data]);
+      const { jobs: more, next } = await fetchJobPage(nextUrl);
+      setJobs((current) => [...current, ...more]);
+      setNextUrl(next);
     } catch (err) {
       setError('Failed to load jobs. Please try again later.');
       console.error(err);
     } finally {
-      setLoading(false);
+      setLoadingMore(false);
     }
   };
-    const startInterview = (jobId) => {
+
+  const startInterview = (jobId) => {
     navigate(`/gemini-interview/${jobId}`);
   };
 
-  const filteredJobs = jobs.filter(job => {
-    if (searchTerm === '') return true;
-    const searchLower = searchTerm.toLowerCase();
-    
-    // Search in job title
-    if (job.title.toLowerCase().includes(searchLower)) return true;
-    
-    // Search in job description
-    if (job.description.toLowerCase().includes(searchLower)) return true;
-    
-    // Search in skills
-    if (job.skills.some(skill => skill.name.toLowerCase().includes(searchLower))) return true;
-    
-    return false;
-  });
-
   if (loading) {
     return (
       <div className="flex justify-center items-center min-h-screen">
@@ -103,13 +134,13 @@ const JobList = () => {
         </div>
       </div>
 
-      {filteredJobs.length === 0 && searchTerm !== '' ? (
+      {jobs.length === 0 && query !== '' ? (
         <div className="text-center py-12">
           <svg className="mx-auto h-12 w-12 text-gray-400" fill="none" viewBox="0 0 24 24" stroke="currentColor">
             <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={1.5} d="M9.172 16.172a4 4 0 015.656 0M9 10h.01M15 10h.01M21 12a9 9 0 11-18 0 9 9 0 0118 0z" />
           </svg>
           <h3 className="mt-2 text-lg font-medium text-gray-900">No jobs found</h3>
-          <p className="mt-1 text-gray-500">We couldn't find any jobs matching "{searchTerm}"</p>
+          <p className="mt-1 text-gray-500">We couldn't find any jobs matching "{query}"</p>
           <div className="mt-6">
             <button 
               onClick={() => setSearchTerm('')} 
@@ -121,7 +152,7 @@ const JobList = () => {
         </div>
       ) : (
         <div className="grid grid-cols-1 gap-6 sm:grid-cols-2 lg:grid-cols-3">
-          {filteredJobs.map((job) => (
+          {jobs.map((job) => (
             <div
               key={job.id}
               className="bg-white overflow-hidden divide-y divide-gray-200 border-2 border-gray-200 rounded-2xl shadow-lg hover:shadow-xl transition-all duration-300"
@@ -191,6 +222,18 @@ const JobList = () => {
         </div>
       )}
       
+      {nextUrl && (
+        <div className="mt-8 flex justify-center">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="px-6 py-2 border border-indigo-600 rounded-md text-sm font-medium text-indigo-600 bg-white hover:bg-indigo-50 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-indigo-500 disabled:opacity-50 disabled:cursor-not-allowed"
+          >
+            {loadingMore ? 'Loading...' : 'Load more jobs'}
+          </button>
+        </div>
+      )}
+
       {/* Description Modal */}
       {showModal && selectedJob && (
         <div className="fixed inset-0 z-50 overflow-y-auto bg-gray-800 bg-opacity-75 flex items-center justify-center p-4">